@@ -0,0 +1,107 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+from validation import validate_frame
+
+FEATURES = ['location', 'total_sqft', 'bath', 'bhk']
+NUMERIC_FEATURES = ['total_sqft', 'bath', 'bhk']
+
+# Rows scored per vectorized pipe.predict call
+CHUNK_SIZE = 10000
+
+
+def read_json_rows(payload):
+    """Turn a JSON array of objects or [location, total_sqft, bath, bhk] lists into a DataFrame"""
+    if not isinstance(payload, list):
+        raise ValueError("Expected a JSON array of rows")
+
+    records = []
+    for row in payload:
+        if isinstance(row, dict):
+            records.append([row.get(name) for name in FEATURES])
+        elif isinstance(row, (list, tuple)) and len(row) == len(FEATURES):
+            records.append(list(row))
+        else:
+            # Keep the slot so the row numbering still matches the input
+            records.append([None] * len(FEATURES))
+    return pd.DataFrame(records, columns=FEATURES, dtype=object)
+
+
+def iter_csv_chunks(stream, chunk_size=CHUNK_SIZE, skip_rows=0):
+    """Read a CSV upload in chunks so large files never sit in memory at once.
+
+    skip_rows data rows after the header are skipped without being parsed.
+    """
+    if isinstance(stream, str):
+        stream = io.StringIO(stream)
+    elif isinstance(stream, bytes):
+        stream = io.BytesIO(stream)
+    if not isinstance(stream, io.TextIOBase):
+        # Decode ourselves so pandas never tries to close the request's stream
+        stream = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+
+    skip = range(1, skip_rows + 1) if skip_rows else None
+    for chunk in pd.read_csv(stream, chunksize=chunk_size, dtype=str, skipinitialspace=True, skiprows=skip):
+        missing = [name for name in FEATURES if name not in chunk.columns]
+        if missing:
+            raise ValueError(f"CSV is missing columns: {', '.join(missing)}")
+        yield chunk[FEATURES].reset_index(drop=True)
+
+
+def iter_frame_chunks(frame, chunk_size=CHUNK_SIZE):
+    for start in range(0, len(frame), chunk_size):
+        yield frame.iloc[start:start + chunk_size].reset_index(drop=True)
+
+
+def score_chunk(predict, frame, known_locations, offset=0, resolve=None, intervals=None):
+    """Score one chunk with a single vectorized predict call, yielding one result dict per row in order
+
+    predict takes a location/total_sqft/bath/bhk DataFrame and returns prices in lakhs
+    (pipe.predict or CompiledModel.predict_frame). With intervals (PredictionIntervals)
+    each priced row also gets a low/high range.
+    """
+    clean, errors = validate_frame(frame, known_locations, resolve)
+    valid = pd.isna(errors)
+    # Rows whose location was resolved to a differently spelled known one report which
+    given = frame['location'].astype(str).str.strip().to_numpy()
+    locations = clean['location'].to_numpy()
+
+    predictions = np.full(len(frame), np.nan)
+    low = high = None
+    if valid.any():
+        rows = clean.loc[valid, FEATURES]
+        lakhs = predict(rows)
+        predictions[valid] = lakhs * 1e5
+        if intervals is not None:
+            low, high = np.full(len(frame), np.nan), np.full(len(frame), np.nan)
+            low[valid], high[valid] = intervals.range(rows['location'].tolist(), rows['total_sqft'], lakhs)
+            low *= 1e5
+            high *= 1e5
+
+    for i in range(len(frame)):
+        if valid[i]:
+            result = {'row': offset + i, 'price': round(float(predictions[i]), 2)}
+            if locations[i] != given[i]:
+                result['location'] = locations[i]
+            if low is not None:
+                result['low'] = round(float(low[i]), 2)
+                result['high'] = round(float(high[i]), 2)
+            yield result
+        else:
+            yield {'row': offset + i, 'error': errors[i]}
+
+
+def stream_predictions(predict, chunks, known_locations, resolve=None, intervals=None):
+    """Yield a JSON array piece by piece, scoring the input chunk by chunk"""
+    yield '['
+    offset = 0
+    first = True
+    for chunk in chunks:
+        for result in score_chunk(predict, chunk, known_locations, offset, resolve, intervals):
+            yield ('' if first else ',') + json.dumps(result)
+            first = False
+        offset += len(chunk)
+    yield ']'
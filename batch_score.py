@@ -0,0 +1,255 @@
+"""Score a CSV of listings offline and write prices to CSV or Parquet.
+
+Reads location,total_sqft,bath,bhk rows in fixed-size chunks, scores them with
+RidgeModel.pki across a process pool and writes each chunk in input order as
+soon as it is done, so memory stays bounded by the chunks in flight:
+
+    python batch_score.py listings.csv prices.csv
+    python batch_score.py listings.csv prices.parquet --workers 8 --chunk-size 50000
+
+Prices are in rupees (pipe.predict * 1e5, as in main.py), with a low/high range
+from the model's residuals. Rows that fail
+validation get an empty price and an error message; misspelled locations are
+resolved to the closest known name, which is what the location column shows. Parquet output is a
+directory of part files, one per chunk, that pd.read_parquet reads as one table.
+
+Progress is checkpointed next to the output after every chunk; if a run dies,
+the same command picks up after the last chunk written.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import batch
+from location_resolver import LocationResolver
+from model_store import fit_intervals, load_artifact
+from prediction_cache import model_fingerprint
+from validation import validate_frame
+
+MODEL_PATH = 'RidgeModel.pki'
+CHUNK_SIZE = 100_000
+
+# Worker-process state, set once by the pool initializer instead of per task
+_predict = None
+_known = None
+_resolver = None
+_intervals = None
+
+
+def _init_worker(model_path):
+    global _predict, _known, _resolver, _intervals
+    pipe, model = load_artifact(model_path)
+    # Validate against the model's own vocabulary, so unknown locations become row errors
+    if model is not None:
+        _known = frozenset(model.location_index)
+    else:
+        encoder = pipe.steps[0][1].named_transformers_['onehotencoder']
+        _known = frozenset(str(name) for name in encoder.categories_[0])
+    _resolver = LocationResolver(_known)
+    _predict = pipe.predict if pipe is not None else model.predict_frame
+    # Price ranges: stored in .npz artifacts, fitted on Cleaned_data.csv for a pickle
+    _intervals = getattr(model, 'intervals', None)
+    if _intervals is None:
+        from dataset_cache import load_dataset
+        _intervals = fit_intervals(pipe, model, load_dataset())
+
+
+def _score(task):
+    """Score one chunk; returns the cleaned inputs with row, price, low, high and error columns"""
+    offset, chunk = task
+    clean, errors = validate_frame(chunk, _known, _resolver.resolve)
+    valid = pd.isna(errors)
+
+    prices = np.full(len(chunk), np.nan)
+    low, high = np.full(len(chunk), np.nan), np.full(len(chunk), np.nan)
+    if valid.any():
+        rows = clean.loc[valid, batch.FEATURES]
+        lakhs = _predict(rows)
+        prices[valid] = np.round(lakhs * 1e5, 2)
+        range_low, range_high = _intervals.range(rows['location'].tolist(), rows['total_sqft'], lakhs)
+        low[valid] = np.round(range_low * 1e5, 2)
+        high[valid] = np.round(range_high * 1e5, 2)
+
+    # Fixed dtypes, so every Parquet part has the same schema
+    result = clean[batch.FEATURES].astype(dict.fromkeys(batch.NUMERIC_FEATURES, np.float64))
+    result.insert(0, 'row', np.arange(offset, offset + len(chunk)))
+    result['price'] = prices
+    result['low'] = low
+    result['high'] = high
+    result['error'] = pd.array(errors, dtype='string')
+    return result
+
+
+class Checkpoint:
+    """Rows and chunks already written, saved atomically as <output>.progress.json"""
+
+    def __init__(self, output, identity):
+        self.path = output.rstrip(os.sep) + '.progress.json'
+        self.identity = identity
+        self.state = dict(identity, rows=0, chunks=0, bytes=0, done=False)
+
+    def load(self):
+        """Resume from a saved checkpoint; False if there is none for this exact job"""
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if any(state.get(key) != value for key, value in self.identity.items()):
+            return False
+        self.state = state
+        return True
+
+    def save(self, **changes):
+        self.state.update(changes)
+        tmp = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.path)
+
+
+class CsvWriter:
+    def __init__(self, path, resume_bytes):
+        if resume_bytes:
+            # Drop anything written after the last checkpoint
+            os.truncate(path, resume_bytes)
+            self.file = open(path, 'a', newline='')
+        else:
+            self.file = open(path, 'w', newline='')
+        self.header = not resume_bytes
+
+    def write(self, index, frame):
+        frame.to_csv(self.file, header=self.header, index=False)
+        self.header = False
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    def __init__(self, path, resume_chunks):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        # Parts past the checkpoint come from a run that died before recording them
+        for name in os.listdir(path):
+            if name.startswith('part-') and int(name[5:10]) >= resume_chunks:
+                os.remove(os.path.join(path, name))
+
+    def write(self, index, frame):
+        target = os.path.join(self.path, f'part-{index:05d}.parquet')
+        tmp = os.path.join(self.path, f'.part-{index:05d}.tmp')
+        frame.to_parquet(tmp, index=False)
+        os.replace(tmp, target)
+        return 0
+
+    def close(self):
+        pass
+
+
+def score_file(input_path, output_path, model_path=MODEL_PATH, chunk_size=CHUNK_SIZE, workers=None,
+               output_format=None, restart=False, progress=sys.stderr):
+    """Score input_path into output_path; returns the number of rows written"""
+    total_bytes = os.path.getsize(input_path)
+    output_format = output_format or ('parquet' if output_path.endswith(('.parquet', '.pq')) else 'csv')
+    identity = {
+        'input': os.path.abspath(input_path),
+        'input_version': list(model_fingerprint(input_path) or ()),
+        'model': os.path.abspath(model_path),
+        'model_version': list(model_fingerprint(model_path) or ()),
+        'chunk_size': chunk_size,
+        'format': output_format,
+    }
+    checkpoint = Checkpoint(output_path, identity)
+    resumed = not restart and checkpoint.load()
+    state = checkpoint.state
+    if resumed and state['done']:
+        print(f"{output_path} is already complete ({state['rows']} rows)", file=progress)
+        return state['rows']
+    if resumed:
+        print(f"Resuming after {state['rows']} rows ({state['chunks']} chunks)", file=progress)
+
+    if output_format == 'parquet':
+        writer = ParquetWriter(output_path, state['chunks'])
+    else:
+        writer = CsvWriter(output_path, state['bytes'] if resumed else 0)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_path,))
+    else:
+        _init_worker(model_path)
+
+    start = time.perf_counter()
+    rows = resumed_rows = state['rows']
+    chunks = state['chunks']
+    # Finished chunks are written strictly in order; cap how many are read ahead of the writer
+    pending = deque()
+    max_pending = 2 * workers
+
+    def write_next():
+        nonlocal rows, chunks
+        length, result, read = pending.popleft()
+        frame = result.result() if pool is not None else result
+        position = writer.write(chunks, frame)
+        rows += length
+        chunks += 1
+        checkpoint.save(rows=rows, chunks=chunks, bytes=position)
+
+        elapsed = time.perf_counter() - start
+        print(f"\r{rows:,} rows  {read:6.1%}  {(rows - resumed_rows) / max(elapsed, 1e-9):,.0f} rows/s",
+              end='', file=progress, flush=True)
+
+    try:
+        with open(input_path, 'rb') as source:
+            offset = rows
+            for chunk in batch.iter_csv_chunks(source, chunk_size, skip_rows=rows):
+                task = (offset, chunk)
+                offset += len(chunk)
+                # Share of the input read so far; the reader runs a little ahead of the rows written
+                read = min(source.tell() / total_bytes, 1.0) if total_bytes else 1.0
+                if pool is not None:
+                    pending.append((len(chunk), pool.submit(_score, task), read))
+                else:
+                    pending.append((len(chunk), _score(task), read))
+                while len(pending) >= max_pending:
+                    write_next()
+            while pending:
+                write_next()
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    checkpoint.save(done=True)
+    print(f"\nWrote {rows:,} rows to {output_path} in {time.perf_counter() - start:.1f}s", file=progress)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help="CSV with location,total_sqft,bath,bhk columns")
+    parser.add_argument('output', help="output .csv file or .parquet directory")
+    parser.add_argument('--model', default=MODEL_PATH, help="RidgeModel.pki or an exported .npz")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, help="process pool size (default: CPU count, 1 = no pool)")
+    parser.add_argument('--format', choices=['csv', 'parquet'], help="default: from the output extension")
+    parser.add_argument('--restart', action='store_true', help="ignore any saved progress and start over")
+    args = parser.parse_args()
+
+    score_file(args.input, args.output, args.model, args.chunk_size, args.workers, args.format, args.restart)
+
+
+if __name__ == '__main__':
+    main()
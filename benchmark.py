@@ -0,0 +1,289 @@
+"""Performance benchmarks for model loading, startup and prediction.
+
+Every metric is a duration in seconds, peak RSS in MB or a mean absolute
+error in lakhs (mae_*), so lower is better.
+Metrics listed in TARGETS also have an absolute budget the run must stay under.
+Results are written as JSON and can be compared against an earlier run:
+
+    python benchmark.py --output bench.json
+    python benchmark.py --compare bench.json --threshold 0.2
+
+Synthetic copies of Cleaned_data.csv at larger sizes (--scales) show how
+loading and per-location statistics grow with the dataset.
+"""
+import argparse
+import json
+import os
+import pickle
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+warnings.filterwarnings('ignore')
+
+DATA_PATH = 'Cleaned_data.csv'
+MODEL_PATH = 'RidgeModel.pki'
+FEATURES = ['location', 'total_sqft', 'bath', 'bhk']
+BATCH_SIZES = [1, 100, 10_000, 1_000_000]
+# Absolute budgets in seconds, checked on every run
+TARGETS = {
+    # Median Streamlit rerun after changing a widget, in the default view (market charts shown)
+    'streamlit_rerun': 0.15,
+}
+
+
+def timed(func, repeat=5):
+    """Best-of-repeat wall time of func()"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def per_call(func, calls=1000):
+    """Median time of a single func() call"""
+    times = np.empty(calls)
+    for i in range(calls):
+        start = time.perf_counter()
+        func()
+        times[i] = time.perf_counter() - start
+    return float(np.median(times))
+
+
+def cold(code, repeat=3):
+    """Best time for a fresh interpreter to run code; the code prints its own timing"""
+    best = float('inf')
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-W', 'ignore', '-c', code], capture_output=True,
+                             text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        best = min(best, float(out.stdout.strip().splitlines()[-1]))
+    return best
+
+
+def streamlit_rerun(runs=10):
+    """Median time to rerun streamlit_app.py after a BHK change, measured with AppTest.
+
+    The app is left in its default view, so the market charts are drawn on every rerun.
+    """
+    from streamlit.testing.v1 import AppTest
+    app = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'streamlit_app.py'),
+                            default_timeout=60).run()
+    times = np.empty(runs)
+    for i in range(runs):
+        app.number_input[0].set_value(2 + i % 3)
+        start = time.perf_counter()
+        app.run()
+        times[i] = time.perf_counter() - start
+    return float(np.median(times))
+
+
+def make_synthetic(data, rows, seed=0):
+    """Resample the dataset to `rows` listings with jittered sizes and prices"""
+    rng = np.random.default_rng(seed)
+    sample = data.iloc[rng.integers(0, len(data), rows)].reset_index(drop=True)
+    jitter = rng.uniform(0.9, 1.1, rows)
+    sample['total_sqft'] = np.round(sample['total_sqft'] * jitter)
+    sample['price'] = np.round(sample['price'] * jitter * rng.uniform(0.95, 1.05, rows), 2)
+    return sample
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def run(scales, quick=False):
+    from comparables import ComparablesIndex
+    from dataset_cache import load_dataset
+    from fallback import FallbackPredictor
+    from intervals import PredictionIntervals
+    from location_resolver import LocationPrefixIndex, LocationResolver
+    from location_stats import LocationStatsIndex
+    from price_grid import PriceGrid
+    from scoring import CompiledModel
+    from validation import validate_frame, validate_one
+
+    metrics = {}
+    repeat = 1 if quick else 3
+
+    # Startup
+    metrics['cold_import_main'] = cold(
+        "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)", repeat)
+    metrics['cold_streamlit_load'] = cold(
+        "import time; t = time.perf_counter()\n"
+        "import pickle\n"
+        "from dataset_cache import load_dataset\n"
+        "from location_stats import LocationStatsIndex\n"
+        "from scoring import compile_pipeline\n"
+        "data = load_dataset()\n"
+        "model = pickle.load(open('RidgeModel.pki', 'rb'))\n"
+        "compile_pipeline(model, data); LocationStatsIndex(data)\n"
+        "print(time.perf_counter() - t)", repeat)
+    metrics['cold_unpickle_model'] = cold(
+        "import time, pickle; t = time.perf_counter(); pickle.load(open('RidgeModel.pki', 'rb'));"
+        " print(time.perf_counter() - t)", repeat)
+
+    metrics['cold_load_npz_model'] = cold(
+        "import time; t = time.perf_counter()\n"
+        "from scoring import CompiledModel\n"
+        "CompiledModel.load('RidgeModel.npz')\n"
+        "print(time.perf_counter() - t)", repeat)
+
+    metrics['streamlit_rerun'] = streamlit_rerun(3 if quick else 10)
+
+    with open(MODEL_PATH, 'rb') as f:
+        raw = f.read()
+    pipe = pickle.loads(raw)
+    metrics['unpickle_model'] = timed(lambda: pickle.loads(raw), repeat)
+
+    data = load_dataset(DATA_PATH)
+    metrics['read_csv'] = timed(lambda: pd.read_csv(DATA_PATH), repeat)
+    metrics['load_dataset'] = timed(lambda: load_dataset(DATA_PATH), repeat)
+    metrics['location_stats'] = timed(lambda: LocationStatsIndex(data), repeat)
+
+    # Single-row latency
+    row = pd.DataFrame([['Whitefield', 1200.0, 2.0, 2.0]], columns=FEATURES)
+    compiled = CompiledModel.from_pipeline(pipe)
+    calls = 100 if quick else 1000
+    metrics['single_pipe_predict'] = per_call(lambda: pipe.predict(row), calls)
+    metrics['single_compiled_predict'] = per_call(lambda: compiled.predict_one('Whitefield', 1200, 2, 2), calls)
+    fallback = FallbackPredictor.from_data(data)
+    metrics['build_fallback'] = timed(lambda: FallbackPredictor.from_data(data), repeat)
+    metrics['single_fallback_predict'] = per_call(lambda: fallback.predict_one('Whitefield', 1200, 2, 2), calls)
+
+    # Price ranges: fitting from residuals once, then per-request lookups
+    metrics['fit_intervals'] = timed(lambda: PredictionIntervals.fit(compiled.predict_frame, data), repeat)
+    intervals = PredictionIntervals.fit(compiled.predict_frame, data)
+    metrics['single_price_range'] = per_call(lambda: intervals.range_one('Whitefield', 1200, 70.0), calls)
+
+    # What-if grid: one vectorized build per location, then lookups
+    metrics['build_price_grid'] = timed(lambda: PriceGrid.build(compiled.predict_frame, 'Whitefield'), repeat)
+    grid = PriceGrid.build(compiled.predict_frame, 'Whitefield')
+    metrics['price_grid_lookup'] = per_call(lambda: grid.price(1234, 2, 2), calls)
+
+    # Comparable listings: sorted-array index, then one lookup
+    metrics['build_comparables'] = timed(lambda: ComparablesIndex(data), repeat)
+    comparables = ComparablesIndex(data)
+    metrics['find_comparables'] = per_call(lambda: comparables.find('Whitefield', 1200, 2, 2, 5), calls)
+
+    # Location lookup for a misspelled name, bypassing the resolver's cache
+    resolver = LocationResolver(data['location'].unique())
+    metrics['resolve_location_uncached'] = per_call(lambda: resolver._resolve('Koramangla'), calls)
+    prefix_index = LocationPrefixIndex(data['location'].unique())
+    metrics['search_locations'] = per_call(lambda: prefix_index.search('b', 10), calls)
+
+    # Input validation, for a request that passes and one rejected on every field
+    known = frozenset(data['location'].unique())
+    metrics['validate_one'] = per_call(lambda: validate_one('Whitefield', '2', '2', '1200', known), calls)
+    metrics['validate_one_rejected'] = per_call(lambda: validate_one('Nowhere', 'abc', '0', '1e9', known), calls)
+
+    # Accuracy on the training rows, mean absolute error in lakhs
+    actual = data['price'].to_numpy(dtype=np.float64)
+    metrics['mae_pipe_lakhs'] = float(np.abs(pipe.predict(data[FEATURES]) - actual).mean())
+    metrics['mae_fallback_lakhs'] = float(np.abs(fallback.predict_frame(data) - actual).mean())
+
+    # Batch throughput
+    for size in BATCH_SIZES:
+        if quick and size > 10_000:
+            continue
+        frame = make_synthetic(data, size)[FEATURES]
+        frame['location'] = frame['location'].astype(str)
+        metrics[f'batch_pipe_predict_{size}'] = timed(lambda: pipe.predict(frame), repeat)
+        metrics[f'batch_compiled_predict_{size}'] = timed(lambda: compiled.predict_frame(frame), repeat)
+        metrics[f'batch_fallback_predict_{size}'] = timed(lambda: fallback.predict_frame(frame), repeat)
+        metrics[f'batch_validate_{size}'] = timed(lambda: validate_frame(frame, known), repeat)
+
+    # Scaling curves on synthetic datasets
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in scales:
+            path = os.path.join(tmp, f'synthetic_{rows}.csv')
+            make_synthetic(data, rows).to_csv(path)
+            metrics[f'scale_{rows}_read_csv'] = timed(lambda: pd.read_csv(path), 1)
+            metrics[f'scale_{rows}_build_cache'] = timed(lambda: load_dataset(path), 1)
+            metrics[f'scale_{rows}_load_dataset'] = timed(lambda: load_dataset(path), repeat)
+            scaled = load_dataset(path)
+            metrics[f'scale_{rows}_location_stats'] = timed(lambda: LocationStatsIndex(scaled), 1)
+            # Folding 100 ingested listings into the statistics, instead of rebuilding them
+            stats = LocationStatsIndex(scaled)
+            new_rows = make_synthetic(data, 100, seed=1)
+            metrics[f'scale_{rows}_append_100_listings'] = timed(lambda: stats.append(new_rows), 1)
+            index = ComparablesIndex(scaled)
+            metrics[f'scale_{rows}_find_comparables'] = per_call(lambda: index.find('Whitefield', 1200, 2, 2, 5), 100)
+
+    metrics['peak_rss_mb'] = peak_rss_mb()
+    return metrics
+
+
+def compare(current, baseline, threshold):
+    """Metrics that got slower than baseline by more than threshold (a fraction)"""
+    regressions = {}
+    for name, value in current.items():
+        old = baseline.get(name)
+        if old and value > old * (1 + threshold):
+            regressions[name] = {'baseline': old, 'current': value, 'change': value / old - 1}
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', help="write results to this JSON file")
+    parser.add_argument('--compare', help="baseline JSON from an earlier run")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed slowdown, e.g. 0.2 = 20%%")
+    parser.add_argument('--scales', type=int, nargs='*', default=[100_000, 1_000_000],
+                        help="synthetic dataset sizes")
+    parser.add_argument('--quick', action='store_true', help="fewer repeats and no 1M-row batch")
+    args = parser.parse_args()
+
+    metrics = run(args.scales, args.quick)
+    result = {
+        'meta': {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+        },
+        'metrics': metrics,
+        'targets': TARGETS,
+    }
+    try:
+        result['meta']['commit'] = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                                  text=True).stdout.strip()
+    except OSError:
+        pass
+
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+
+    failed = False
+    for name, budget in TARGETS.items():
+        if metrics.get(name, 0) > budget:
+            print(f"OVER TARGET {name}: {metrics[name]:.6g} > {budget:.6g}", file=sys.stderr)
+            failed = True
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['metrics']
+        regressions = compare(metrics, baseline, args.threshold)
+        for name, info in regressions.items():
+            print(f"REGRESSION {name}: {info['baseline']:.6g} -> {info['current']:.6g} "
+                  f"({info['change']:+.0%})", file=sys.stderr)
+        failed = failed or bool(regressions)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
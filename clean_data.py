@@ -0,0 +1,216 @@
+"""Regenerate Cleaned_data.csv from the raw Bengaluru listings.
+
+Applies the rules in cleaning.py in three stages, caching each one under
+.clean_cache/ so a rerun after a small change to the raw file only redoes
+the parts that changed:
+
+1. The raw CSV is read in fixed-size chunks and each chunk is parsed
+   (size -> bhk, total_sqft ranges, missing values) across a process pool.
+   Cached per chunk by the chunk's contents.
+2. Locations with few listings are folded into "other" and undersized homes
+   dropped; this needs the whole dataset's location counts, and is cheap.
+3. Locations are hashed into partitions and the per-location price-per-sqft
+   and BHK outlier passes run on each partition across the pool, as grouped
+   vectorized operations. Cached per partition by its contents, so new raw
+   rows only redo the partitions of the locations they touch.
+
+    python clean_data.py Bengaluru_House_Data.csv
+    python clean_data.py Bengaluru_House_Data.csv --output /tmp/Cleaned_data.csv --workers 4
+
+The output has the same layout as the shipped file (an unnamed index column,
+then location,total_sqft,bath,price,bhk, rows grouped by location), so
+load_dataset() and both apps read it unchanged. Listings added later with
+ingest.py live in their own segments and are not part of this file.
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import cleaning
+from dataset_cache import DATA_PATH
+
+CACHE_DIR = '.clean_cache'
+CHUNK_SIZE = 50_000
+PARTITIONS = 16
+# Bump when a cleaning rule changes so cached stages are recomputed
+RULES_VERSION = 1
+# Raw columns the rules read; anything else in the file is ignored
+RAW_COLUMNS = ['location', 'size', 'total_sqft', 'bath', 'price']
+
+
+def content_key(frame):
+    """Hash of a frame's values in order, ignoring its index"""
+    digest = hashlib.sha256(str(RULES_VERSION).encode())
+    digest.update(','.join(frame.columns).encode())
+    digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:32]
+
+
+def _normalize_chunk(task):
+    """Stage 1 for one raw chunk; the result is indexed by row position within the chunk"""
+    chunk, path = task
+    frame = cleaning.normalize(chunk.reset_index(drop=True))
+    frame.to_pickle(path + '.tmp')
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def _outlier_partition(task):
+    """Stage 3 for one partition: a keep mask aligned with its rows"""
+    frame, path = task
+    mask = cleaning.outlier_mask(frame)
+    np.save(path + '.tmp.npy', mask)
+    os.replace(path + '.tmp.npy', path)
+    return path
+
+
+def partition_of(locations, partitions=PARTITIONS):
+    """Partition number for each location name, stable across runs and processes"""
+    names = pd.unique(np.asarray(locations, dtype=object))
+    numbers = {name: zlib.crc32(str(name).encode()) % partitions for name in names}
+    return np.fromiter((numbers[name] for name in locations), dtype=np.int64, count=len(locations))
+
+
+class StageCache:
+    """Files for one cached stage, named by content key; unused ones are pruned after a run"""
+
+    def __init__(self, root, stage, suffix):
+        self.dir = os.path.join(root, stage)
+        self.suffix = suffix
+        self.used = set()
+        os.makedirs(self.dir, exist_ok=True)
+
+    def path(self, key):
+        name = key + self.suffix
+        self.used.add(name)
+        return os.path.join(self.dir, name)
+
+    def prune(self):
+        for name in os.listdir(self.dir):
+            if name not in self.used:
+                os.remove(os.path.join(self.dir, name))
+
+
+def clean_file(raw_path, output_path=DATA_PATH, chunk_size=CHUNK_SIZE, workers=None, partitions=PARTITIONS,
+               cache_dir=CACHE_DIR, progress=sys.stderr):
+    """Clean raw_path into output_path; returns (rows written, stages recomputed, stages reused)"""
+    start = time.perf_counter()
+    normalized_cache = StageCache(cache_dir, 'normalized', '.pkl')
+    outlier_cache = StageCache(cache_dir, 'outliers', '.npy')
+    if workers is None:
+        workers = os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    run = pool.submit if pool is not None else lambda func, task: _Done(func(task))
+    computed = reused = 0
+
+    try:
+        # Stage 1: parse raw chunks, reusing cached chunks with identical contents. Only a
+        # few raw chunks are held at once; parsed ones are much smaller.
+        pending = deque()
+        frames = []
+
+        def collect():
+            first_row, future, path = pending.popleft()
+            if future is not None:
+                future.result()
+            frame = pd.read_pickle(path)
+            # Row numbers in the raw file, to restore its order at the end
+            frame.index = frame.index + first_row
+            frames.append(frame)
+
+        offset = 0
+        for chunk in pd.read_csv(raw_path, chunksize=chunk_size, usecols=RAW_COLUMNS, dtype=str):
+            path = normalized_cache.path(content_key(chunk))
+            if os.path.exists(path):
+                reused += 1
+                pending.append((offset, None, path))
+            else:
+                computed += 1
+                pending.append((offset, run(_normalize_chunk, (chunk, path)), path))
+            offset += len(chunk)
+            while len(pending) > 2 * workers:
+                collect()
+        while pending:
+            collect()
+        normalized = pd.concat(frames) if frames else cleaning.normalize(pd.DataFrame(columns=RAW_COLUMNS))
+        print(f"Parsed {offset:,} raw rows into {len(normalized):,} complete listings", file=progress)
+
+        # Stage 2: location buckets need counts over the whole file
+        keep = cleaning.common_locations(normalized['location'])
+        bucketed = cleaning.bucket_locations(normalized, keep)
+        bucketed = bucketed[cleaning.plausible_size(bucketed)]
+
+        # Stage 3: outlier passes per location, on partitions of whole locations
+        numbers = partition_of(bucketed['location'].to_numpy(), partitions)
+        jobs = []
+        for number in range(partitions):
+            part = bucketed[numbers == number]
+            if part.empty:
+                continue
+            path = outlier_cache.path(content_key(part))
+            if os.path.exists(path):
+                reused += 1
+                jobs.append((part, None, path))
+            else:
+                computed += 1
+                jobs.append((part, run(_outlier_partition, (part, path)), path))
+        kept = []
+        for part, future, path in jobs:
+            if future is not None:
+                future.result()
+            kept.append(part[np.load(path)])
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    cleaned = pd.concat(kept) if kept else bucketed.iloc[:0]
+    # Grouped by location like the shipped file, raw order within each location
+    cleaned = cleaned.sort_index().sort_values('location', kind='stable')[cleaning.COLUMNS].reset_index(drop=True)
+
+    tmp = f'{output_path}.{os.getpid()}.tmp'
+    cleaned.to_csv(tmp)
+    os.replace(tmp, output_path)
+    normalized_cache.prune()
+    outlier_cache.prune()
+    print(f"Wrote {len(cleaned):,} listings in {cleaned['location'].nunique()} locations to {output_path} "
+          f"in {time.perf_counter() - start:.1f}s ({computed} stages computed, {reused} reused)", file=progress)
+    return len(cleaned), computed, reused
+
+
+class _Done:
+    """Stands in for a future when there is no pool"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def result(self):
+        return self.value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help="raw listings CSV (Bengaluru_House_Data.csv)")
+    parser.add_argument('--output', default=DATA_PATH)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, help="process pool size (default: CPU count, 1 = no pool)")
+    parser.add_argument('--partitions', type=int, default=PARTITIONS)
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--clear-cache', action='store_true', help="recompute every stage")
+    args = parser.parse_args()
+
+    if args.clear_cache:
+        shutil.rmtree(args.cache_dir, ignore_errors=True)
+    clean_file(args.input, args.output, args.chunk_size, args.workers, args.partitions, args.cache_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""Cleaning rules that turn raw Bengaluru listings into Cleaned_data.csv rows.
+
+Raw listings have the Kaggle "Bengaluru House Data" columns: location, size
+("2 BHK", "4 Bedroom"), total_sqft (a number, a "1133 - 1384" range, or a
+figure in other units), bath and price in lakhs. Every rule is vectorized
+over a DataFrame so it works the same on a whole file or a chunk of one.
+"""
+import numpy as np
+import pandas as pd
+
+COLUMNS = ['location', 'total_sqft', 'bath', 'price', 'bhk']
+# Bucket for locations with too few listings to model on their own
+OTHER = 'other'
+# Locations with at most this many raw listings are folded into OTHER
+RARE_LOCATION_LIMIT = 10
+# Smaller homes per bedroom are data-entry errors
+MIN_SQFT_PER_BHK = 300
+# A BHK group is an outlier against the next smaller one only when that has enough listings
+MIN_BHK_GROUP = 5
+
+
+def parse_total_sqft(values):
+    """Areas as floats: ranges become their midpoint, anything else that isn't a number NaN"""
+    text = pd.Series(values, copy=False).astype(str).str.strip()
+    parts = text.str.split(' - ', n=1, expand=True, regex=False)
+    low = pd.to_numeric(parts[0], errors='coerce')
+    if parts.shape[1] == 1:
+        return low.astype(np.float64)
+    high = pd.to_numeric(parts[1], errors='coerce')
+    return low.where(parts[1].isna(), (low + high) / 2).astype(np.float64)
+
+
+def parse_bhk(size):
+    """Bedroom count from size text such as "2 BHK" or "4 Bedroom"; NaN where there is none"""
+    digits = pd.Series(size, copy=False).astype(str).str.extract(r'^\s*(\d+)', expand=False)
+    return pd.to_numeric(digits, errors='coerce').astype(np.float64)
+
+
+def normalize(raw):
+    """Raw listings -> COLUMNS with parsed numbers, dropping incomplete rows.
+
+    Rows that already have a numeric bhk column (cleaned-format input) skip the
+    size parsing. Locations are stripped but not yet bucketed; the index is kept.
+    """
+    frame = pd.DataFrame(index=raw.index)
+    frame['location'] = raw['location'].astype(object).where(raw['location'].notna())
+    frame['location'] = frame['location'].str.strip()
+    frame['total_sqft'] = parse_total_sqft(raw['total_sqft'])
+    frame['bath'] = pd.to_numeric(raw['bath'], errors='coerce').astype(np.float64)
+    frame['price'] = pd.to_numeric(raw['price'], errors='coerce').astype(np.float64)
+    if 'bhk' in raw.columns:
+        frame['bhk'] = pd.to_numeric(raw['bhk'], errors='coerce').astype(np.float64)
+    else:
+        frame['bhk'] = parse_bhk(raw['size'])
+
+    frame = frame.dropna()
+    return frame[(frame['location'] != '') & (frame['bhk'] > 0) & (frame['price'] > 0)]
+
+
+def plausible_size(frame):
+    """Mask of rows with at least MIN_SQFT_PER_BHK per bedroom"""
+    return (frame['total_sqft'] / frame['bhk'] >= MIN_SQFT_PER_BHK).to_numpy()
+
+
+def common_locations(locations, limit=RARE_LOCATION_LIMIT):
+    """Locations with more than limit listings"""
+    counts = pd.Series(locations, copy=False).value_counts()
+    return set(counts.index[counts > limit])
+
+
+def bucket_locations(frame, keep):
+    """frame with every location outside keep replaced by OTHER"""
+    frame = frame.copy()
+    frame['location'] = frame['location'].where(frame['location'].isin(keep), OTHER)
+    return frame
+
+
+def _price_per_sqft(frame):
+    """Price per sqft in rupees"""
+    return frame['price'].to_numpy(dtype=np.float64) * 1e5 / frame['total_sqft'].to_numpy(dtype=np.float64)
+
+
+def price_per_sqft_bounds(frame):
+    """Per-location (low, high) price per sqft for raw listings: one standard deviation around the mean"""
+    grouped = pd.Series(_price_per_sqft(frame)).groupby(np.asarray(frame['location'], dtype=object), sort=False)
+    mean, std = grouped.mean(), grouped.std(ddof=0)
+    return pd.DataFrame({'low': mean - std, 'high': mean + std})
+
+
+def observed_price_bounds(cleaned):
+    """Per-location (low, high) price per sqft of an already cleaned dataset.
+
+    Cleaned rows are exactly the ones that were inside their location's band,
+    so their range is that band; a mean +- std of the cleaned rows would be
+    narrower and reject about a third of ordinary new listings.
+    """
+    grouped = pd.Series(_price_per_sqft(cleaned)).groupby(np.asarray(cleaned['location'], dtype=object), sort=False)
+    return pd.DataFrame({'low': grouped.min(), 'high': grouped.max()})
+
+
+def within_price_bounds(frame, bounds):
+    """Mask of rows whose price per sqft lies inside their location's bounds; other locations pass"""
+    location = np.asarray(frame['location'], dtype=object)
+    rate = _price_per_sqft(frame)
+    low = bounds['low'].reindex(location).to_numpy()
+    high = bounds['high'].reindex(location).to_numpy()
+    return np.isnan(low) | ((rate >= low) & (rate <= high))
+
+
+def bhk_stats(reference):
+    """Mean price per sqft and listing count for each (location, bhk)"""
+    keys = [np.asarray(reference['location'], dtype=object), reference['bhk'].to_numpy(dtype=np.float64)]
+    grouped = pd.Series(_price_per_sqft(reference)).groupby(keys, sort=False)
+    stats = pd.DataFrame({'mean': grouped.mean(), 'count': grouped.size()})
+    stats.index.names = ['location', 'bhk']
+    return stats
+
+
+def within_bhk_bounds(frame, stats):
+    """Mask of rows not cheaper per sqft than the average home one bedroom smaller in the same location.
+
+    A 3 BHK priced below the average 2 BHK around it is most likely mislabelled;
+    the comparison only applies when the smaller group has more than
+    MIN_BHK_GROUP listings.
+    """
+    smaller = stats[stats['count'] > MIN_BHK_GROUP]['mean']
+    # Shift the BHK level up by one so each row meets the group one bedroom smaller
+    smaller.index = smaller.index.set_levels(smaller.index.levels[1] + 1, level='bhk')
+    keys = pd.MultiIndex.from_arrays([np.asarray(frame['location'], dtype=object),
+                                      frame['bhk'].to_numpy(dtype=np.float64)])
+    floor = smaller.reindex(keys).to_numpy()
+    return np.isnan(floor) | (_price_per_sqft(frame) >= floor)
+
+
+def clean_new_listings(raw, reference):
+    """Clean raw listings against an existing cleaned dataset.
+
+    Locations outside the reference become OTHER, and the outlier rules use the
+    reference's per-location price ranges and BHK averages, so new rows are held
+    to the same standard as the rows already there without re-cleaning those.
+    """
+    frame = normalize(raw)
+    frame = frame[plausible_size(frame)]
+    keep = set(np.asarray(reference['location'], dtype=object)) - {OTHER}
+    frame = bucket_locations(frame, keep)
+    frame = frame[within_price_bounds(frame, observed_price_bounds(reference))]
+    frame = frame[within_bhk_bounds(frame, bhk_stats(reference))]
+    return frame[COLUMNS].reset_index(drop=True)
+
+
+def outlier_mask(frame):
+    """Mask of rows that survive the price-per-sqft and then the BHK outlier pass.
+
+    Both passes compare rows within their location, so frame must hold every
+    listing of each location in it, and no others are needed.
+    """
+    keep = within_price_bounds(frame, price_per_sqft_bounds(frame))
+    kept = frame[keep]
+    mask = np.zeros(len(frame), dtype=bool)
+    mask[np.flatnonzero(keep)[within_bhk_bounds(kept, bhk_stats(kept))]] = True
+    return mask
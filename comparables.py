@@ -0,0 +1,143 @@
+import copy
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Distance between listings: relative size difference plus per-room penalties, so a
+# 10% larger home counts about as much as a bathroom more, and less than a bedroom more
+BHK_WEIGHT = 0.25
+BATH_WEIGHT = 0.1
+# Listings on each side of the closest size that are ranked by full distance
+WINDOW = 64
+# Other locations consulted when the requested one has too few listings
+NEARBY_LOCATIONS = 3
+
+
+# One location's listings, sorted by size; rows are their positions in the dataset
+Listings = namedtuple('Listings', ['rows', 'sqft', 'bhk', 'bath', 'price'])
+
+
+class ComparablesIndex:
+    """The k most similar listings to a property, without scanning the dataset.
+
+    Each location's listings are kept as arrays sorted by size, so a lookup is
+    a binary search within the location followed by ranking a fixed window of
+    neighbours by size, BHK and bath: O(log n) however large the dataset
+    grows. Locations have no coordinates, so "nearby" locations are the ones
+    with the closest average price per sqft.
+    """
+
+    def __init__(self, data, window=WINDOW):
+        self.window = window
+        categories = pd.Categorical(data['location'])
+        codes = categories.codes
+        sqft = data['total_sqft'].to_numpy(dtype=np.float64)
+        prices = data['price'].to_numpy(dtype=np.float64)
+
+        # One sort for the whole dataset; each location's arrays are views of the sorted ones
+        order = np.lexsort((sqft, codes))
+        columns = Listings(order, sqft[order], data['bhk'].to_numpy(dtype=np.float64)[order],
+                           data['bath'].to_numpy(dtype=np.float64)[order], prices[order])
+        sorted_codes = codes[order]
+        names = [str(name) for name in categories.categories]
+        starts = np.searchsorted(sorted_codes, np.arange(len(names)), side='left')
+        ends = np.searchsorted(sorted_codes, np.arange(len(names)), side='right')
+        self.listings = {name: Listings(*(values[start:end] for values in columns))
+                         for name, start, end in zip(names, starts, ends) if end > start}
+
+        price_sums = np.bincount(codes, prices, len(names))
+        sqft_sums = np.bincount(codes, sqft, len(names))
+        self.sums = {name: (float(price_sums[code]), float(sqft_sums[code]))
+                     for code, name in enumerate(names) if name in self.listings}
+        self.nearby = self._rank_nearby()
+
+    def _rank_nearby(self):
+        """The other locations with the closest price per sqft, for each location"""
+        names = list(self.sums)
+        rate = np.array([price / max(sqft, 1e-9) for price, sqft in self.sums.values()])
+        nearby = {}
+        for code, name in enumerate(names):
+            ranked = np.argsort(np.abs(rate - rate[code]), kind='stable')
+            nearby[name] = [names[c] for c in ranked if c != code][:NEARBY_LOCATIONS]
+        return nearby
+
+    def with_rows(self, rows):
+        """A new index that also has rows (indexed by their positions in the dataset).
+
+        Only the locations rows fall in are re-sorted; the others' arrays are
+        shared with this index, which is left unchanged for readers still using it.
+        """
+        new = copy.copy(self)
+        new.listings = dict(self.listings)
+        new.sums = dict(self.sums)
+        locations = np.asarray(rows['location'], dtype=object)
+        for name, index in pd.Series(locations).groupby(locations, sort=False).indices.items():
+            name = str(name)
+            group = rows.iloc[index]
+            added = Listings(group.index.to_numpy(dtype=np.int64),
+                             *(group[column].to_numpy(dtype=np.float64) for column in ('total_sqft', 'bhk', 'bath', 'price')))
+            price_sum, sqft_sum = new.sums.get(name, (0.0, 0.0))
+            new.sums[name] = (price_sum + float(added.price.sum()), sqft_sum + float(added.sqft.sum()))
+            old = new.listings.get(name)
+            if old is not None:
+                added = Listings(*(np.concatenate(pair) for pair in zip(old, added)))
+            # Stable, so equal sizes stay in dataset order as in a full build
+            order = np.argsort(added.sqft, kind='stable')
+            new.listings[name] = Listings(*(values[order] for values in added))
+        new.nearby = new._rank_nearby()
+        return new
+
+    def _search(self, location, sqft, bhk, bath, k):
+        """(the location's listings, positions in them, distances) of its k closest listings"""
+        listings = self.listings[location]
+        centre = int(np.searchsorted(listings.sqft, sqft))
+        low, high = max(0, centre - self.window), min(len(listings.sqft), centre + self.window)
+
+        distance = (np.abs(np.log(listings.sqft[low:high] / sqft))
+                    + BHK_WEIGHT * np.abs(listings.bhk[low:high] - bhk)
+                    + BATH_WEIGHT * np.abs(listings.bath[low:high] - bath))
+        if len(distance) > k:
+            best = np.argpartition(distance, k)[:k]
+        else:
+            best = np.arange(len(distance))
+        best = best[np.argsort(distance[best], kind='stable')]
+        return listings, low + best, distance[best]
+
+    def find(self, location, sqft, bhk, bath, k=5):
+        """Up to k comparable listings, closest first, as a DataFrame with a distance column.
+
+        Tops up from nearby locations when the location has fewer than k listings;
+        same_location tells which rows came from the location itself. Unknown
+        locations get no rows. Prices are in lakhs, as in the dataset.
+        """
+        sqft, bhk, bath = float(sqft), float(bhk), float(bath)
+        if sqft <= 0:
+            raise ValueError("sqft must be positive")
+
+        found = []
+        wanted = k
+        searched = [location] + self.nearby.get(location, []) if location in self.listings else []
+        for name in searched:
+            listings, positions, distances = self._search(name, sqft, bhk, bath, wanted)
+            found.append((name, listings, positions, distances))
+            wanted -= len(positions)
+            if wanted <= 0:
+                break
+
+        # Built from the sorted arrays rather than data.iloc, which costs more than the search
+        def column(field):
+            parts = [getattr(listings, field)[positions] for _, listings, positions, _ in found]
+            return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64 if field == 'rows' else np.float64)
+
+        names = np.array([name for name, _, positions, _ in found for _ in range(len(positions))], dtype=object)
+        distances = np.concatenate([d for _, _, _, d in found]) if found else np.empty(0)
+        return pd.DataFrame({
+            'location': names,
+            'total_sqft': column('sqft'),
+            'bath': column('bath'),
+            'bhk': column('bhk'),
+            'price': column('price'),
+            'distance': distances,
+            'same_location': names == location,
+        }, index=pd.Index(column('rows'), name='row'))
@@ -0,0 +1,469 @@
+"""Shared data/model service for the Flask and Streamlit front ends.
+
+One process owns the dataset, the per-location statistics and market report,
+the comparables index and the model (with hot reload), and answers requests over a Unix
+socket. Front ends started with BHP_DATA_SERVICE=<socket path> talk to it
+instead of each loading their own copies:
+
+    python data_service.py --socket /tmp/bhp-data.sock
+    BHP_DATA_SERVICE=/tmp/bhp-data.sock gunicorn serve:app ...
+    BHP_DATA_SERVICE=/tmp/bhp-data.sock streamlit run streamlit_app.py
+
+Messages are length-prefixed JSON. A client may send several requests before
+reading any replies (pipelining); replies come back in request order.
+LocalService has the same methods (pipeline included) without the socket, for
+tests or a single process, and the Remote* adapters give either one the interface of the
+in-process objects (ModelStore, CompiledModel, LocationStatsIndex, ...).
+"""
+import argparse
+import asyncio
+import json
+import os
+import queue
+import socket
+import struct
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from model_store import LoadedModel
+
+DATA_PATH = 'Cleaned_data.csv'
+SOCKET_PATH = '/tmp/bhp-data.sock'
+# Connections each client keeps open for reuse
+POOL_SIZE = 8
+
+_HEADER = struct.Struct('>I')
+
+# Methods callable over the socket
+METHODS = ('info', 'locations', 'predict', 'predict_one', 'price_range', 'location_stats', 'city_stats',
+           'bhk_distribution', 'price_distribution', 'ranking', 'rows', 'comparables', 'insights')
+
+
+class ServiceError(RuntimeError):
+    pass
+
+
+def _encode(message):
+    body = json.dumps(message, default=_builtin).encode()
+    return _HEADER.pack(len(body)) + body
+
+
+def _builtin(value):
+    # NumPy scalars and arrays in results
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+class LocalService:
+    """The service's methods, run in this process; every result is plain JSON data"""
+
+    def __init__(self, data_path=DATA_PATH, check_interval=1.0):
+        from dataset_cache import load_dataset
+        from fallback import FallbackPredictor
+        from ingest import LiveListings
+        from model_store import ModelStore
+
+        self.data = load_dataset(data_path)
+        self.listings = LiveListings(self.data, path=data_path)
+        self.feed = self.listings.feed
+        self.stats = self.comparables_index = self.report = None
+        self.refresh()
+        self.store = ModelStore(data=self.data, check_interval=check_interval,
+                                fallback=FallbackPredictor.from_data(self.data))
+
+    def refresh(self):
+        """Fold in listings ingested since the last call; returns how many were added"""
+        before = self.stats.city['count'] if self.stats is not None else len(self.data)
+        # Only the locations new listings fall in are recomputed, so requests wait briefly if at all
+        self.stats, self.comparables_index, self.report = self.listings.snapshot()
+        return self.stats.city['count'] - before
+
+    def info(self):
+        loaded = self.store.current
+        return {
+            'model_path': loaded.path,
+            'model_version': loaded.version,
+            'coverage': None if loaded.intervals is None else loaded.intervals.coverage,
+            'rows': self.stats.city['count'],
+        }
+
+    def locations(self):
+        return self.stats.locations
+
+    def predict(self, locations, total_sqft, bath, bhk):
+        """Prices in lakhs for a batch of rows"""
+        return self.store.current.model.predict(locations, total_sqft, bath, bhk)
+
+    def predict_one(self, location, total_sqft, bath, bhk):
+        return self.store.current.model.predict_one(location, total_sqft, bath, bhk)
+
+    def price_range(self, locations, total_sqft, predictions):
+        intervals = self.store.current.intervals
+        if intervals is None:
+            return None
+        return intervals.range(locations, total_sqft, predictions)
+
+    def location_stats(self, location):
+        return self.stats.get(location)
+
+    def city_stats(self):
+        return self.stats.city
+
+    def bhk_distribution(self, location, top=5):
+        counts = self.stats.bhk_distribution(location, top)
+        return [[int(bhk), int(count)] for bhk, count in counts.items()]
+
+    def price_distribution(self, location):
+        if location not in self.stats.histograms:
+            return None
+        edges, counts = self.stats.histograms[location]
+        return {'edges': edges, 'counts': counts}
+
+    def ranking(self, n=10, top=True):
+        """Locations by average price, most expensive first when top is set"""
+        ranked = self.stats.top_locations(n) if top else self.stats.bottom_locations(n)
+        return [[location, price] for location, price in ranked.items()]
+
+    def rows(self, location, limit=None):
+        rows = self.stats.rows(location)
+        if limit is not None:
+            rows = rows.head(limit)
+        return {name: rows[name].to_numpy() for name in ('total_sqft', 'bath', 'bhk', 'price')}
+
+    def comparables(self, location, total_sqft, bhk, bath, k=5):
+        found = self.comparables_index.find(location, total_sqft, bhk, bath, k)
+        columns = {name: found[name].to_numpy() for name in found.columns}
+        columns['row'] = found.index.to_numpy()
+        return columns
+
+    def insights(self, location):
+        return self.report.get(location)
+
+    def pipeline(self, calls):
+        """DataServiceClient.pipeline, run in this process"""
+        for method, _ in calls:
+            if method not in METHODS:
+                raise ServiceError(f"Unknown method {method!r}")
+        return [getattr(self, method)(*args) for method, args in calls]
+
+
+def serve(service, path=SOCKET_PATH):
+    """Answer requests for service on a Unix socket until interrupted"""
+    async def handle(reader, writer):
+        try:
+            while True:
+                header = await reader.readexactly(_HEADER.size)
+                request = json.loads(await reader.readexactly(_HEADER.unpack(header)[0]))
+                try:
+                    if request['method'] not in METHODS:
+                        raise ServiceError(f"Unknown method {request['method']!r}")
+                    result = getattr(service, request['method'])(*request.get('args', ()),
+                                                                  **request.get('kwargs', {}))
+                    reply = {'result': result}
+                except Exception as e:
+                    reply = {'error': str(e), 'type': type(e).__name__}
+                writer.write(_encode(reply))
+                # Replies to pipelined requests are flushed together once the buffer backs up
+                if writer.transport.get_write_buffer_size() > 65536:
+                    await writer.drain()
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            writer.close()
+
+    async def main():
+        if os.path.exists(path):
+            os.remove(path)
+        server = await asyncio.start_unix_server(handle, path)
+        print(f"Data service listening on {path}", file=sys.stderr)
+        # New listings are folded in on the event loop, between requests, so no
+        # request sees half-updated statistics
+        async def refresh():
+            while True:
+                await asyncio.sleep(service.feed.check_interval)
+                service.refresh()
+        refresher = asyncio.get_running_loop().create_task(refresh())
+        async with server:
+            await server.serve_forever()
+        refresher.cancel()
+
+    service.store.watch()
+    try:
+        asyncio.run(main())
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class DataServiceClient:
+    """Thread-safe client with a pool of persistent connections.
+
+    Calling any name in METHODS sends one request; pipeline() sends several
+    on one connection before reading the replies. Every method is read-only,
+    so a call that fails on a stale connection is retried once on a new one.
+    """
+
+    def __init__(self, path=SOCKET_PATH, pool_size=POOL_SIZE, timeout=10.0):
+        self.path = path
+        self.timeout = timeout
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.path)
+        return sock
+
+    def _read(self, sock, size):
+        buffer = bytearray()
+        while len(buffer) < size:
+            chunk = sock.recv(size - len(buffer))
+            if not chunk:
+                raise ConnectionError("Data service closed the connection")
+            buffer += chunk
+        return bytes(buffer)
+
+    def _exchange(self, sock, payload, count):
+        sock.sendall(payload)
+        replies = []
+        for _ in range(count):
+            size = _HEADER.unpack(self._read(sock, _HEADER.size))[0]
+            replies.append(json.loads(self._read(sock, size)))
+        return replies
+
+    def pipeline(self, calls):
+        """Run [(method, args), ...] over one connection; returns the results in order"""
+        payload = b''.join(_encode({'method': method, 'args': list(args)}) for method, args in calls)
+        for attempt in range(2):
+            try:
+                sock = self._pool.get_nowait()
+            except queue.Empty:
+                sock = self._connect()
+            try:
+                replies = self._exchange(sock, payload, len(calls))
+            except OSError:
+                sock.close()
+                if attempt:
+                    raise
+                continue
+            try:
+                self._pool.put_nowait(sock)
+            except queue.Full:
+                sock.close()
+            break
+
+        results = []
+        for reply in replies:
+            if 'error' in reply:
+                # Keep the server-side ValueError (bad input, unknown location) catchable as one
+                raise (ValueError if reply.get('type') == 'ValueError' else ServiceError)(reply['error'])
+            results.append(reply['result'])
+        return results
+
+    def call(self, method, *args):
+        return self.pipeline([(method, args)])[0]
+
+    def __getattr__(self, name):
+        if name not in METHODS:
+            raise AttributeError(name)
+        return lambda *args: self.call(name, *args)
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def connect(path=None):
+    """A client for BHP_DATA_SERVICE (or path), or None when no service is configured"""
+    path = path or os.environ.get('BHP_DATA_SERVICE')
+    return DataServiceClient(path) if path else None
+
+
+def _list(values):
+    return values.tolist() if isinstance(values, (np.ndarray, pd.Series, pd.Index)) else list(values)
+
+
+class RemoteModel:
+    """CompiledModel's predict methods, answered by the service's current model"""
+
+    def __init__(self, service):
+        self.service = service
+
+    def predict(self, locations, total_sqft, bath, bhk):
+        return np.asarray(self.service.predict(_list(locations), _list(total_sqft), _list(bath), _list(bhk)),
+                          dtype=np.float64)
+
+    def predict_one(self, location, total_sqft, bath, bhk):
+        return self.service.predict_one(location, float(total_sqft), float(bath), float(bhk))
+
+    def predict_frame(self, frame):
+        return self.predict(frame['location'].astype(str).tolist(), frame['total_sqft'], frame['bath'], frame['bhk'])
+
+
+class RemoteIntervals:
+    """PredictionIntervals' range methods, answered by the service"""
+
+    def __init__(self, service, coverage):
+        self.service = service
+        self.coverage = coverage
+
+    def range(self, locations, total_sqft, predictions):
+        low, high = self.service.price_range(_list(locations), _list(total_sqft), _list(predictions))
+        return np.asarray(low, dtype=np.float64), np.asarray(high, dtype=np.float64)
+
+    def range_one(self, location, total_sqft, prediction):
+        low, high = self.service.price_range([location], [float(total_sqft)], [float(prediction)])
+        return low[0], high[0]
+
+
+class RemoteStore:
+    """ModelStore's interface for a model that lives in the service.
+
+    check() polls the service's model version at most once per check_interval
+    and notifies listeners when it changes, so caches keyed on the version
+    are invalidated just as with a local ModelStore.
+    """
+
+    def __init__(self, service, check_interval=1.0):
+        self.service = service
+        self.check_interval = check_interval
+        self.listeners = []
+        self._last_check = time.monotonic()
+        self._watcher = None
+        # Rows in the service's dataset as of the last check; moves when listings are ingested
+        self.data_version = None
+        self.current = self._snapshot(service.info())
+
+    def _snapshot(self, info):
+        self.data_version = info['rows']
+        version = tuple(info['model_version']) if info['model_version'] else None
+        intervals = RemoteIntervals(self.service, info['coverage']) if info['coverage'] else None
+        return LoadedModel(None, RemoteModel(self.service), info['model_path'], version, intervals)
+
+    def reload(self):
+        loaded = self._snapshot(self.service.info())
+        changed = (loaded.path, loaded.version) != (self.current.path, self.current.version)
+        self.current = loaded
+        if changed:
+            for listener in self.listeners:
+                listener(loaded)
+        return loaded
+
+    def check(self):
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return self.current
+        self._last_check = now
+        try:
+            return self.reload()
+        except (OSError, ServiceError) as e:
+            print(f"Data service check failed: {e}", file=sys.stderr)
+            return self.current
+
+    def watch(self):
+        if self._watcher is None or not self._watcher.is_alive():
+            def run():
+                while True:
+                    time.sleep(self.check_interval)
+                    self.check()
+            self._watcher = threading.Thread(target=run, name='data-service-watcher', daemon=True)
+            self._watcher.start()
+
+
+class RemoteStats:
+    """The parts of LocationStatsIndex the front ends use, answered by the service.
+
+    City totals, the location list and the rankings are fetched in one
+    pipeline() round trip when it is created, and each location's stats the
+    first time they are asked for; all of them are kept, so make a new
+    RemoteStats when the service's data version (row count) changes.
+    """
+
+    def __init__(self, service, ranked=10):
+        self.service = service
+        self.city, self.locations, top, bottom = service.pipeline([
+            ('city_stats', ()), ('locations', ()), ('ranking', (ranked, True)), ('ranking', (ranked, False))])
+        self._ranked = ranked
+        self._ranking = {True: top, False: bottom}
+        self._stats = {}
+
+    def get(self, location):
+        if location not in self._stats:
+            self._stats[location] = self.service.location_stats(location)
+        return self._stats[location]
+
+    def rows(self, location, limit=None):
+        return pd.DataFrame(self.service.rows(location, limit))
+
+    def bhk_distribution(self, location, top=5):
+        pairs = self.service.bhk_distribution(location, top)
+        return pd.Series([count for _, count in pairs], index=[bhk for bhk, _ in pairs], dtype=int)
+
+    def price_distribution(self, location):
+        histogram = self.service.price_distribution(location)
+        if histogram is None:
+            return pd.Series(dtype=int)
+        return pd.Series(histogram['counts'], index=pd.IntervalIndex.from_breaks(histogram['edges'], closed='right'))
+
+    def top_locations(self, n=10):
+        return self._ranked_series(n, True)
+
+    def bottom_locations(self, n=10):
+        return self._ranked_series(n, False)
+
+    def _ranked_series(self, n, top):
+        ranked = self._ranking[top][:n] if n <= self._ranked else self.service.ranking(n, top)
+        return pd.Series(dict(ranked), dtype=float)
+
+
+class RemoteComparables:
+    """ComparablesIndex.find, answered by the service"""
+
+    def __init__(self, service):
+        self.service = service
+
+    def find(self, location, sqft, bhk, bath, k=5):
+        columns = self.service.comparables(location, float(sqft), float(bhk), float(bath), k)
+        rows = columns.pop('row')
+        return pd.DataFrame(columns, index=pd.Index(rows, name='row'))
+
+
+class RemoteReport:
+    """MarketReport.get, answered by the service.
+
+    With keep set, entries are kept once read, as RemoteStats does, for a
+    report tied to one data version; otherwise every call asks the service.
+    """
+
+    def __init__(self, service, keep=False):
+        self.service = service
+        self._insights = {} if keep else None
+
+    def get(self, location):
+        if self._insights is None:
+            return self.service.insights(location)
+        if location not in self._insights:
+            self._insights[location] = self.service.insights(location)
+        return self._insights[location]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--socket', default=os.environ.get('BHP_DATA_SERVICE', SOCKET_PATH))
+    parser.add_argument('--data', default=DATA_PATH)
+    args = parser.parse_args()
+    serve(LocalService(args.data), args.socket)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: no build lock, so old versions are left in place
+    fcntl = None
+
+DATA_PATH = 'Cleaned_data.csv'
+CACHE_DIR = '.dataset_cache'
+MANIFEST = 'manifest.json'
+LOCK = 'build.lock'
+
+# Bump when the on-disk layout changes so old caches are rebuilt
+FORMAT_VERSION = 1
+
+COLUMNS = ['location', 'total_sqft', 'bath', 'price', 'bhk']
+
+
+def file_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _smallest_int(values):
+    """int8/int16 if every value is a whole number that fits, otherwise float32"""
+    if len(values) and np.all(np.isfinite(values)) and np.all(values == np.round(values)):
+        for dtype in (np.int8, np.int16):
+            info = np.iinfo(dtype)
+            if values.min() >= info.min and values.max() <= info.max:
+                return values.astype(dtype)
+    return values.astype(np.float32)
+
+
+def build_cache(path=DATA_PATH, cache_dir=None):
+    """Convert the CSV into one .npy file per column and return the cache directory"""
+    cache_dir = cache_dir or _default_cache_dir(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    with _build_lock(cache_dir) as locked:
+        _build(path, cache_dir, locked)
+    return cache_dir
+
+
+def _build(path, cache_dir, locked):
+    stat = os.stat(path)
+    digest = file_hash(path)
+
+    # The leading unnamed column is just the old DataFrame index
+    frame = pd.read_csv(path, index_col=0)
+    locations = pd.Categorical(frame['location'].astype(str))
+    codes = locations.codes.astype(np.int16 if len(locations.categories) < 2 ** 15 else np.int32)
+
+    columns = {
+        'location': codes,
+        'total_sqft': frame['total_sqft'].to_numpy(dtype=np.float32),
+        'bath': _smallest_int(frame['bath'].to_numpy(dtype=np.float64)),
+        'price': frame['price'].to_numpy(dtype=np.float32),
+        'bhk': _smallest_int(frame['bhk'].to_numpy(dtype=np.float64)),
+    }
+
+    # Write into a fresh version directory, then swap the manifest so readers
+    # never see a half-written cache
+    version_dir = tempfile.mkdtemp(prefix=digest[:16] + '-', dir=cache_dir)
+    for name, values in columns.items():
+        np.save(os.path.join(version_dir, name + '.npy'), values)
+    with open(os.path.join(version_dir, 'categories.json'), 'w') as f:
+        json.dump([str(c) for c in locations.categories], f)
+    os.chmod(version_dir, 0o755)
+
+    manifest = {
+        'format': FORMAT_VERSION,
+        'source': os.path.abspath(path),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': digest,
+        'rows': len(frame),
+        'version_dir': os.path.basename(version_dir),
+    }
+    _write_manifest(cache_dir, manifest)
+    if locked:
+        _remove_stale_versions(cache_dir, manifest['version_dir'])
+
+
+def load_dataset(path=DATA_PATH, cache_dir=None):
+    """Load the cleaned dataset from its memory-mapped columnar cache.
+
+    The cache is (re)built when missing or when the CSV's contents changed.
+    Numeric columns are read-only memory maps, so worker processes share the
+    same pages; location comes back as a categorical column.
+    """
+    cache_dir = cache_dir or _default_cache_dir(path)
+    manifest = _read_manifest(cache_dir)
+    if not _is_fresh(manifest, path, cache_dir):
+        os.makedirs(cache_dir, exist_ok=True)
+        with _build_lock(cache_dir) as locked:
+            # Another process may have finished the build while this one waited
+            manifest = _read_manifest(cache_dir)
+            if not _is_fresh(manifest, path, cache_dir):
+                _build(path, cache_dir, locked)
+                manifest = _read_manifest(cache_dir)
+
+    version_dir = os.path.join(cache_dir, manifest['version_dir'])
+    with open(os.path.join(version_dir, 'categories.json')) as f:
+        categories = json.load(f)
+
+    arrays = {name: np.load(os.path.join(version_dir, name + '.npy'), mmap_mode='r') for name in COLUMNS}
+    location = pd.Categorical.from_codes(arrays.pop('location'), categories=categories, validate=False)
+    return pd.DataFrame({'location': location, **arrays}, columns=COLUMNS, copy=False)
+
+
+def append_rows(data, rows):
+    """data with rows (COLUMNS, e.g. ingested listings) added, keeping its compact dtypes.
+
+    location stays categorical, with any new names added as categories. Float
+    columns stay float32 (as build_cache stores them) and integer ones keep
+    their dtype when the new values are whole numbers that fit.
+    """
+    rows = rows[list(data.columns)]
+    if isinstance(data['location'].dtype, pd.CategoricalDtype):
+        known = set(data['location'].cat.categories)
+        new = [name for name in pd.unique(np.asarray(rows['location'], dtype=object)) if name not in known]
+        if new:
+            data = data.assign(location=data['location'].cat.add_categories(new))
+        rows = rows.assign(location=pd.Categorical(np.asarray(rows['location'], dtype=object),
+                                                   dtype=data['location'].dtype))
+    for name in data.columns:
+        dtype = data[name].dtype
+        if name != 'location' and rows[name].dtype != dtype:
+            values = rows[name].to_numpy()
+            cast = values.astype(dtype)
+            if np.issubdtype(dtype, np.floating) or np.array_equal(cast, values):
+                rows = rows.assign(**{name: cast})
+    return pd.concat([data, rows])
+
+
+def _default_cache_dir(path):
+    folder, name = os.path.split(os.path.abspath(path))
+    return os.path.join(folder, CACHE_DIR, os.path.splitext(name)[0])
+
+
+def _read_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(cache_dir, manifest):
+    fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(cache_dir, MANIFEST))
+
+
+def _is_fresh(manifest, path, cache_dir):
+    if not manifest or manifest.get('format') != FORMAT_VERSION:
+        return False
+    if not os.path.isdir(os.path.join(cache_dir, manifest['version_dir'])):
+        return False
+
+    stat = os.stat(path)
+    if stat.st_mtime_ns == manifest['mtime_ns'] and stat.st_size == manifest['size']:
+        return True
+
+    # mtime moved (e.g. a fresh checkout); only rebuild if the bytes changed too
+    if stat.st_size == manifest['size'] and file_hash(path) == manifest['sha256']:
+        manifest['mtime_ns'] = stat.st_mtime_ns
+        _write_manifest(cache_dir, manifest)
+        return True
+    return False
+
+
+@contextlib.contextmanager
+def _build_lock(cache_dir):
+    """Hold the cache's build lock; yields False where file locks are unavailable"""
+    if fcntl is None:
+        yield False
+        return
+    with open(os.path.join(cache_dir, LOCK), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _remove_stale_versions(cache_dir, keep):
+    """Delete version directories older than keep; only called with the build lock held"""
+    kept = os.stat(os.path.join(cache_dir, keep)).st_mtime_ns
+    for entry in os.scandir(cache_dir):
+        if entry.name != keep and entry.is_dir() and entry.stat().st_mtime_ns < kept:
+            # Processes still mapping old files keep them alive until they exit
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    print(f"Cache written to {build_cache()}")
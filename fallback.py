@@ -0,0 +1,68 @@
+import numpy as np
+
+# Price adjustment per bedroom / bathroom away from the 2 BHK, 2 bath baseline
+BHK_STEP = 0.15
+BATH_STEP = 0.1
+
+
+class FallbackPredictor:
+    """Price-per-sqft estimator used when no model artifact can be loaded.
+
+    A prediction is total_sqft * price_per_sqft[location] scaled by linear
+    BHK and bathroom factors; locations without listings use the city-wide
+    rate. It has the same predict / predict_one / predict_frame interface as
+    CompiledModel and also returns lakhs, so callers can swap one for the other.
+    """
+
+    def __init__(self, location_index, price_per_sqft, city_price_per_sqft, bhk_step=BHK_STEP, bath_step=BATH_STEP):
+        self.location_index = location_index
+        # The last slot holds the city-wide rate, which unknown locations map to
+        self.price_per_sqft = np.append(np.asarray(price_per_sqft, dtype=np.float64), city_price_per_sqft)
+        self.city_price_per_sqft = float(city_price_per_sqft)
+        self.bhk_step = bhk_step
+        self.bath_step = bath_step
+
+    @classmethod
+    def from_stats(cls, stats, **kwargs):
+        """Build from a LocationStatsIndex, reusing its per-location sums"""
+        table = stats.table
+        location_index = {str(name): i for i, name in enumerate(table.index)}
+        return cls(location_index, table['price_per_sqft'].to_numpy(), stats.city['price_per_sqft'], **kwargs)
+
+    @classmethod
+    def from_data(cls, data, **kwargs):
+        """Build straight from listings with location, total_sqft and price columns"""
+        sums = (data[['price', 'total_sqft']].astype(np.float64)
+                .groupby(data['location'].astype(str), sort=True).sum())
+        location_index = {name: i for i, name in enumerate(sums.index)}
+        city = sums['price'].sum() / sums['total_sqft'].sum()
+        return cls(location_index, (sums['price'] / sums['total_sqft']).to_numpy(), city, **kwargs)
+
+    def location_codes(self, locations):
+        """Map location names to rows of the rate table; unknown names get the city-wide row"""
+        get = self.location_index.get
+        city = len(self.price_per_sqft) - 1
+        return np.fromiter((get(name, city) for name in locations), dtype=np.int64, count=len(locations))
+
+    def predict(self, locations, total_sqft, bath, bhk):
+        """Score a batch; returns prices in lakhs"""
+        rate = self.price_per_sqft[self.location_codes(locations)]
+        bhk_factor = 1 + (np.asarray(bhk, dtype=np.float64) - 2) * self.bhk_step
+        bath_factor = 1 + (np.asarray(bath, dtype=np.float64) - 2) * self.bath_step
+        return np.asarray(total_sqft, dtype=np.float64) * rate * bhk_factor * bath_factor
+
+    def predict_one(self, location, total_sqft, bath, bhk):
+        code = self.location_index.get(location)
+        rate = self.city_price_per_sqft if code is None else self.price_per_sqft[code]
+        return (float(total_sqft) * rate
+                * (1 + (float(bhk) - 2) * self.bhk_step)
+                * (1 + (float(bath) - 2) * self.bath_step))
+
+    def predict_frame(self, frame):
+        """Drop-in for pipe.predict on a DataFrame with location/total_sqft/bath/bhk columns"""
+        return self.predict(
+            frame['location'].astype(str).tolist(),
+            frame['total_sqft'].to_numpy(),
+            frame['bath'].to_numpy(),
+            frame['bhk'].to_numpy(),
+        )
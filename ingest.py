@@ -0,0 +1,189 @@
+"""Append new listings to the dataset without rewriting Cleaned_data.csv.
+
+New listings are cleaned with the rules in cleaning.py (checked against the
+listings already there) and written as one immutable segment file per batch
+in Cleaned_data.segments/. Running apps poll that directory and fold new
+segments into their aggregates, so nothing has to restart:
+
+    python ingest.py new_listings.csv
+
+Raw input can be in the original Kaggle format (size, total_sqft ranges, ...)
+or already have the cleaned columns.
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from cleaning import COLUMNS, clean_new_listings
+from dataset_cache import DATA_PATH, append_rows, load_dataset
+
+SUFFIX = '.csv'
+
+
+class SegmentStore:
+    """Append-only directory of cleaned listing segments next to the dataset CSV.
+
+    Segments are numbered in write order and never modified; each is written to
+    a temporary file and renamed into place, so readers see whole segments only.
+    """
+
+    def __init__(self, path=DATA_PATH, segment_dir=None):
+        self.segment_dir = segment_dir or os.path.splitext(os.path.abspath(path))[0] + '.segments'
+
+    def segments(self):
+        """Segment file names in the order they were written"""
+        try:
+            names = os.listdir(self.segment_dir)
+        except FileNotFoundError:
+            return []
+        return sorted(name for name in names if name.endswith(SUFFIX))
+
+    def append(self, rows):
+        """Write rows (COLUMNS) as a new segment and return its name"""
+        os.makedirs(self.segment_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.segment_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', newline='') as f:
+            rows[COLUMNS].to_csv(f, index=False)
+        # Retry on a name clash, in case another writer took the next number first
+        while True:
+            existing = self.segments()
+            number = int(existing[-1][:-len(SUFFIX)]) + 1 if existing else 1
+            name = f'{number:08d}{SUFFIX}'
+            try:
+                os.link(tmp, os.path.join(self.segment_dir, name))
+            except FileExistsError:
+                continue
+            os.remove(tmp)
+            return name
+
+    def read(self, names):
+        """The rows of the given segments, concatenated in order"""
+        if not names:
+            return pd.DataFrame({name: pd.Series(dtype=object if name == 'location' else np.float64)
+                                 for name in COLUMNS})
+        frames = [pd.read_csv(os.path.join(self.segment_dir, name), dtype={'location': str}) for name in names]
+        return pd.concat(frames, ignore_index=True)[COLUMNS]
+
+
+class ListingFeed:
+    """Hands out each segment's rows once, for folding into in-memory aggregates"""
+
+    def __init__(self, store=None, check_interval=5.0):
+        self.store = store or SegmentStore()
+        self.check_interval = check_interval
+        self.seen = set()
+        self.listeners = []
+        self._mtime = None
+        self._lock = threading.Lock()
+        self._watcher = None
+
+    def poll(self):
+        """Rows from segments not returned before (an empty frame when there are none)"""
+        with self._lock:
+            # The directory's mtime changes whenever a segment is renamed into it
+            try:
+                mtime = os.stat(self.store.segment_dir).st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+            if mtime is not None and mtime == self._mtime:
+                return self.store.read([])
+            self._mtime = mtime
+            new = [name for name in self.store.segments() if name not in self.seen]
+            rows = self.store.read(new)
+            self.seen.update(new)
+            return rows
+
+    def check(self):
+        """Poll once and pass any new rows to the listeners"""
+        rows = self.poll()
+        if len(rows):
+            for listener in self.listeners:
+                listener(rows)
+        return len(rows)
+
+    def watch(self):
+        """Poll from a daemon thread instead of on requests"""
+        if self._watcher is None or not self._watcher.is_alive():
+            def run():
+                while True:
+                    time.sleep(self.check_interval)
+                    self.check()
+            self._watcher = threading.Thread(target=run, name='listing-feed', daemon=True)
+            self._watcher.start()
+
+
+class LiveListings:
+    """Statistics, comparables and market report for the dataset, kept current with a feed.
+
+    Meant to be shared between threads (e.g. Streamlit sessions). snapshot()
+    folds in new segments by building updated copies of the three, which only
+    recomputes the locations the new listings fall in, and swaps them in
+    together under a lock. A reader keeps the tuple it got, so it never sees
+    an index half-way through an update.
+    """
+
+    def __init__(self, data, feed=None, path=DATA_PATH):
+        from comparables import ComparablesIndex
+        from location_stats import LocationStatsIndex
+        from market_report import load_or_build
+
+        self.feed = feed or ListingFeed(SegmentStore(path))
+        stats = LocationStatsIndex(data)
+        self._current = (stats, ComparablesIndex(stats.data), load_or_build(stats.data, path))
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        """(LocationStatsIndex, ComparablesIndex, MarketReport) including every segment so far"""
+        with self._lock:
+            rows = self.feed.poll()
+            if len(rows):
+                self._current = self._add(rows)
+            return self._current
+
+    def _add(self, rows):
+        stats, comparables, report = self._current
+        stats = stats.with_rows(rows)
+        # The appended rows, indexed by their positions in stats.data
+        added = stats.data.iloc[len(stats.data) - len(rows):]
+        touched = pd.unique(np.asarray(added['location'], dtype=object))
+        report = report.updated(pd.concat([stats.rows(location) for location in touched]))
+        return stats, comparables.with_rows(added), report
+
+
+def load_listings(path=DATA_PATH, feed=None):
+    """The dataset plus every ingested segment so far; feed, if given, skips those segments from now on"""
+    data = load_dataset(path)
+    feed = feed or ListingFeed(SegmentStore(path))
+    rows = feed.poll()
+    if not len(rows):
+        return data
+    return append_rows(data, rows).reset_index(drop=True)
+
+
+def ingest(raw, path=DATA_PATH):
+    """Clean raw listings and append the survivors as one segment; returns (segment name or None, rows kept)"""
+    reference = load_listings(path)
+    rows = clean_new_listings(raw, reference)
+    if not len(rows):
+        return None, 0
+    return SegmentStore(path).append(rows), len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help="CSV of new listings")
+    parser.add_argument('--data', default=DATA_PATH, help="dataset the listings are added to")
+    args = parser.parse_args()
+
+    raw = pd.read_csv(args.input, dtype={'location': str})
+    name, kept = ingest(raw, args.data)
+    print(f"Kept {kept} of {len(raw)} listings" + (f" in segment {name}" if name else ""))
+
+
+if __name__ == '__main__':
+    main()
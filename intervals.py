@@ -0,0 +1,79 @@
+import numpy as np
+
+FEATURES = ['location', 'total_sqft', 'bath', 'bhk']
+# Share of listings the range should contain: the 10th to 90th percentile of residuals
+COVERAGE = 0.8
+# Listings a location needs before its own residuals count as much as the city-wide ones
+PRIOR_COUNT = 20
+
+
+class PredictionIntervals:
+    """Price ranges from residual quantiles, with no refitting.
+
+    Residuals (actual - predicted price) are taken per sqft, so a range widens
+    with the size of the home; on held-out rows this keeps coverage close to
+    COVERAGE for small and large homes alike. Each location's quantiles are
+    shrunk towards the city-wide ones by n / (n + PRIOR_COUNT), so locations
+    with few listings don't get ranges from a handful of rows.
+    """
+
+    def __init__(self, location_index, low, high, global_low, global_high, coverage=COVERAGE):
+        self.location_index = location_index
+        # The last slot holds the city-wide quantiles, which unknown locations map to
+        self.low = np.append(np.asarray(low, dtype=np.float64), global_low)
+        self.high = np.append(np.asarray(high, dtype=np.float64), global_high)
+        self.coverage = coverage
+
+    @classmethod
+    def fit(cls, predict, data, coverage=COVERAGE, prior_count=PRIOR_COUNT):
+        """Quantiles of the residuals of predict (a DataFrame -> lakhs scorer) on data"""
+        # Only fitting needs pandas; loading stored intervals stays NumPy-only
+        import pandas as pd
+        sqft = data['total_sqft'].to_numpy(dtype=np.float64)
+        residual = (data['price'].to_numpy(dtype=np.float64) - predict(data[FEATURES])) / sqft
+        tail = (1 - coverage) / 2
+        global_low, global_high = np.quantile(residual, [tail, 1 - tail])
+
+        grouped = pd.Series(residual).groupby(data['location'].astype(str).to_numpy(), sort=True)
+        quantiles = grouped.quantile([tail, 1 - tail]).unstack()
+        weight = (grouped.size() / (grouped.size() + prior_count)).to_numpy()
+        low = weight * quantiles[tail].to_numpy() + (1 - weight) * global_low
+        high = weight * quantiles[1 - tail].to_numpy() + (1 - weight) * global_high
+        location_index = {name: i for i, name in enumerate(quantiles.index)}
+        return cls(location_index, low, high, global_low, global_high, coverage)
+
+    def location_codes(self, locations):
+        get = self.location_index.get
+        default = len(self.low) - 1
+        return np.fromiter((get(name, default) for name in locations), dtype=np.int64, count=len(locations))
+
+    def range(self, locations, total_sqft, predictions):
+        """(low, high) arrays around a batch of predictions; same unit as predictions, floored at 0"""
+        codes = self.location_codes(locations)
+        sqft = np.asarray(total_sqft, dtype=np.float64)
+        predictions = np.asarray(predictions, dtype=np.float64)
+        low = np.maximum(predictions + self.low[codes] * sqft, 0)
+        high = np.maximum(predictions + self.high[codes] * sqft, 0)
+        return low, high
+
+    def range_one(self, location, total_sqft, prediction):
+        code = self.location_index.get(location, len(self.low) - 1)
+        sqft = float(total_sqft)
+        return max(prediction + self.low[code] * sqft, 0.0), max(prediction + self.high[code] * sqft, 0.0)
+
+    def to_arrays(self):
+        """Arrays for storing alongside a model in an .npz artifact"""
+        locations = sorted(self.location_index, key=self.location_index.get)
+        return {
+            'interval_locations': np.array(locations, dtype=str),
+            'interval_low': self.low,
+            'interval_high': self.high,
+            'interval_coverage': np.array(self.coverage),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        locations = [str(name) for name in arrays['interval_locations']]
+        low, high = arrays['interval_low'], arrays['interval_high']
+        return cls({name: i for i, name in enumerate(locations)}, low[:-1], high[:-1], low[-1], high[-1],
+                   float(arrays['interval_coverage']))
@@ -0,0 +1,147 @@
+"""Local load test for the prediction servers.
+
+Fires POST /predict requests at one or more running servers from many
+concurrent keep-alive connections and reports throughput and latency
+percentiles. With --spawn it starts the Flask dev server (main.py) and the
+async server (serve.py under gunicorn) itself and compares them:
+
+    python load_test.py --spawn --requests 20000 --concurrency 64
+    python load_test.py --url http://127.0.0.1:8000 --url http://127.0.0.1:5001
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+import urllib.parse
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+FLASK_CMD = [sys.executable, '-m', 'flask', '--app', 'main', 'run', '--port', '5001']
+ASYNC_CMD = ['gunicorn', 'serve:app', '-k', 'uvicorn.workers.UvicornWorker', '--preload',
+             '-w', '4', '-b', '127.0.0.1:8000', '--log-level', 'warning']
+
+
+def sample_bodies(n, seed=0):
+    """Urlencoded /predict forms drawn from Cleaned_data.csv, skewed towards popular combinations"""
+    data = pd.read_csv('Cleaned_data.csv')
+    rng = random.Random(seed)
+    rows = data.sample(n=min(n, 500), random_state=seed)[['location', 'bhk', 'bath', 'total_sqft']]
+    rows = rows.to_dict('records')
+    bodies = []
+    for _ in range(n):
+        row = rng.choice(rows[:50]) if rng.random() < 0.8 else rng.choice(rows)
+        form = {'location': row['location'], 'bhk': int(row['bhk']),
+                'bath': int(row['bath']), 'total_sqft': row['total_sqft']}
+        bodies.append(urllib.parse.urlencode(form).encode())
+    return bodies
+
+
+async def _request(reader, writer, host, body):
+    writer.write(
+        b'POST /predict HTTP/1.1\r\nHost: ' + host.encode() +
+        b'\r\nContent-Type: application/x-www-form-urlencoded\r\nContent-Length: ' +
+        str(len(body)).encode() + b'\r\n\r\n' + body
+    )
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    headers = head.lower()
+    length = 0
+    for line in headers.split(b'\r\n'):
+        if line.startswith(b'content-length:'):
+            length = int(line.split(b':', 1)[1])
+    await reader.readexactly(length)
+    keep_alive = b'connection: close' not in headers and not head.startswith(b'HTTP/1.0')
+    return status, keep_alive
+
+
+async def _worker(url, bodies, latencies, statuses):
+    parsed = urllib.parse.urlsplit(url)
+    reader = writer = None
+    while bodies:
+        body = bodies.pop()
+        if writer is None:
+            reader, writer = await asyncio.open_connection(parsed.hostname, parsed.port)
+        start = time.perf_counter()
+        try:
+            status, keep_alive = await _request(reader, writer, parsed.netloc, body)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            status, keep_alive = 0, False
+        latencies.append(time.perf_counter() - start)
+        statuses[status] = statuses.get(status, 0) + 1
+        if not keep_alive:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(url, bodies, concurrency):
+    latencies = []
+    statuses = {}
+    queue = list(bodies)
+    start = time.perf_counter()
+    await asyncio.gather(*(_worker(url, queue, latencies, statuses) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies = np.array(latencies) * 1000
+    return {
+        'url': url,
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'seconds': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 2),
+        'max_ms': round(float(latencies.max()), 2),
+        'statuses': statuses,
+    }
+
+
+def wait_until_up(url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url + '/', timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.25)
+    raise RuntimeError(f"{url} did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', action='append', default=[], help="server to test (repeatable)")
+    parser.add_argument('--spawn', action='store_true', help="start the Flask and async servers locally")
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    args = parser.parse_args()
+
+    processes = []
+    urls = list(args.url)
+    if args.spawn:
+        processes.append(subprocess.Popen(FLASK_CMD, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+        processes.append(subprocess.Popen(ASYNC_CMD))
+        urls += ['http://127.0.0.1:5001', 'http://127.0.0.1:8000']
+    if not urls:
+        parser.error("pass --url or --spawn")
+
+    try:
+        bodies = sample_bodies(args.requests)
+        results = []
+        for url in urls:
+            wait_until_up(url)
+            results.append(asyncio.run(run_load(url, bodies, args.concurrency)))
+        print(json.dumps(results, indent=2))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
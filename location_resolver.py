@@ -0,0 +1,184 @@
+import bisect
+import difflib
+import re
+from functools import lru_cache
+
+# Anything that isn't a letter or digit separates tokens; dots are dropped so "R.T." reads as "rt"
+_SEPARATORS = re.compile(r'[^a-z0-9]+')
+# "3rd", "III" and "3" all name the same stage or phase
+_ORDINAL = re.compile(r'^(\d+)(?:st|nd|rd|th)$')
+_ROMAN = {'i': '1', 'ii': '2', 'iii': '3', 'iv': '4', 'v': '5', 'vi': '6', 'vii': '7', 'viii': '8', 'ix': '9', 'x': '10'}
+
+# Bucket the dataset uses for rare locations; only ever matched exactly
+OTHER = 'other'
+# A match must score this much above the next location, otherwise the input is ambiguous
+MARGIN = 0.05
+# Shorter inputs (letters and digits) must match a name exactly
+MIN_FUZZY_LENGTH = 5
+
+
+def tokens(text):
+    """Lowercase alphanumeric tokens of a location name, with ordinals as plain numbers"""
+    words = _SEPARATORS.sub(' ', str(text).lower().replace('.', '')).split()
+    return [_ROMAN.get(word) or _ORDINAL.sub(r'\1', word) for word in words]
+
+
+class LocationResolver:
+    """Maps free-text location input to one of the known location names.
+
+    Names are indexed by their sorted tokens ("Jayanagar 1st Block" and
+    "1st Block Jayanagar" share a key) and with spaces removed ("Indiranagar").
+    When some words of the input are spelled exactly as in a known name, only
+    names made of the input's words, or containing all of those exact words,
+    are considered ("Banaswadi layout" is Banaswadi, not Banjara Layout).
+    Otherwise each word is fuzzy-matched against the token vocabulary and the
+    locations containing the matches are ranked. The winner must beat the
+    runner-up by MARGIN; short inputs and a lone truncated word ("Mars") are
+    not guessed at. Results, including misses, are kept in an LRU cache.
+    """
+
+    def __init__(self, locations, cutoff=0.8, token_cutoff=0.75, cache_size=4096):
+        self.locations = sorted({str(name) for name in locations})
+        self.cutoff = cutoff
+        self.token_cutoff = token_cutoff
+        self._known = frozenset(self.locations)
+        self._keys = []
+        self._token_sets = []
+        self._exact = {}
+        self._by_token = {}
+        for i, name in enumerate(self.locations):
+            words = tokens(name)
+            key = ' '.join(sorted(words))
+            self._keys.append(key)
+            self._token_sets.append(frozenset(words))
+            self._exact.setdefault(key, name)
+            self._exact.setdefault(''.join(words), name)
+            if name != OTHER:
+                for word in set(words):
+                    self._by_token.setdefault(word, []).append(i)
+        # Misspellings rarely get the first letter wrong, so fuzzy-match within that letter first
+        self._vocabulary = {}
+        for word in self._by_token:
+            self._vocabulary.setdefault(word[0], []).append(word)
+        self._all_words = list(self._by_token)
+        self._sorted_words = sorted(self._by_token)
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+
+    def _resolve(self, text):
+        """The canonical location for text, or None if nothing is close enough"""
+        if text in self._known:
+            return text
+        words = tokens(text)
+        if not words:
+            return None
+        key = ' '.join(sorted(words))
+        exact = self._exact.get(key) or self._exact.get(''.join(words))
+        if exact is not None:
+            return exact
+        if len(''.join(words)) < MIN_FUZZY_LENGTH:
+            return None
+
+        matched = {word for word in words if word in self._by_token}
+        if matched:
+            # Locations named only by words of the input need no similarity cutoff;
+            # ones containing every exactly spelled word (and more) do
+            query = set(words)
+            subset = {i for word in matched for i in self._by_token[word] if self._token_sets[i] <= query}
+            superset = set.intersection(*(set(self._by_token[word]) for word in matched))
+            # "Whitefield Hebbal" names two places; neither is the answer
+            named = {self._token_sets[i] for i in subset}
+            if sum(not any(words < other for other in named) for words in named) > 1:
+                return None
+            return self._best(key, subset | superset, required=superset - subset)
+        if len(words) == 1 and self._is_truncated(words[0]):
+            return None
+
+        candidates = set()
+        for word in words:
+            matches = self._by_token.get(word)
+            if matches is None:
+                close = difflib.get_close_matches(word, self._vocabulary.get(word[0], ()), 3, self.token_cutoff)
+                if not close:
+                    close = difflib.get_close_matches(word, self._all_words, 3, self.token_cutoff)
+                matches = [i for match in close for i in self._by_token[match]]
+            candidates.update(matches)
+
+        return self._best(key, candidates, required=candidates)
+
+    def _best(self, key, candidates, required):
+        """The candidate most similar to key, if it clearly beats the rest.
+
+        Candidates in required must reach the cutoff to count at all.
+        """
+        # SequenceMatcher caches its analysis of the second sequence, so keep the query there
+        matcher = difflib.SequenceMatcher(b=key, autojunk=False)
+        best, best_score, runner_up = None, -1.0, -1.0
+        for i in candidates:
+            matcher.set_seq1(self._keys[i])
+            # Only scores that could still make a difference to best or runner_up are worked out
+            floor = max(runner_up, self.cutoff if i in required else 0.0)
+            if matcher.real_quick_ratio() < floor or matcher.quick_ratio() < floor:
+                continue
+            score = matcher.ratio()
+            if score < floor:
+                continue
+            if score > best_score:
+                best, best_score, runner_up = self.locations[i], score, best_score
+            else:
+                runner_up = score
+        if best is None or best_score - runner_up < MARGIN:
+            return None
+        return best
+
+    def _is_truncated(self, word):
+        """Whether word is the start of a longer known word, as "mars" is of "marsur"."""
+        i = bisect.bisect_left(self._sorted_words, word)
+        return i < len(self._sorted_words) and self._sorted_words[i].startswith(word)
+
+    def resolve_many(self, values):
+        """Dict of each distinct value to its canonical location (or None)"""
+        return {value: self.resolve(value) for value in set(values)}
+
+    def cache_info(self):
+        return self.resolve.cache_info()
+
+
+class LocationPrefixIndex:
+    """Autocomplete over the known location names.
+
+    Every name is indexed under its whole normalized form and under each word
+    it contains onwards ("Jayanagar" finds "1st Block Jayanagar"), in sorted
+    lists, so a query is two binary searches and a walk over at most limit
+    hits. Names that start with the query are listed before names with a
+    later word that does.
+    """
+
+    def __init__(self, locations):
+        self.locations = sorted({str(name) for name in locations})
+        whole, inner = [], []
+        for name in self.locations:
+            words = tokens(name)
+            whole.append((' '.join(words), name))
+            inner.extend((' '.join(words[i:]), name) for i in range(1, len(words)))
+        whole.sort()
+        inner.sort()
+        self._whole_keys = [key for key, _ in whole]
+        self._whole_names = [name for _, name in whole]
+        self._inner_keys = [key for key, _ in inner]
+        self._inner_names = [name for _, name in inner]
+
+    def search(self, query, limit=10):
+        """Up to limit location names matching the start of query"""
+        prefix = ' '.join(tokens(query))
+        if not prefix:
+            return self.locations[:limit]
+        found = []
+        seen = set()
+        for keys, names in ((self._whole_keys, self._whole_names), (self._inner_keys, self._inner_names)):
+            i = bisect.bisect_left(keys, prefix)
+            while i < len(keys) and len(found) < limit and keys[i].startswith(prefix):
+                if names[i] not in seen:
+                    seen.add(names[i])
+                    found.append(names[i])
+                i += 1
+        return found
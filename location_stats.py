@@ -0,0 +1,159 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+from dataset_cache import append_rows
+
+# Number of bars in the per-location price histogram (same as pd.cut(..., bins=8))
+HIST_BINS = 8
+
+
+class LocationStatsIndex:
+    """Per-location price/size statistics computed once and looked up by location.
+
+    Replaces repeated data[data['location'] == location] scans and groupby calls.
+    Sums, counts and min/max are kept so appended rows only update the touched
+    locations; medians and histograms are recomputed for those locations alone.
+    """
+
+    def __init__(self, data):
+        self.data = data.reset_index(drop=True)
+        self.table = pd.DataFrame(columns=['count', 'price_sum', 'sqft_sum', 'min_price',
+                                           'max_price', 'median_price'], dtype=float)
+        self.positions = {}
+        self.bhk_counts = {}
+        self.histograms = {}
+        self.city = {}
+        self._update(self.data)
+
+    def _update(self, rows):
+        """Fold rows (already present in self.data) into the aggregates"""
+        if rows.empty:
+            return
+
+        grouped = rows.groupby('location', sort=False, observed=True)
+        # Accumulate in float64 even when the dataset is stored as float32
+        sums = rows[['price', 'total_sqft']].astype(np.float64).groupby(rows['location'], sort=False, observed=True).sum()
+        partial = pd.DataFrame({
+            'count': grouped.size(),
+            'price_sum': sums['price'],
+            'sqft_sum': sums['total_sqft'],
+            'min_price': grouped['price'].min(),
+            'max_price': grouped['price'].max(),
+        })
+        partial.index = partial.index.astype(object)
+
+        table = self.table.reindex(self.table.index.union(partial.index))
+        old = table.loc[partial.index]
+        table.loc[partial.index, 'count'] = old['count'].fillna(0) + partial['count']
+        table.loc[partial.index, 'price_sum'] = old['price_sum'].fillna(0) + partial['price_sum']
+        table.loc[partial.index, 'sqft_sum'] = old['sqft_sum'].fillna(0) + partial['sqft_sum']
+        table.loc[partial.index, 'min_price'] = np.fmin(old['min_price'], partial['min_price'])
+        table.loc[partial.index, 'max_price'] = np.fmax(old['max_price'], partial['max_price'])
+
+        all_prices = self.data['price'].to_numpy()
+        all_bhk = self.data['bhk'].to_numpy()
+        row_positions = rows.index.to_numpy()
+        medians = {}
+        for location, index in grouped.indices.items():
+            location = str(location)
+            positions = row_positions[index]
+            if location in self.positions:
+                positions = np.concatenate([self.positions[location], positions])
+            self.positions[location] = positions
+
+            prices = all_prices[positions]
+            medians[location] = float(np.median(prices))
+            self.histograms[location] = _histogram(prices)
+            self.bhk_counts[location] = pd.Series(all_bhk[positions]).value_counts()
+        table.loc[list(medians), 'median_price'] = list(medians.values())
+
+        table['mean_price'] = table['price_sum'] / table['count']
+        table['mean_sqft'] = table['sqft_sum'] / table['count']
+        table['price_per_sqft'] = table['price_sum'] / table['sqft_sum']
+        self.table = table.sort_index()
+        self.locations = list(self.table.index)
+        self._ranking = self.table['mean_price'].sort_values(kind='stable')
+
+        city = self.city
+        sqft = rows['total_sqft']
+        city['count'] = city.get('count', 0) + len(rows)
+        city['price_sum'] = city.get('price_sum', 0.0) + float(sums['price'].sum())
+        city['sqft_sum'] = city.get('sqft_sum', 0.0) + float(sums['total_sqft'].sum())
+        city['min_price'] = float(table['min_price'].min())
+        city['max_price'] = float(table['max_price'].max())
+        city['min_sqft'] = min(city.get('min_sqft', np.inf), float(sqft.min()))
+        city['max_sqft'] = max(city.get('max_sqft', -np.inf), float(sqft.max()))
+        city['mean_price'] = city['price_sum'] / city['count']
+        city['mean_sqft'] = city['sqft_sum'] / city['count']
+        city['price_per_sqft'] = city['price_sum'] / city['sqft_sum']
+
+    def append(self, rows):
+        """Add new listings, updating only the locations they touch"""
+        start = len(self.data)
+        rows = rows[self.data.columns].reset_index(drop=True)
+        rows.index = rows.index + start
+        self.data = append_rows(self.data, rows)
+        self._update(rows)
+
+    def with_rows(self, rows):
+        """A new index that also has rows; this one is left unchanged for readers still using it"""
+        new = copy.copy(self)
+        # _update replaces table, data and the per-location entries it touches, but
+        # fills these in place, so the new index gets its own (shallow) copies
+        new.positions = dict(self.positions)
+        new.bhk_counts = dict(self.bhk_counts)
+        new.histograms = dict(self.histograms)
+        new.city = dict(self.city)
+        new.append(rows)
+        return new
+
+    def get(self, location):
+        """Stats for one location as a dict, or None if it has no listings"""
+        if location not in self.positions:
+            return None
+        stats = self.table.loc[location].to_dict()
+        stats['count'] = int(stats['count'])
+        return stats
+
+    def rows(self, location):
+        """The listings for one location, without scanning the whole dataset"""
+        positions = self.positions.get(location)
+        if positions is None:
+            return self.data.iloc[:0]
+        return self.data.iloc[positions]
+
+    def bhk_distribution(self, location, top=5):
+        counts = self.bhk_counts.get(location)
+        if counts is None:
+            return pd.Series(dtype=int)
+        return counts.head(top)
+
+    def price_distribution(self, location):
+        """Price histogram as a Series indexed by price interval, like pd.cut(...).value_counts()"""
+        if location not in self.histograms:
+            return pd.Series(dtype=int)
+        edges, counts = self.histograms[location]
+        return pd.Series(counts, index=pd.IntervalIndex.from_breaks(edges, closed='right'))
+
+    def top_locations(self, n=10):
+        """Most expensive locations by average price"""
+        return self._ranking.iloc[::-1].head(n)
+
+    def bottom_locations(self, n=10):
+        """Most affordable locations by average price"""
+        return self._ranking.head(n)
+
+
+def _histogram(prices, bins=HIST_BINS):
+    """Bin edges and counts matching pd.cut(prices, bins=bins)"""
+    low, high = float(prices.min()), float(prices.max())
+    if low == high:
+        pad = 0.001 * abs(low) if low != 0 else 0.001
+        edges = np.linspace(low - pad, high + pad, bins + 1)
+    else:
+        edges = np.linspace(low, high, bins + 1)
+        edges[0] -= (high - low) * 0.001
+    index = np.clip(np.searchsorted(edges, prices, side='left') - 1, 0, bins - 1)
+    return edges, np.bincount(index, minlength=bins)
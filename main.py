@@ -1,30 +1,299 @@
 import pandas as pd
-from flask import Flask, render_template, request
-import pickle
+from flask import Flask, Response, g, render_template, request, stream_with_context
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+import os
+import time
 import numpy as np
 
+import batch
+import data_service
+import shadow
+from comparables import ComparablesIndex
+from fallback import FallbackPredictor
+from ingest import ListingFeed, SegmentStore, load_listings
+from location_resolver import LocationPrefixIndex, LocationResolver
+from location_stats import LocationStatsIndex
+from market_report import load_or_build
+from metrics import Registry, SampledLogger
+from model_store import ModelStore
+from page_cache import PageCache, respond
+from prediction_cache import PredictionCache
+from validation import error_body, validate_numbers, validate_one
+
+# Seconds between checks for a replaced model artifact
+MODEL_CHECK_INTERVAL = 1.0
+
 app = Flask(__name__)
-data = pd.read_csv('Cleaned_data.csv')
-pipe = pickle.load(open("RidgeModel.pki",'rb'))
+# With BHP_DATA_SERVICE set, the dataset and model live in data_service.py and this
+# process holds only the location names; otherwise everything is loaded here
+service = data_service.connect()
+if service is not None:
+    data = None
+    known_locations = frozenset(service.locations())
+    comparables = data_service.RemoteComparables(service)
+    market_report = data_service.RemoteReport(service)
+    store = data_service.RemoteStore(service, check_interval=MODEL_CHECK_INTERVAL)
+else:
+    # Listings added by ingest.py come in through the feed, now and while running
+    listing_feed = ListingFeed(SegmentStore('Cleaned_data.csv'))
+    data = load_listings('Cleaned_data.csv', listing_feed)
+    known_locations = frozenset(data['location'].unique())
+    comparables = ComparablesIndex(data)
+    # Insights for every location, from market_report.json when it matches the dataset
+    market_report = load_or_build(data)
+    # Loads RidgeModel.npz (no sklearn needed) or RidgeModel.pki, whichever is newer, and
+    # swaps in a replacement when either file changes; a .pki is compiled and checked
+    # against pipe.predict on the whole dataset. Without a usable artifact it serves
+    # price-per-sqft estimates until one appears.
+    store = ModelStore(data=data, check_interval=MODEL_CHECK_INTERVAL, fallback=FallbackPredictor.from_data(data))
+store.watch()
+if service is None:
+    # Startup data plus listings ingested while running, with each location's row positions;
+    # data itself stays as loaded at startup
+    listing_stats = LocationStatsIndex(data)
+    def add_listings(rows):
+        global listing_stats, comparables, market_report
+        # Ingested rows are bucketed into known locations, so only the comparables and insights
+        # change, and only for the locations the rows fall in. Each is swapped in whole.
+        listing_stats = listing_stats.with_rows(rows)
+        # The appended rows, indexed by their positions in listing_stats.data
+        added = listing_stats.data.iloc[len(listing_stats.data) - len(rows):]
+        touched = pd.unique(np.asarray(added['location'], dtype=object))
+        comparables = comparables.with_rows(added)
+        # Each touched location's rows are looked up by position, not by scanning every row
+        market_report = market_report.updated(pd.concat([listing_stats.rows(location) for location in touched]))
+    listing_feed.listeners.append(add_listings)
+    listing_feed.watch()
+# Maps misspelled or reordered location names onto known_locations
+resolver = LocationResolver(known_locations)
+location_search = LocationPrefixIndex(known_locations)
+# The rendered index page, rebuilt only when the set of locations changes
+index_page = PageCache(lambda: render_template('index.html', location_count=len(known_locations)))
+prediction_cache = PredictionCache(maxsize=4096)
+# Candidate models scored in the background against live /predict traffic (BHP_SHADOW_MODELS)
+shadow_scorer = shadow.from_environment(data)
+prediction_cache.bind(store.current.version)
+store.listeners.append(lambda loaded: prediction_cache.bind(loaded.version))
+
+# Instrumentation, exposed on /metrics
+registry = Registry()
+REQUESTS = registry.counter('bhp_requests_total', 'HTTP requests by endpoint and status')
+ERRORS = registry.counter('bhp_request_errors_total', 'HTTP responses with status >= 400 by endpoint')
+UNKNOWN_LOCATIONS = registry.counter('bhp_unknown_locations_total', 'Predictions requested for locations not in the dataset')
+INVALID_INPUTS = registry.counter('bhp_invalid_inputs_total', 'Rejected /predict requests by offending field')
+RESOLVED_LOCATIONS = registry.counter('bhp_resolved_locations_total', 'Location inputs mapped to a differently spelled known location')
+LATENCY = registry.histogram('bhp_request_latency_seconds', 'End-to-end request latency by endpoint')
+STAGES = registry.histogram('bhp_predict_stage_seconds', 'Time spent in each /predict stage')
+registry.counter('bhp_prediction_cache_hits_total', 'Prediction cache hits', lambda: prediction_cache.hits)
+registry.counter('bhp_prediction_cache_misses_total', 'Prediction cache misses', lambda: prediction_cache.misses)
+registry.gauge('bhp_prediction_cache_hit_ratio', 'Prediction cache hit rate', lambda: prediction_cache.stats()['hit_rate'])
+registry.gauge('bhp_prediction_cache_size', 'Entries in the prediction cache', lambda: prediction_cache.stats()['size'])
+if shadow_scorer is not None:
+    registry.counter('bhp_shadow_dropped_total', 'Shadow scoring requests dropped because the queue was full',
+                     lambda: shadow_scorer.dropped)
+    registry.counter('bhp_shadow_scored_total', 'Requests scored by the shadow candidates', lambda: shadow_scorer.scored)
+    registry.gauge('bhp_shadow_queue_size', 'Requests waiting for shadow scoring', lambda: shadow_scorer.queue.qsize())
+# Log roughly one request in BHP_LOG_SAMPLE_RATE from a background thread
+request_log = SampledLogger('bhp.requests', float(os.environ.get('BHP_LOG_SAMPLE_RATE', '0.01')))
+
+def score_one(loaded, location, bhk, bath, sqft):
+    if loaded.model is not None:
+        return loaded.model.predict_one(location, sqft, bath, bhk) * 1e5
+    with STAGES.time(stage='frame'):
+        input = pd.DataFrame([[location,sqft,bath,bhk]], columns=['location', 'total_sqft', 'bath', 'bhk'])
+    return loaded.pipe.predict(input)[0] * 1e5
+
+def price_range(loaded, location, sqft, price):
+    """(low, high) in rupees around a price in rupees, or (None, None) if the model has no intervals"""
+    if loaded.intervals is None:
+        return None, None
+    low, high = loaded.intervals.range_one(location, sqft, price / 1e5)
+    return low * 1e5, high * 1e5
+
+def plain_price(price, resolved_location=None):
+    """Plain-text /predict reply; names the location when the input was resolved to a different one"""
+    text = str(np.round(price, 2))
+    return text if resolved_location is None else f"{text} ({resolved_location})"
+
+def json_requested(format_param, accept):
+    """Whether a /predict reply should be JSON: ?format=json, or JSON as the Accept header's best type.
+
+    serve.py uses it too, so both servers pick the same format for the same request.
+    """
+    return format_param == 'json' or parse_accept_header(accept, MIMEAccept).best == 'application/json'
+
+def wants_json():
+    return json_requested(request.args.get('format'), request.headers.get('Accept'))
+
+def batch_predictor(loaded):
+    """Vectorized DataFrame -> lakhs scorer for one model snapshot"""
+    return loaded.model.predict_frame if loaded.model is not None else loaded.pipe.predict
+
+@app.before_request
+def start_timer():
+    g.start = time.perf_counter()
+
+@app.after_request
+def record_request(response):
+    endpoint = request.endpoint or 'unknown'
+    LATENCY.observe(time.perf_counter() - g.start, endpoint=endpoint)
+    REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+    if response.status_code >= 400:
+        ERRORS.inc(endpoint=endpoint)
+    return response
 
 @app.route('/')
 def index():
+    # frozenset caches its hash, so this is the same cost as a version counter
+    page = index_page.get(hash(known_locations))
+    status, body, headers = respond(page, request.headers.get('If-None-Match'),
+                                    request.headers.get('Accept-Encoding'))
+    return Response(body, status=status, headers=headers, mimetype='text/html')
 
-    locations = sorted(data['location'].unique())
-    return render_template('index.html', locations = locations)
+@app.route('/locations')
+def search_locations():
+    # e.g. /locations?q=white&limit=10, for the location autocomplete
+    try:
+        limit = min(int(request.args.get('limit', 10)), 50)
+    except ValueError:
+        return {'error': "limit must be a whole number"}, 400
+    found = location_search.search(request.args.get('q', ''), max(limit, 0))
+    return {'locations': found}, 200, {'Cache-Control': 'public, max-age=300'}
 
 @app.route('/predict', methods=['POST'])
 def predict():
-    location = request.form.get('location')
-    bhk = request.form.get('bhk')
-    bath = request.form.get('bath')
-    sqft = request.form.get('total_sqft')
+    with STAGES.time(stage='parse'):
+        location = request.form.get('location')
+        bhk = request.form.get('bhk')
+        bath = request.form.get('bath')
+        sqft = request.form.get('total_sqft')
+        # Bad input is rejected here, before it reaches the model
+        values, errors = validate_one(location, bhk, bath, sqft, known_locations, resolver.resolve)
+        if errors:
+            for field in errors:
+                INVALID_INPUTS.inc(field=field)
+            if 'location' in errors and location:
+                UNKNOWN_LOCATIONS.inc()
+            return error_body(errors), 400
+        resolved = values[0] != location.strip()
+        if resolved:
+            RESOLVED_LOCATIONS.inc()
+        key = prediction_cache.key(*values)
+
+    request_log.log("predict %s %s %s %s", location, bhk, bath, sqft)
+    # One snapshot for the whole request, even if a reload swaps the model meanwhile
+    loaded = store.current
+    with STAGES.time(stage='predict'):
+        prediction = prediction_cache.get_or_compute(
+            key, lambda *inputs: score_one(loaded, *inputs), token=loaded.version)
+    if shadow_scorer is not None:
+        shadow_scorer.submit(key[0], key[3], key[2], key[1], prediction)
+
+    with STAGES.time(stage='format'):
+        # Plain text by default; JSON with the price range for Accept: application/json or ?format=json.
+        # A misspelled location is priced as the known one it resolved to, so both formats name it
+        if wants_json():
+            low, high = price_range(loaded, key[0], key[3], prediction)
+            return {
+                'location': key[0],
+                'price': round(float(prediction), 2),
+                'low': None if low is None else round(low, 2),
+                'high': None if high is None else round(high, 2),
+                'resolved': resolved,
+            }
+        return plain_price(prediction, key[0] if resolved else None)
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    # Accept either a CSV upload / CSV body or a JSON array of rows
+    try:
+        upload = request.files.get('file')
+        if upload is not None:
+            chunks = batch.iter_csv_chunks(upload.stream)
+        elif request.mimetype == 'text/csv':
+            chunks = batch.iter_csv_chunks(request.stream)
+        else:
+            frame = batch.read_json_rows(request.get_json(force=True))
+            chunks = batch.iter_frame_chunks(frame)
+
+        # Pull the first chunk eagerly so malformed input fails before streaming starts
+        first = next(chunks, None)
+    except Exception as e:
+        return {'error': str(e)}, 400
+
+    def all_chunks():
+        if first is not None:
+            yield first
+            yield from chunks
+
+    loaded = store.current
+    body = batch.stream_predictions(batch_predictor(loaded), all_chunks(), known_locations, resolver.resolve,
+                                    loaded.intervals)
+    return Response(stream_with_context(body), mimetype='application/json')
+
+@app.route('/comparables')
+def find_comparables():
+    # e.g. /comparables?location=Whitefield&total_sqft=1200&bhk=2&bath=2&k=5
+    args = request.args
+    location = args.get('location', '').strip()
+    # The same ranges /predict accepts, so NaN, negative or fractional counts are rejected
+    values, errors = validate_numbers({name: args.get(name) for name in ('total_sqft', 'bhk', 'bath')})
+    if not location:
+        errors['location'] = "is required"
+    try:
+        k = int(args.get('k', 5))
+        if k <= 0:
+            errors['k'] = "must be positive"
+    except ValueError:
+        errors['k'] = "must be a whole number"
+    if errors:
+        return error_body(errors), 400
+    sqft, bhk, bath, k = values['total_sqft'], values['bhk'], values['bath'], min(k, 50)
+
+    resolved = location if location in known_locations else resolver.resolve(location)
+    if resolved is None:
+        UNKNOWN_LOCATIONS.inc()
+        return {'error': f"unknown location: {location}"}, 404
+
+    found = comparables.find(resolved, sqft, bhk, bath, k)
+    return {
+        'location': resolved,
+        'comparables': [
+            {'row': int(row), 'location': listing.location, 'total_sqft': float(listing.total_sqft),
+             'bath': int(listing.bath), 'bhk': int(listing.bhk), 'price': round(float(listing.price) * 1e5, 2),
+             'same_location': bool(listing.same_location), 'distance': round(float(listing.distance), 4)}
+            for row, listing in zip(found.index, found.itertuples(index=False))
+        ],
+    }
+
+@app.route('/insights')
+def location_insights():
+    # e.g. /insights?location=Whitefield: statistics, price histogram, BHK mix and tiers (prices in lakhs)
+    location = request.args.get('location', '').strip()
+    if not location:
+        return {'error': "missing parameters: location"}, 400
+    resolved = location if location in known_locations else resolver.resolve(location)
+    insights = None if resolved is None else market_report.get(resolved)
+    if insights is None:
+        UNKNOWN_LOCATIONS.inc()
+        return {'error': f"unknown location: {location}"}, 404
+    return {'location': resolved, **insights}
 
-    print(location, bhk, bath, sqft)
-    input = pd.DataFrame([[location,sqft,bath,bhk]], columns=['location', 'total_sqft', 'bath', 'bhk'])
-    prediction = pipe.predict(input)[0] * 1e5
+@app.route('/shadow')
+def shadow_stats():
+    # How far the BHP_SHADOW_MODELS candidates are from the served model, worst locations first
+    if shadow_scorer is None:
+        return {'error': "shadow scoring is off; set BHP_SHADOW_MODELS"}, 404
+    try:
+        top = min(int(request.args.get('top', 10)), 50)
+    except ValueError:
+        return {'error': "top must be a whole number"}, 400
+    return shadow_scorer.stats(top=max(top, 0))
 
-    return str(np.round(prediction,2))
+@app.route('/metrics')
+def metrics():
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
 
 if __name__ == '__main__':
     app.run(debug=True, port=5001)
\ No newline at end of file
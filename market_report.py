@@ -0,0 +1,213 @@
+"""Precomputed market insights for every location.
+
+One pass over the dataset computes, for all locations at once, what the
+Streamlit "Detailed Market Insights" panel shows: price statistics, the
+price histogram, BHK mix, a size-vs-price sample and the recommendation
+tiers. Locations are split across a process pool, and each worker computes
+its share with grouped, vectorized operations. The result is a single
+versioned JSON file that the apps look locations up in:
+
+    python market_report.py                      # writes market_report.json
+    python market_report.py --workers 4 --output /tmp/report.json
+
+Values use the dataset's units (prices in lakhs), like LocationStatsIndex.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from location_stats import HIST_BINS
+from prediction_cache import model_fingerprint
+
+DATA_PATH = 'Cleaned_data.csv'
+REPORT_PATH = 'market_report.json'
+# Bump when the report's layout changes so old files are regenerated
+FORMAT_VERSION = 2
+# Size-vs-price points kept per location, the first ones in dataset order
+SCATTER_POINTS = 100
+TOP_BHK = 5
+
+
+def _tier(values, thresholds, names):
+    """names[i] for the first threshold a value reaches, else the last name"""
+    result = np.full(len(values), names[-1], dtype=object)
+    for threshold, name in reversed(list(zip(thresholds, names))):
+        result[values >= threshold] = name
+    return result
+
+
+def compute_insights(data):
+    """Insights for every location in data, as {location: dict}, in one grouped pass"""
+    categories = pd.Categorical(np.asarray(data['location'], dtype=object))
+    codes = categories.codes.astype(np.int64)
+    names = [str(name) for name in categories.categories]
+    groups = len(names)
+    price = data['price'].to_numpy(dtype=np.float64)
+    sqft = data['total_sqft'].to_numpy(dtype=np.float64)
+    bhk = data['bhk'].to_numpy(dtype=np.float64)
+
+    count = np.bincount(codes, minlength=groups)
+    price_sum = np.bincount(codes, price, groups)
+    sqft_sum = np.bincount(codes, sqft, groups)
+    by_location = pd.Series(price).groupby(codes)
+    low = by_location.min().reindex(range(groups)).to_numpy()
+    high = by_location.max().reindex(range(groups)).to_numpy()
+    median = by_location.median().reindex(range(groups)).to_numpy()
+    mean_price = price_sum / np.maximum(count, 1)
+    mean_sqft = sqft_sum / np.maximum(count, 1)
+    price_per_sqft = price_sum / np.maximum(sqft_sum, 1e-9)
+    price_range = high - low
+
+    # Histogram edges as pd.cut(bins=HIST_BINS) would pick them, for every location at once
+    flat = high == low
+    pad = np.where(low != 0, 0.001 * np.abs(low), 0.001)
+    start = np.where(flat, low - pad, low)
+    stop = np.where(flat, high + pad, high)
+    edges = start[:, None] + (stop - start)[:, None] * np.linspace(0, 1, HIST_BINS + 1)[None, :]
+    edges[:, 0] = np.where(flat, edges[:, 0], edges[:, 0] - price_range * 0.001)
+    # A price lands in the bin after the last edge below it (right-closed bins)
+    bins = np.clip((price[:, None] > edges[codes]).sum(axis=1) - 1, 0, HIST_BINS - 1)
+    histogram = np.bincount(codes * HIST_BINS + bins, minlength=groups * HIST_BINS).reshape(groups, HIST_BINS)
+
+    # Most common first, ties in order of first appearance, as value_counts() orders them
+    bhk_counts = (pd.DataFrame({'code': codes, 'bhk': bhk, 'first': np.arange(len(bhk))})
+                  .groupby(['code', 'bhk'])['first'].agg(['size', 'min']).reset_index()
+                  .rename(columns={'size': 'count'})
+                  .sort_values(['code', 'count', 'min'], ascending=[True, False, True]))
+    bhk_counts = bhk_counts[bhk_counts.groupby('code').cumcount() < TOP_BHK]
+    bhk_lists = {code: list(zip(part['bhk'].astype(int).tolist(), part['count'].astype(int).tolist()))
+                 for code, part in bhk_counts.groupby('code')}
+
+    first = pd.Series(codes).groupby(codes).cumcount().to_numpy() < SCATTER_POINTS
+    scatter = {code: (sqft[first][index].tolist(), price[first][index].tolist())
+               for code, index in pd.Series(codes[first]).groupby(codes[first]).indices.items()}
+
+    # The insights panel's thresholds are in rupees; prices here are in lakhs
+    rupee_range, rupees_per_sqft = price_range * 1e5, price_per_sqft * 1e5
+    tiers = {
+        'variation': _tier(rupee_range, [10000000, 5000000], ['high', 'moderate', 'low']),
+        'price_per_sqft': _tier(rupees_per_sqft, [10000, 7000], ['premium', 'good', 'affordable']),
+        'buyers': _tier(rupees_per_sqft, [12000, 8000], ['premium', 'balanced', 'affordable']),
+        'investors': _tier(count, [100, 50], ['high', 'moderate', 'limited']),
+        'size': _tier(mean_sqft, [2000, 1200], ['large', 'medium', 'compact']),
+    }
+
+    insights = {}
+    for code, name in enumerate(names):
+        if not count[code]:
+            continue
+        insights[name] = {
+            'count': int(count[code]),
+            'mean_price': float(mean_price[code]),
+            'median_price': float(median[code]),
+            'min_price': float(low[code]),
+            'max_price': float(high[code]),
+            'price_range': float(price_range[code]),
+            'mean_sqft': float(mean_sqft[code]),
+            'price_per_sqft': float(price_per_sqft[code]),
+            'histogram': {'edges': edges[code].tolist(), 'counts': histogram[code].tolist()},
+            'bhk_distribution': bhk_lists.get(code, []),
+            'scatter': {'total_sqft': scatter[code][0], 'price': scatter[code][1]},
+            'tiers': {kind: values[code] for kind, values in tiers.items()},
+        }
+    return insights
+
+
+class MarketReport:
+    """Insights per location, looked up by name in constant time"""
+
+    def __init__(self, insights, source=None):
+        self.insights = insights
+        self.source = source or {}
+
+    @classmethod
+    def build(cls, data, workers=1, source=None):
+        """Compute the report for data, splitting locations across workers processes"""
+        if workers <= 1:
+            return cls(compute_insights(data), source)
+        locations = np.asarray(data['location'], dtype=object)
+        shares = {name: zlib.crc32(str(name).encode()) % workers for name in pd.unique(locations)}
+        share = np.fromiter((shares[name] for name in locations), dtype=np.int64, count=len(locations))
+        parts = [data[share == i] for i in range(workers) if (share == i).any()]
+        insights = {}
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(compute_insights, parts):
+                insights.update(part)
+        return cls(dict(sorted(insights.items())), source)
+
+    def updated(self, rows):
+        """A new report with the entries for the locations in rows recomputed from rows.
+
+        rows must hold every listing of those locations (e.g. after new ones were
+        added); the other entries are shared with this report, which is unchanged.
+        """
+        return MarketReport({**self.insights, **compute_insights(rows)}, self.source)
+
+    def get(self, location):
+        """Insights for one location, or None if it has no listings"""
+        return self.insights.get(location)
+
+    def is_current(self, data_path=DATA_PATH, rows=None):
+        """Whether the report was built from this dataset file (and row count, if given)"""
+        fingerprint = model_fingerprint(data_path)
+        return (self.source.get('format') == FORMAT_VERSION
+                and fingerprint is not None and self.source.get('data') == list(fingerprint)
+                and (rows is None or self.source.get('rows') == rows))
+
+    def save(self, path=REPORT_PATH):
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'source': self.source, 'locations': self.insights}, f, separators=(',', ':'))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=REPORT_PATH):
+        with open(path) as f:
+            report = json.load(f)
+        return cls(report['locations'], report['source'])
+
+
+def source_info(data_path, rows):
+    """What a report was built from, for is_current()"""
+    fingerprint = model_fingerprint(data_path)
+    return {'format': FORMAT_VERSION, 'data': list(fingerprint) if fingerprint else None, 'rows': rows,
+            'built_at': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def load_or_build(data, data_path=DATA_PATH, report_path=REPORT_PATH):
+    """The saved report if it was built from this dataset file and row count, otherwise one
+    built here; that one is not saved, since data may include ingested listings"""
+    try:
+        report = MarketReport.load(report_path)
+        if report.is_current(data_path, len(data)):
+            return report
+    except (OSError, ValueError, KeyError):
+        pass
+    return MarketReport.build(data, source=source_info(data_path, len(data)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--output', default=REPORT_PATH)
+    parser.add_argument('--workers', type=int, help="process pool size (default: CPU count, 1 = no pool)")
+    args = parser.parse_args()
+
+    from dataset_cache import load_dataset
+    start = time.perf_counter()
+    data = load_dataset(args.data)
+    report = MarketReport.build(data, args.workers or os.cpu_count() or 1, source_info(args.data, len(data)))
+    report.save(args.output)
+    print(f"Wrote insights for {len(report.insights)} locations to {args.output} "
+          f"in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""Memory held for the dataset and for each Streamlit session.
+
+Prints the bytes per column of the dataset as the apps hold it (load_dataset:
+categorical location, float32/int8 numbers, memory-mapped) next to a plain
+pd.read_csv of the same file. It then runs streamlit_app.py as several
+simulated sessions and reports how much memory each one adds on top of the
+resources they all share. A session costing more than the budget makes the
+command exit non-zero; tests/test_memory_budget.py enforces the same budget:
+
+    python memory_report.py
+    python memory_report.py --sessions 10 --budget-kb 128
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+import warnings
+
+import numpy as np
+import pandas as pd
+
+warnings.filterwarnings('ignore')
+
+DATA_PATH = 'Cleaned_data.csv'
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'streamlit_app.py')
+SESSIONS = 5
+# Most a session may add once the shared resources are loaded
+SESSION_BUDGET_KB = 128
+
+
+def _mapped(values):
+    """Whether an array's memory is a file mapping (shared between processes)"""
+    while values is not None:
+        if isinstance(values, np.memmap):
+            return True
+        values = getattr(values, 'base', None)
+    return False
+
+
+def column_bytes(frame):
+    """{column: (dtype, bytes, mapped)}; a categorical's bytes include its categories"""
+    usage = frame.memory_usage(deep=True, index=False)
+    columns = {}
+    for name in frame.columns:
+        values = frame[name].array
+        array = values.codes if isinstance(values, pd.Categorical) else np.asarray(values)
+        dtype = f'category[{array.dtype}]' if isinstance(values, pd.Categorical) else str(frame[name].dtype)
+        columns[name] = (dtype, int(usage[name]), _mapped(array))
+    return columns
+
+
+def _traced():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def session_bytes(sessions=SESSIONS, app_path=APP_PATH):
+    """(bytes the first session allocates, mean bytes each further one adds).
+
+    Sessions are kept alive while measuring, so everything they hold counts.
+    Memory-mapped columns are file pages, not allocations, and are not counted;
+    neither is the test harness's own copy of each page's elements.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    tracemalloc.start()
+    try:
+        start = _traced()
+        alive = [AppTest.from_file(app_path, default_timeout=120).run()]
+        first = _traced() - start
+        before = tracemalloc.take_snapshot()
+        for _ in range(sessions):
+            alive.append(AppTest.from_file(app_path, default_timeout=120).run())
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    harness = [tracemalloc.Filter(False, '*/streamlit/testing/*')]
+    added = sum(stat.size_diff for stat in after.filter_traces(harness).compare_to(
+        before.filter_traces(harness), 'filename'))
+    if any(at.exception for at in alive):
+        raise RuntimeError(f"{app_path} raised: {alive[-1].exception}")
+    return first, added / max(sessions, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=SESSIONS)
+    parser.add_argument('--budget-kb', type=float, default=SESSION_BUDGET_KB,
+                        help="largest acceptable memory per additional session")
+    args = parser.parse_args()
+
+    from dataset_cache import load_dataset
+    # The app always reads DATA_PATH, so the columns reported are the ones it holds
+    compact = column_bytes(load_dataset(DATA_PATH))
+    plain = column_bytes(pd.read_csv(DATA_PATH))
+    print(f"{'column':<12} {'read_csv':>22} {'load_dataset':>30}")
+    for name in plain:
+        dtype, size, _ = plain[name]
+        line = f"{name:<12} {dtype:>12} {size:>9,}"
+        if name in compact:
+            dtype, size, mapped = compact[name]
+            line += f" {dtype:>16} {size:>9,}{' mapped' if mapped else ''}"
+        else:
+            line += f" {'(dropped)':>16}"
+        print(line)
+    print(f"{'total':<12} {sum(size for _, size, _ in plain.values()):>22,} "
+          f"{sum(size for _, size, _ in compact.values()):>26,}")
+
+    first, per_session = session_bytes(args.sessions)
+    print(f"\nFirst session, including shared resources: {first / 1024:,.0f} KB")
+    print(f"Each further session ({args.sessions} measured): {per_session / 1024:,.1f} KB "
+          f"(budget {args.budget_kb:,.0f} KB)")
+    if per_session > args.budget_kb * 1024:
+        print("Per-session memory is over budget", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency buckets in seconds, from 10 microseconds (compiled scoring) up to seconds
+DEFAULT_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+                   0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _label_text(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}'
+
+
+class Counter:
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_label_text(key)} {value}')
+        return lines
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram, with rough percentiles for quick reading"""
+
+    def __init__(self, name, documentation, buckets=DEFAULT_BUCKETS, quantiles=(0.5, 0.9, 0.99)):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.quantiles = quantiles
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def quantile(self, q, **labels):
+        """Estimate a percentile by interpolating inside the bucket it falls in"""
+        series = self._series.get(tuple(sorted(labels.items())))
+        if not series or not series[2]:
+            return None
+        return self._quantile(series, q)
+
+    def _quantile(self, series, q):
+        counts, _, total = series
+        rank = q * total
+        seen = 0
+        lower = 0.0
+        for count, upper in zip(counts, self.buckets + (float('inf'),)):
+            if seen + count >= rank and count:
+                if upper == float('inf'):
+                    return lower
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = upper
+        return lower
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        quantile_lines = []
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                counts, total_sum, total = series
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    labels = _label_text(key + (('le', repr(bound)),))
+                    lines.append(f'{self.name}_bucket{labels} {cumulative}')
+                lines.append(f'{self.name}_bucket{_label_text(key + (("le", "+Inf"),))} {total}')
+                lines.append(f'{self.name}_sum{_label_text(key)} {total_sum}')
+                lines.append(f'{self.name}_count{_label_text(key)} {total}')
+                for q in self.quantiles:
+                    value = self._quantile(series, q)
+                    quantile_lines.append(f'{self.name}_quantile{_label_text(key + (("quantile", q),))} {value}')
+        if quantile_lines:
+            lines += [f'# HELP {self.name}_quantile Percentiles estimated from {self.name} buckets',
+                      f'# TYPE {self.name}_quantile gauge'] + quantile_lines
+        return lines
+
+
+class Gauge:
+    """A value read from a callback at scrape time"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, callback):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+
+    def render(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}',
+                f'{self.name} {self.callback()}']
+
+
+class CounterCallback(Gauge):
+    """A running total kept elsewhere (e.g. cache hits), read at scrape time"""
+
+    kind = 'counter'
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name, documentation, callback=None):
+        """A Counter to inc(), or with callback one that reads an existing total"""
+        if callback is not None:
+            return self._add(CounterCallback(name, documentation, callback))
+        return self._add(Counter(name, documentation))
+
+    def histogram(self, name, documentation, **kwargs):
+        return self._add(Histogram(name, documentation, **kwargs))
+
+    def gauge(self, name, documentation, callback):
+        return self._add(Gauge(name, documentation, callback))
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics:
+            lines += metric.render()
+        return '\n'.join(lines) + '\n'
+
+
+class SampledLogger:
+    """Logs a random sample of calls through a queue drained by a background thread.
+
+    The request thread only does a random() check and, when sampled, a
+    non-blocking queue put, so no stdout write happens on the hot path.
+    The thread is started in the process that logs (by start(), or by the
+    first sampled call), so forked workers each get their own.
+    """
+
+    def __init__(self, name, sample_rate=0.01, handler=None):
+        self.sample_rate = sample_rate
+        self.handler = handler or logging.StreamHandler()
+        self.logger = logging.getLogger(name)
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self._queue_handler = _DroppingQueueHandler(queue.Queue(maxsize=10000))
+        self.logger.addHandler(self._queue_handler)
+        self.listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        # A forked worker inherits the listener but not its thread, so start one per process
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self._queue_handler.queue = queue.Queue(maxsize=10000)
+                self.listener = logging.handlers.QueueListener(self._queue_handler.queue, self.handler)
+                self.listener.start()
+                self._pid = os.getpid()
+        return self
+
+    def log(self, message, *args):
+        if self.sample_rate and random.random() < self.sample_rate:
+            if self._pid != os.getpid():
+                self.start()
+            self.logger.info(message, *args)
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Drop the record instead of blocking the request
+            pass
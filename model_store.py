@@ -0,0 +1,204 @@
+"""Model loading with hot reload.
+
+Two artifact formats are supported: the pickled sklearn pipeline
+(RidgeModel.pki) and the compiled NumPy export (RidgeModel.npz), which loads in
+milliseconds without importing scikit-learn. Export one from the other with:
+
+    python model_store.py RidgeModel.pki RidgeModel.npz
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from dataset_cache import file_hash
+from intervals import PredictionIntervals
+from prediction_cache import model_fingerprint
+from scoring import CompiledModel, compile_pipeline
+
+MODEL_PATHS = ('RidgeModel.npz', 'RidgeModel.pki')
+
+# One immutable snapshot of the served model; requests grab it once and use it throughout.
+# intervals is a PredictionIntervals for the same model, or None.
+LoadedModel = namedtuple('LoadedModel', ['pipe', 'model', 'path', 'version', 'intervals'])
+
+
+# {path: (fingerprint, value)}, so unchanged files are not read again on every check
+_hashes = {}
+_sources = {}
+
+
+def _cached(cache, path, fingerprint, compute):
+    entry = cache.get(path)
+    if entry is None or entry[0] != fingerprint:
+        entry = cache[path] = (fingerprint, compute(path))
+    return entry[1]
+
+
+def _recorded_source(path):
+    """(source file name, its sha256) stored in an .npz export; either may be None"""
+    with np.load(path, allow_pickle=False) as arrays:
+        metadata = json.loads(str(arrays['metadata']))
+    return metadata.get('source'), metadata.get('source_sha256')
+
+
+def is_current_export(path, fingerprint):
+    """Whether an .npz was exported from the pipeline now next to it.
+
+    Exports record the sha256 of the pickle they were compiled from. While that
+    pickle exists with other contents (or the export predates the record) the
+    export is stale, however recent its file time. Unreadable exports count as stale.
+    """
+    try:
+        source, digest = _cached(_sources, path, fingerprint, _recorded_source)
+    except (OSError, KeyError, ValueError):
+        return False
+    if source is None:
+        return True
+    source = os.path.join(os.path.dirname(path), source)
+    source_fingerprint = model_fingerprint(source)
+    if source_fingerprint is None:
+        return True
+    return digest is not None and digest == _cached(_hashes, source, source_fingerprint, file_hash)
+
+
+def pick_artifact(paths=MODEL_PATHS):
+    """(path, fingerprint) of the first usable artifact among paths.
+
+    An .npz is skipped unless it is the export of the current pickle, so a stale
+    export that was checked out or copied in never wins; file times are not compared.
+    """
+    for path in paths:
+        fingerprint = model_fingerprint(path)
+        if fingerprint is None or path.endswith('.npz') and not is_current_export(path, fingerprint):
+            continue
+        return path, fingerprint
+    raise FileNotFoundError(f"No usable model artifact found among {', '.join(paths)}")
+
+
+def fit_intervals(pipe, model, data):
+    """Residual-based price ranges for a model, or None without data to fit them on"""
+    if data is None:
+        return None
+    return PredictionIntervals.fit(model.predict_frame if model is not None else pipe.predict, data)
+
+
+def load_artifact(path, data=None):
+    """Return (pipe, compiled model) for an artifact; pipe is None for .npz files"""
+    if path.endswith('.npz'):
+        return None, CompiledModel.load(path)
+    import pickle
+    with open(path, 'rb') as f:
+        pipe = pickle.load(f)
+    return pipe, compile_pipeline(pipe, data)
+
+
+class ModelStore:
+    """Holds the current model and swaps in a new one when its artifact changes.
+
+    Reloads happen under a lock and finish by replacing one attribute, so a
+    request that already took `store.current` keeps a consistent pipe/model
+    pair while new requests see the new version.
+
+    With a fallback (anything with CompiledModel's predict methods) a missing or
+    unloadable artifact at startup serves the fallback instead of failing; its
+    path and version are None, so the first real artifact to appear replaces it.
+    """
+
+    def __init__(self, paths=MODEL_PATHS, data=None, check_interval=1.0, fallback=None):
+        self.paths = paths
+        self.data = data
+        self.check_interval = check_interval
+        self.listeners = []
+        self._lock = threading.Lock()
+        self._last_check = time.monotonic()
+        self._watcher = None
+        # (path, version) whose reload failed; retried only once the file changes again
+        self._failed = None
+        self.fallback = fallback
+        try:
+            self.current = self._load()
+        except Exception as e:
+            if fallback is None:
+                raise
+            print(f"No usable model artifact, serving fallback estimates: {e}", file=sys.stderr)
+            self.current = LoadedModel(None, fallback, None, None, fit_intervals(None, fallback, data))
+
+    def _load(self):
+        path, version = pick_artifact(self.paths)
+        pipe, model = load_artifact(path, self.data)
+        # Artifacts exported with intervals carry them; otherwise fit them on the dataset
+        intervals = getattr(model, 'intervals', None) or fit_intervals(pipe, model, self.data)
+        return LoadedModel(pipe, model, path, version, intervals)
+
+    def reload(self):
+        with self._lock:
+            loaded = self._load()
+            self.current = loaded
+        for listener in self.listeners:
+            listener(loaded)
+        return loaded
+
+    def check(self):
+        """Reload if a newer artifact appeared, at most once per check_interval"""
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return self.current
+        self._last_check = now
+        try:
+            path, version = pick_artifact(self.paths)
+        except FileNotFoundError:
+            return self.current
+        if (path, version) in ((self.current.path, self.current.version), self._failed):
+            return self.current
+        if not self._lock.locked():
+            try:
+                return self.reload()
+            except Exception as e:
+                # A half-copied or bad artifact must not take the service down; it is
+                # reported once, and tried again when its fingerprint changes
+                self._failed = (path, version)
+                print(f"Model reload failed, keeping {self.current.path}: {e}", file=sys.stderr)
+        return self.current
+
+    def watch(self):
+        """Poll for new artifacts from a daemon thread instead of on requests"""
+        # A forked worker inherits the attribute but not the thread, so check it is alive
+        if self._watcher is None or not self._watcher.is_alive():
+            def run():
+                while True:
+                    time.sleep(self.check_interval)
+                    self.check()
+            self._watcher = threading.Thread(target=run, name='model-watcher', daemon=True)
+            self._watcher.start()
+
+
+def export(source, target):
+    """Compile a pickled pipeline into an .npz artifact, checked against the dataset.
+
+    Prediction intervals fitted on the dataset are stored in the artifact too.
+    """
+    from dataset_cache import load_dataset
+    pipe, _ = load_artifact(source)
+    model = CompiledModel.from_pipeline(pipe)
+    data = load_dataset()
+    difference = model.check_parity(pipe, data)
+    model.intervals = fit_intervals(None, model, data)
+
+    # Write next to the target and rename, so watchers never load a partial file
+    tmp = f'{target}.{os.getpid()}.tmp'
+    model.save(tmp, source=os.path.basename(source), source_sha256=file_hash(source),
+               parity_max_abs_diff=difference)
+    os.replace(tmp, target)
+    return model
+
+
+if __name__ == '__main__':
+    source = sys.argv[1] if len(sys.argv) > 1 else 'RidgeModel.pki'
+    target = sys.argv[2] if len(sys.argv) > 2 else 'RidgeModel.npz'
+    export(source, target)
+    print(f"Wrote {target}")
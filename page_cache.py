@@ -0,0 +1,73 @@
+import gzip
+import hashlib
+import threading
+from collections import namedtuple
+
+# A rendered page: raw and gzipped bytes plus a strong ETag
+CachedPage = namedtuple('CachedPage', ['body', 'gzipped', 'etag'])
+
+
+class PageCache:
+    """Keeps one rendered page and rebuilds it only when its version changes.
+
+    render() returns the page as a str; the version is anything comparable
+    (e.g. the dataset's row count). Compression and hashing happen once per
+    version instead of once per request.
+    """
+
+    def __init__(self, render):
+        self.render = render
+        # (version, page), replaced as one object so readers never pair a page with another version
+        self._entry = None
+        self._lock = threading.Lock()
+
+    def get(self, version):
+        entry = self._entry
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        with self._lock:
+            entry = self._entry
+            if entry is None or entry[0] != version:
+                body = self.render().encode('utf-8')
+                etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+                entry = self._entry = (version, CachedPage(body, gzip.compress(body, 9), etag))
+            return entry[1]
+
+
+def accepts_gzip(accept_encoding):
+    """Whether an Accept-Encoding header allows gzip, honouring q-values ("gzip;q=0" refuses it)"""
+    qualities = {}
+    for item in (accept_encoding or '').split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    for coding in ('gzip', 'x-gzip', '*'):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
+
+
+def respond(page, if_none_match, accept_encoding):
+    """(status, body, headers) for a GET of page, honouring If-None-Match and gzip"""
+    gzipped = accepts_gzip(accept_encoding)
+    # Each encoding is its own representation, so it gets its own tag
+    gzip_etag = page.etag[:-1] + '-gzip"'
+    headers = {'ETag': gzip_etag if gzipped else page.etag, 'Vary': 'Accept-Encoding', 'Cache-Control': 'no-cache'}
+    if if_none_match:
+        tags = {tag.strip() for tag in if_none_match.split(',')}
+        if '*' in tags or page.etag in tags or gzip_etag in tags:
+            return 304, b'', headers
+    if gzipped:
+        headers['Content-Encoding'] = 'gzip'
+        return 200, page.gzipped, headers
+    return 200, page.body, headers
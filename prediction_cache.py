@@ -0,0 +1,107 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def model_fingerprint(path):
+    """Identifies one version of a model file on disk, or None if it is missing"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def normalize_inputs(location, bhk, bath, sqft, sqft_bucket=None):
+    """Type-coerce raw (possibly string) inputs into a hashable cache key.
+
+    Raises ValueError for values that aren't numbers. With sqft_bucket set the
+    area is snapped to the nearest multiple, and the snapped value is what gets
+    scored, so every entry is exact for its key.
+    """
+    location = str(location).strip()
+    bhk = float(bhk)
+    bath = float(bath)
+    sqft = float(sqft)
+    if sqft_bucket:
+        sqft = round(sqft / sqft_bucket) * sqft_bucket
+    return (location, bhk, bath, sqft)
+
+
+class PredictionCache:
+    """Thread-safe LRU cache of predictions with an optional TTL.
+
+    Entries belong to one model version: call bind() with the model's
+    fingerprint and the cache empties itself whenever that changes.
+    """
+
+    def __init__(self, maxsize=4096, ttl=None, sqft_bucket=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.sqft_bucket = sqft_bucket
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._token = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, location, bhk, bath, sqft):
+        return normalize_inputs(location, bhk, bath, sqft, self.sqft_bucket)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value, token=None):
+        """Store a value; with token given, it is dropped if the cache was rebound meanwhile"""
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            if token is not None and token != self._token:
+                return
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute, token=None):
+        """Return the cached value for key, calling compute(*key) on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = compute(*key)
+            self.put(key, value, token)
+        return value
+
+    def bind(self, token):
+        """Tie the cache to a model version, dropping all entries if it changed"""
+        with self._lock:
+            if token != self._token:
+                self._entries.clear()
+                self._token = token
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
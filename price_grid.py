@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+# Grid axes, matching the ranges and steps of the Streamlit inputs
+SQFT_VALUES = np.arange(100, 10001, 50)
+BHK_VALUES = np.arange(1, 21)
+BATH_VALUES = np.arange(1, 21)
+
+
+class PriceGrid:
+    """Predictions for one location over every sqft x BHK x bath combination.
+
+    Built with a single vectorized model call and stored as float32 lakhs
+    (about 300 KB per location), so what-if lookups and curves are array
+    indexing instead of model calls. Areas between grid points are linearly
+    interpolated, which is exact for the linear model.
+    """
+
+    def __init__(self, location, prices, sqft_values=SQFT_VALUES, bhk_values=BHK_VALUES, bath_values=BATH_VALUES):
+        self.location = location
+        # Indexed [bhk, bath, sqft]
+        self.prices = prices
+        self.sqft_values = sqft_values
+        self.bhk_values = bhk_values
+        self.bath_values = bath_values
+
+    @classmethod
+    def build(cls, predict, location, sqft_values=SQFT_VALUES, bhk_values=BHK_VALUES, bath_values=BATH_VALUES):
+        """Score the full grid with predict, a DataFrame -> lakhs scorer (pipe.predict or predict_frame)"""
+        bhk, bath, sqft = np.meshgrid(bhk_values, bath_values, sqft_values, indexing='ij')
+        frame = pd.DataFrame({
+            'location': np.full(sqft.size, location, dtype=object),
+            'total_sqft': sqft.ravel().astype(np.float64),
+            'bath': bath.ravel().astype(np.float64),
+            'bhk': bhk.ravel().astype(np.float64),
+        })
+        prices = np.asarray(predict(frame), dtype=np.float32).reshape(sqft.shape)
+        return cls(location, prices, sqft_values, bhk_values, bath_values)
+
+    @property
+    def nbytes(self):
+        return self.prices.nbytes
+
+    def _index(self, values, value, name):
+        i = int(np.searchsorted(values, value))
+        if i >= len(values) or values[i] != value:
+            raise ValueError(f"{name}={value} is not on the grid")
+        return i
+
+    def sqft_curve(self, bhk, bath):
+        """Price in lakhs at every grid area for one BHK/bath combination"""
+        row = self.prices[self._index(self.bhk_values, bhk, 'bhk'), self._index(self.bath_values, bath, 'bath')]
+        return pd.Series(row, index=pd.Index(self.sqft_values, name='total_sqft'), name='price')
+
+    def price(self, sqft, bhk, bath):
+        """Price in lakhs, interpolated between the two nearest grid areas"""
+        row = self.prices[self._index(self.bhk_values, bhk, 'bhk'), self._index(self.bath_values, bath, 'bath')]
+        return float(np.interp(sqft, self.sqft_values, row))
+
+    def bhk_curve(self, sqft, bath):
+        """Price in lakhs for each BHK count at a fixed area and bathroom count"""
+        column = self.prices[:, self._index(self.bath_values, bath, 'bath')]
+        values = [np.interp(sqft, self.sqft_values, row) for row in column]
+        return pd.Series(values, index=pd.Index(self.bhk_values, name='bhk'), name='price')
+
+    def bath_curve(self, sqft, bhk):
+        """Price in lakhs for each bathroom count at a fixed area and BHK"""
+        column = self.prices[self._index(self.bhk_values, bhk, 'bhk')]
+        values = [np.interp(sqft, self.sqft_values, row) for row in column]
+        return pd.Series(values, index=pd.Index(self.bath_values, name='bath'), name='price')
+
+    def sensitivity(self, sqft, bhk, bath, sqft_step=100):
+        """Change in price (lakhs) from one more bedroom, one more bathroom and sqft_step more area"""
+        base = self.price(sqft, bhk, bath)
+        changes = {'sqft': self.price(min(sqft + sqft_step, self.sqft_values[-1]), bhk, bath) - base}
+        changes['bhk'] = self.price(sqft, bhk + 1, bath) - base if bhk < self.bhk_values[-1] else np.nan
+        changes['bath'] = self.price(sqft, bhk, bath + 1) - base if bath < self.bath_values[-1] else np.nan
+        return changes
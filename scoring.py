@@ -0,0 +1,155 @@
+import json
+import warnings
+
+import numpy as np
+
+from intervals import PredictionIntervals
+
+NUMERIC_FEATURES = ['total_sqft', 'bath', 'bhk']
+# Bump when the .npz layout written by CompiledModel.save changes
+ARTIFACT_VERSION = 1
+
+
+class CompiledModel:
+    """The RidgeModel pipeline flattened into NumPy arrays.
+
+    The pipeline is OneHotEncoder(location) + passthrough numerics, then a
+    StandardScaler and a linear model, so a prediction is just
+    intercept + location_weights[location] + numeric_weights . [sqft, bath, bhk].
+    Scoring this way skips all pandas/sklearn input validation.
+    """
+
+    def __init__(self, location_index, location_weights, numeric_weights, intercept):
+        self.location_index = location_index
+        self.location_weights = np.asarray(location_weights, dtype=np.float64)
+        self.numeric_weights = np.asarray(numeric_weights, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.metadata = {}
+        # PredictionIntervals stored with the artifact, if it has any
+        self.intervals = None
+
+    @classmethod
+    def from_pipeline(cls, pipe):
+        """Extract the coefficient tables from a fitted ColumnTransformer/scaler/linear pipeline"""
+        steps = dict(pipe.steps)
+        transformer = pipe.steps[0][1]
+        regressor = pipe.steps[-1][1]
+        scaler = steps.get('standardscaler')
+
+        encoder = transformer.named_transformers_.get('onehotencoder')
+        if encoder is None or getattr(encoder, 'drop_idx_', None) is not None:
+            raise ValueError("Pipeline does not one-hot encode location without dropping categories")
+
+        slices = transformer.output_indices_
+        location_slice = slices['onehotencoder']
+        numeric_slice = slices['remainder']
+
+        coef = np.ravel(regressor.coef_).astype(np.float64)
+        intercept = float(np.ravel(regressor.intercept_)[0])
+        width = len(coef)
+
+        # Fold the scaler into the weights: coef * (x - mean) / scale
+        mean = np.zeros(width)
+        scale = np.ones(width)
+        if scaler is not None:
+            if getattr(scaler, 'mean_', None) is not None:
+                mean = scaler.mean_
+            if getattr(scaler, 'scale_', None) is not None:
+                scale = scaler.scale_
+        weights = coef / scale
+        intercept -= float(np.dot(weights, mean))
+
+        categories = encoder.categories_[0]
+        location_index = {str(name): i for i, name in enumerate(categories)}
+        return cls(location_index, weights[location_slice], weights[numeric_slice], intercept)
+
+    def location_codes(self, locations):
+        """Map location names to row indexes in the weight table, -1 for unknown names"""
+        get = self.location_index.get
+        return np.fromiter((get(name, -1) for name in locations), dtype=np.int64, count=len(locations))
+
+    def predict(self, locations, total_sqft, bath, bhk):
+        """Score a batch; returns prices in lakhs, the same unit as pipe.predict"""
+        codes = self.location_codes(locations)
+        if (codes < 0).any():
+            unknown = [locations[i] for i in np.flatnonzero(codes < 0)[:3]]
+            raise ValueError(f"Unknown location(s): {unknown}")
+        numeric = np.column_stack([
+            np.asarray(total_sqft, dtype=np.float64),
+            np.asarray(bath, dtype=np.float64),
+            np.asarray(bhk, dtype=np.float64),
+        ])
+        return self.intercept + self.location_weights[codes] + numeric @ self.numeric_weights
+
+    def predict_one(self, location, total_sqft, bath, bhk):
+        code = self.location_index.get(location)
+        if code is None:
+            raise ValueError(f"Unknown location: {location!r}")
+        w_sqft, w_bath, w_bhk = self.numeric_weights
+        return (self.intercept + self.location_weights[code]
+                + w_sqft * float(total_sqft) + w_bath * float(bath) + w_bhk * float(bhk))
+
+    def predict_frame(self, frame):
+        """Drop-in for pipe.predict on a DataFrame with location/total_sqft/bath/bhk columns"""
+        return self.predict(
+            frame['location'].astype(str).tolist(),
+            frame['total_sqft'].to_numpy(),
+            frame['bath'].to_numpy(),
+            frame['bhk'].to_numpy(),
+        )
+
+    def save(self, path, **metadata):
+        """Write the arrays to an .npz file that loads without pickle or scikit-learn"""
+        locations = sorted(self.location_index, key=self.location_index.get)
+        with open(path, 'wb') as f:
+            np.savez(
+                f,
+                format_version=np.array(ARTIFACT_VERSION),
+                locations=np.array(locations, dtype=str),
+                location_weights=self.location_weights,
+                numeric_weights=self.numeric_weights,
+                intercept=np.array(self.intercept),
+                metadata=np.array(json.dumps(metadata)),
+                **(self.intervals.to_arrays() if self.intervals is not None else {}),
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as arrays:
+            if int(arrays['format_version']) != ARTIFACT_VERSION:
+                raise ValueError(f"Unsupported model artifact version {int(arrays['format_version'])}")
+            locations = [str(name) for name in arrays['locations']]
+            model = cls({name: i for i, name in enumerate(locations)}, arrays['location_weights'],
+                        arrays['numeric_weights'], float(arrays['intercept']))
+            model.metadata = json.loads(str(arrays['metadata']))
+            # Optional, so artifacts written before intervals existed still load
+            if 'interval_low' in arrays.files:
+                model.intervals = PredictionIntervals.from_arrays(arrays)
+        return model
+
+    def check_parity(self, pipe, frame, rtol=1e-6, atol=1e-6):
+        """Compare against pipe.predict on the whole frame; returns the max absolute difference"""
+        frame = frame[['location'] + NUMERIC_FEATURES]
+        expected = pipe.predict(frame)
+        actual = self.predict_frame(frame)
+        if not np.allclose(actual, expected, rtol=rtol, atol=atol):
+            raise ValueError(f"Compiled model diverges from pipeline by up to {np.abs(actual - expected).max():.6g}")
+        return float(np.abs(actual - expected).max())
+
+
+def compile_pipeline(pipe, data=None):
+    """Compile the pipeline, verifying it against pipe.predict on data when given.
+
+    Returns None when the pipeline can't be compiled or fails the parity check,
+    so callers keep using pipe.predict.
+    """
+    if pipe is None:
+        return None
+    try:
+        model = CompiledModel.from_pipeline(pipe)
+        if data is not None:
+            model.check_parity(pipe, data)
+        return model
+    except Exception as e:
+        warnings.warn(f"Compiled scoring disabled, using pipe.predict: {e}")
+        return None
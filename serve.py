@@ -0,0 +1,200 @@
+"""Production ASGI entry point for the price predictor.
+
+Serves the same / and /predict routes as main.py, but async, with concurrent
+single predictions coalesced into one vectorized model call and a cap on
+in-flight requests. The dataset and model are loaded at import, so running
+under gunicorn with --preload loads them once and shares them with every
+forked worker:
+
+    gunicorn serve:app -k uvicorn.workers.UvicornWorker --preload -w 4 -b 0.0.0.0:8000
+"""
+import asyncio
+import contextlib
+import os
+
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Route
+from starlette.templating import Jinja2Templates
+
+import data_service
+import main
+from page_cache import PageCache, respond
+from validation import error_body, validate_one
+
+# Longest a request waits for others to share its model call
+BATCH_WINDOW_MS = float(os.environ.get('BHP_BATCH_WINDOW_MS', '2'))
+MAX_BATCH_SIZE = int(os.environ.get('BHP_MAX_BATCH_SIZE', '256'))
+# Requests allowed in flight per worker before new ones get a 503
+MAX_CONCURRENCY = int(os.environ.get('BHP_MAX_CONCURRENCY', '512'))
+
+templates = Jinja2Templates(directory='templates')
+index_page = PageCache(lambda: templates.get_template('index.html').render(location_count=len(main.known_locations)))
+
+
+class MicroBatcher:
+    """Collects single predictions for a few milliseconds and scores them together"""
+
+    def __init__(self, window_ms=BATCH_WINDOW_MS, max_batch=MAX_BATCH_SIZE):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.rows = 0
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, location, sqft, bath, bhk):
+        """Queue one row and wait for its price in rupees"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put(((location, sqft, bath, bhk), future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self.queue.get()]
+            deadline = loop.time() + self.window
+            while len(pending) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    pending.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            rows = [row for row, _ in pending]
+            loaded = main.store.current
+            try:
+                if loaded.model is not None and not isinstance(loaded.model, data_service.RemoteModel):
+                    prices = _score_compiled(loaded.model, rows)
+                elif loaded.model is not None:
+                    # A socket round trip to the data service; keep it off the event loop
+                    prices = await loop.run_in_executor(None, _score_compiled, loaded.model, rows)
+                else:
+                    # pipe.predict takes milliseconds; keep it off the event loop
+                    prices = await loop.run_in_executor(None, _score_pipeline, loaded.pipe, rows)
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.rows += len(rows)
+            for (_, future), price in zip(pending, prices):
+                if not future.done():
+                    future.set_result(float(price))
+
+
+def _score_compiled(model, rows):
+    locations, sqft, bath, bhk = zip(*rows)
+    return model.predict(list(locations), sqft, bath, bhk) * 1e5
+
+
+def _score_pipeline(pipe, rows):
+    frame = pd.DataFrame(rows, columns=['location', 'total_sqft', 'bath', 'bhk'])
+    return pipe.predict(frame) * 1e5
+
+
+batcher = MicroBatcher()
+in_flight = 0
+
+
+async def index(request):
+    page = index_page.get(hash(main.known_locations))
+    status, body, headers = respond(page, request.headers.get('if-none-match'), request.headers.get('accept-encoding'))
+    return Response(body, status_code=status, headers=headers, media_type='text/html')
+
+
+async def search_locations(request):
+    try:
+        limit = min(int(request.query_params.get('limit', 10)), 50)
+    except ValueError:
+        return JSONResponse({'error': "limit must be a whole number"}, status_code=400)
+    found = main.location_search.search(request.query_params.get('q', ''), max(limit, 0))
+    return JSONResponse({'locations': found}, headers={'Cache-Control': 'public, max-age=300'})
+
+
+async def predict(request):
+    global in_flight
+    if in_flight >= MAX_CONCURRENCY:
+        return PlainTextResponse('Server busy', status_code=503, headers={'Retry-After': '1'})
+
+    in_flight += 1
+    try:
+        form = await request.form()
+        values, errors = validate_one(form.get('location'), form.get('bhk'), form.get('bath'),
+                                      form.get('total_sqft'), main.known_locations, main.resolver.resolve)
+        if errors:
+            return JSONResponse(error_body(errors), status_code=400)
+        key = main.prediction_cache.key(*values)
+        location, bhk, bath, sqft = key
+        resolved = values[0] != form.get('location').strip()
+
+        loaded = main.store.current
+        prediction = main.prediction_cache.get(key)
+        if prediction is None:
+            prediction = await batcher.submit(location, sqft, bath, bhk)
+            main.prediction_cache.put(key, prediction, loaded.version)
+        if main.shadow_scorer is not None:
+            main.shadow_scorer.submit(location, sqft, bath, bhk, prediction)
+
+        # Same content negotiation as main.py: JSON with the price range when asked for
+        if main.json_requested(request.query_params.get('format'), request.headers.get('accept')):
+            if isinstance(loaded.intervals, data_service.RemoteIntervals):
+                # A socket round trip to the data service; keep it off the event loop
+                low, high = await run_in_threadpool(main.price_range, loaded, location, sqft, prediction)
+            else:
+                low, high = main.price_range(loaded, location, sqft, prediction)
+            return JSONResponse({
+                'location': location,
+                'price': round(float(prediction), 2),
+                'low': None if low is None else round(low, 2),
+                'high': None if high is None else round(high, 2),
+                'resolved': resolved,
+            })
+        return PlainTextResponse(main.plain_price(prediction, location if resolved else None))
+    finally:
+        in_flight -= 1
+
+
+async def stats(request):
+    return JSONResponse({
+        'in_flight': in_flight,
+        'batches': batcher.batches,
+        'batched_rows': batcher.rows,
+        'cache': main.prediction_cache.stats(),
+    })
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Each forked worker starts its own batching task and model watcher
+    batcher.start()
+    main.store.watch()
+    main.request_log.start()
+    if main.shadow_scorer is not None:
+        main.shadow_scorer.start()
+    yield
+
+
+app = Starlette(
+    routes=[
+        Route('/', index),
+        Route('/locations', search_locations),
+        Route('/predict', predict, methods=['POST']),
+        Route('/stats', stats),
+    ],
+    lifespan=lifespan,
+)
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, host='127.0.0.1', port=8000)
@@ -0,0 +1,237 @@
+"""Shadow scoring: compare candidate models with the served one on live traffic.
+
+Requests are answered by the primary model as usual; each one's inputs and
+price are also offered to a bounded queue without waiting. Background
+threads drain the queue in micro-batches, score every batch with each
+candidate in one vectorized call and accumulate how far the candidates
+diverge from the primary, per location. When the queue is full the shadow
+copy is dropped and counted, so shadow work never slows a request.
+
+Enable it in main.py / serve.py with a comma-separated list of artifacts:
+
+    BHP_SHADOW_MODELS=models/RidgeModel-20250101.pki python main.py
+"""
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from model_store import load_artifact
+
+QUEUE_SIZE = 10000
+BATCH_SIZE = 256
+# Longest a worker waits to fill a batch once it has the first row
+BATCH_WAIT_MS = 20
+WORKERS = 1
+FEATURES = ['location', 'total_sqft', 'bath', 'bhk']
+
+
+def pipeline_scorer(pipe):
+    """A CompiledModel.predict-style scorer for a pipeline that could not be compiled (e.g. a tree model)"""
+    def predict(locations, total_sqft, bath, bhk):
+        frame = pd.DataFrame({'location': list(locations), 'total_sqft': total_sqft, 'bath': bath, 'bhk': bhk},
+                             columns=FEATURES)
+        return pipe.predict(frame)
+    return predict
+
+
+class Divergence:
+    """Running candidate-minus-primary price differences (rupees), per location"""
+
+    def __init__(self):
+        self.index = {}
+        self.locations = []
+        self.count = np.zeros(0, dtype=np.int64)
+        self.diff_sum = np.zeros(0)
+        self.abs_sum = np.zeros(0)
+        self.rel_sum = np.zeros(0)
+        self.max_abs = np.zeros(0)
+
+    def add(self, locations, primary, candidate):
+        codes = np.empty(len(locations), dtype=np.int64)
+        for i, name in enumerate(locations):
+            code = self.index.get(name)
+            if code is None:
+                code = self.index[name] = len(self.locations)
+                self.locations.append(name)
+            codes[i] = code
+        size = len(self.locations)
+        if size > len(self.count):
+            grow = size - len(self.count)
+            self.count = np.append(self.count, np.zeros(grow, dtype=np.int64))
+            self.diff_sum, self.abs_sum, self.rel_sum, self.max_abs = (
+                np.append(values, np.zeros(grow)) for values in (self.diff_sum, self.abs_sum, self.rel_sum, self.max_abs))
+
+        diff = candidate - primary
+        self.count += np.bincount(codes, minlength=size)
+        self.diff_sum += np.bincount(codes, diff, size)
+        self.abs_sum += np.bincount(codes, np.abs(diff), size)
+        self.rel_sum += np.bincount(codes, np.abs(diff) / np.maximum(np.abs(primary), 1.0), size)
+        np.maximum.at(self.max_abs, codes, np.abs(diff))
+
+    def summary(self):
+        """Totals over every location"""
+        count = int(self.count.sum())
+        if not count:
+            return {'count': 0}
+        return {
+            'count': count,
+            'mean_diff': float(self.diff_sum.sum() / count),
+            'mean_abs_diff': float(self.abs_sum.sum() / count),
+            'mean_abs_pct': float(100 * self.rel_sum.sum() / count),
+            'max_abs_diff': float(self.max_abs.max()),
+        }
+
+    def by_location(self, top=None):
+        """Per-location stats, largest mean absolute divergence first"""
+        seen = self.count > 0
+        mean_abs = np.where(seen, self.abs_sum / np.maximum(self.count, 1), 0.0)
+        order = [i for i in np.argsort(-mean_abs, kind='stable') if seen[i]][:None if top is None else max(top, 0)]
+        return [{
+            'location': self.locations[i],
+            'count': int(self.count[i]),
+            'mean_diff': float(self.diff_sum[i] / self.count[i]),
+            'mean_abs_diff': float(mean_abs[i]),
+            'mean_abs_pct': float(100 * self.rel_sum[i] / self.count[i]),
+            'max_abs_diff': float(self.max_abs[i]),
+        } for i in order]
+
+
+class ShadowScorer:
+    """Bounded queue plus worker threads scoring candidates against the primary model.
+
+    candidates maps a name to a scorer taking (locations, total_sqft, bath, bhk)
+    arrays and returning prices in lakhs, like CompiledModel.predict. When a
+    candidate fails on a batch (e.g. a location outside its vocabulary) the
+    batch is scored row by row, so only the rows it cannot score are lost;
+    errors counts those rows.
+    """
+
+    def __init__(self, candidates, queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE, batch_wait_ms=BATCH_WAIT_MS,
+                 workers=WORKERS):
+        self.candidates = dict(candidates)
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait_ms / 1000
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.divergence = {name: Divergence() for name in self.candidates}
+        self.candidate_errors = {name: 0 for name in self.candidates}
+        self.submitted = 0
+        self.dropped = 0
+        self.scored = 0
+        self.errors = 0
+        self.batches = 0
+        self.workers = workers
+        self._lock = threading.Lock()
+        # Request threads only touch the queue counters, so they never wait for a batch being folded in
+        self._counter_lock = threading.Lock()
+        self._threads = []
+
+    @classmethod
+    def from_paths(cls, paths, data=None, **kwargs):
+        """Candidates loaded from artifact paths (.pki or .npz), named by file name"""
+        candidates = {}
+        for path in paths:
+            pipe, model = load_artifact(path, data)
+            candidates[os.path.basename(path)] = model.predict if model is not None else pipeline_scorer(pipe)
+        return cls(candidates, **kwargs)
+
+    def start(self):
+        # A forked worker inherits the list but not the threads, so check they are alive
+        if not any(thread.is_alive() for thread in self._threads):
+            self._threads = [threading.Thread(target=self._run, name=f'shadow-{i}', daemon=True)
+                             for i in range(self.workers)]
+            for thread in self._threads:
+                thread.start()
+        return self
+
+    def submit(self, location, sqft, bath, bhk, price):
+        """Offer one served prediction (price in rupees) for shadow scoring; never blocks"""
+        try:
+            self.queue.put_nowait((location, sqft, bath, bhk, price))
+            queued = True
+        except queue.Full:
+            queued = False
+        with self._counter_lock:
+            self.submitted += 1
+            if not queued:
+                self.dropped += 1
+        return queued
+
+    def _next_batch(self):
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            locations, sqft, bath, bhk, primary = zip(*batch)
+            locations = list(locations)
+            primary = np.asarray(primary, dtype=np.float64)
+            for name, predict in self.candidates.items():
+                try:
+                    candidate = np.asarray(predict(locations, sqft, bath, bhk), dtype=np.float64) * 1e5
+                    ok = np.ones(len(batch), dtype=bool)
+                except Exception:
+                    candidate, ok = self._score_rows(predict, locations, sqft, bath, bhk)
+                failed = len(batch) - int(ok.sum())
+                with self._lock:
+                    self.errors += failed
+                    self.candidate_errors[name] += failed
+                    if failed < len(batch):
+                        self.divergence[name].add([locations[i] for i in np.flatnonzero(ok)], primary[ok],
+                                                  candidate[ok])
+            with self._lock:
+                self.scored += len(batch)
+                self.batches += 1
+
+    @staticmethod
+    def _score_rows(predict, locations, sqft, bath, bhk):
+        """(prices in rupees, mask of the rows predict could score) for a batch it failed on"""
+        candidate = np.zeros(len(locations))
+        ok = np.zeros(len(locations), dtype=bool)
+        for i in range(len(locations)):
+            try:
+                candidate[i] = float(np.asarray(predict([locations[i]], [sqft[i]], [bath[i]], [bhk[i]]))[0]) * 1e5
+                ok[i] = True
+            except Exception:
+                pass
+        return candidate, ok
+
+    def stats(self, top=10):
+        """Queue counters plus overall and worst-location divergence for each candidate"""
+        with self._counter_lock:
+            submitted, dropped = self.submitted, self.dropped
+        with self._lock:
+            return {
+                'submitted': submitted,
+                'dropped': dropped,
+                'scored': self.scored,
+                'batches': self.batches,
+                'errors': self.errors,
+                'queued': self.queue.qsize(),
+                'candidates': {
+                    name: {'overall': divergence.summary(), 'locations': divergence.by_location(top),
+                           'errors': self.candidate_errors[name]}
+                    for name, divergence in self.divergence.items()
+                },
+            }
+
+
+def from_environment(data=None):
+    """A started ShadowScorer for the artifacts in BHP_SHADOW_MODELS, or None if unset"""
+    paths = [path.strip() for path in os.environ.get('BHP_SHADOW_MODELS', '').split(',') if path.strip()]
+    if not paths:
+        return None
+    return ShadowScorer.from_paths(paths, data).start()
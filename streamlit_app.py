@@ -2,6 +2,15 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import warnings
+import data_service
+from dataset_cache import load_dataset
+from fallback import FallbackPredictor
+from ingest import LiveListings
+from intervals import PredictionIntervals
+from location_resolver import LocationResolver
+from model_store import load_artifact, pick_artifact
+from prediction_cache import PredictionCache
+from price_grid import PriceGrid
 warnings.filterwarnings('ignore')
 
 # Set page configuration
@@ -54,31 +63,150 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Load the data
-@st.cache_data
+# Client for the shared data service (BHP_DATA_SERVICE), or None to load everything here
+@st.cache_resource
+def get_service():
+    return data_service.connect()
+
+# The service's statistics and market report, one set per data version (row count)
+@st.cache_resource(max_entries=1)
+def load_remote_data(data_version, _service):
+    return data_service.RemoteStats(_service), data_service.RemoteReport(_service, keep=True)
+
+# Load the data once per process and share it: cache_data would hand every session its own
+# unpickled copy, while this returns the same frame, whose columns are read-only memory
+# maps (categorical location, float32/int8 numbers; see memory_report.py)
+@st.cache_resource
 def load_data():
     try:
-        data = pd.read_csv('Cleaned_data.csv')
+        data = load_dataset('Cleaned_data.csv')
         return data
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return None
 
-# Load model with compatibility handling
+# Load model with compatibility handling. Returns (pipeline, compiled model); the pipeline is
+# None for RidgeModel.npz. model_version is part of the cache key, so a replaced
+# artifact is picked up on the next rerun while running sessions keep the old one.
 @st.cache_resource
-def load_model():
+def load_model(model_path, model_version, _data):
     try:
-        import pickle
+        return load_artifact(model_path, _data)
+    except Exception:
+        st.warning("⚠️ Model loading failed. Using fallback prediction method.")
+        return None, None
+
+# Per-location statistics, comparables and market report, shared by every session and
+# kept current with the listings added by ingest.py (see LiveListings.snapshot)
+@st.cache_resource
+def load_live_listings(_data):
+    return LiveListings(_data)
+
+# Price-per-sqft estimator for when no model loads; data_version changes when listings are
+# added, and only the latest version is kept
+@st.cache_resource(max_entries=1)
+def load_fallback(data_version, _stats):
+    return FallbackPredictor.from_stats(_stats)
+
+# Free-text location search over the known names
+@st.cache_resource(max_entries=1)
+def load_resolver(data_version, _stats):
+    return LocationResolver(_stats.locations)
+
+# Residual-based price ranges: stored in RidgeModel.npz, otherwise fitted once per model version
+@st.cache_resource(max_entries=1)
+def load_intervals(model_version, data_version, _model, _predict, _data):
+    stored = getattr(_model, 'intervals', None)
+    return stored if stored is not None else PredictionIntervals.fit(_predict, _data)
+
+# Predictions shared across sessions, one cache per model version
+@st.cache_resource
+def get_prediction_cache(model_version):
+    return PredictionCache(maxsize=4096)
+
+# Charts are shown by default and run as a fragment, so toggling them reruns only this block
+@st.fragment
+def market_visualizations(location):
+    st.markdown("#### 📊 **Market Visualizations**")
+    if not st.toggle("Show charts", value=True, key="show_market_charts"):
+        return
+    
+    insights = market_report.get(location)
+    histogram = insights['histogram']
+    price_dist = pd.Series(histogram['counts'], index=pd.IntervalIndex.from_breaks(histogram['edges'], closed='right'))
+    chart_data = pd.DataFrame(insights['scatter'])
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("**💰 Price Distribution**")
         try:
-            with open("RidgeModel.pki", 'rb') as f:
-                model = pickle.load(f)
-            return model
+            st.bar_chart(price_dist)
         except:
-            st.warning("⚠️ Model loading failed. Using fallback prediction method.")
-            return None
-    except Exception as e:
-        st.error(f"Error loading model: {e}")
-        return None
+            st.bar_chart(chart_data['price'].head(50))
+    
+    with col2:
+        st.markdown("**📐 Size vs Price Relationship**")
+        try:
+            st.scatter_chart(chart_data, x='total_sqft', y='price')
+        except:
+            st.line_chart(chart_data.head(50))
+
+# Price grid for one location, scored once per model version and reused by every what-if
+# interaction; max_entries bounds memory at roughly 300 KB per location
+@st.cache_resource(max_entries=64)
+def load_price_grid(location, model_version, data_version, _predict):
+    return PriceGrid.build(_predict, location)
+
+# What-if explorer, a fragment so moving a slider reruns only this block and reads the grid
+@st.fragment
+def what_if_explorer(location, bhk, bath, sqft):
+    st.markdown("### 🔀 What-if Explorer")
+    if not st.toggle("Explore prices instantly", key="what_if_mode",
+                     help="Adjust size, BHK and bathrooms and see the estimate update without re-running the model"):
+        return
+    
+    grid = load_price_grid(location, model_version, stats.city['count'], grid_predict)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        what_sqft = st.slider("📏 Square Feet", 100, 10000, int(sqft), step=50, key="what_if_sqft")
+    with col2:
+        what_bhk = st.slider("🏠 BHK", 1, 20, int(bhk), key="what_if_bhk")
+    with col3:
+        what_bath = st.slider("🚿 Bathrooms", 1, 20, int(bath), key="what_if_bath")
+    
+    lakhs = grid.price(what_sqft, what_bhk, what_bath)
+    price = to_rupees(lakhs)
+    changes = grid.sensitivity(what_sqft, what_bhk, what_bath)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("💰 Estimated Price", format_price(price))
+    for column, label, change in ((col2, "+100 sq ft", changes['sqft']), (col3, "+1 BHK", changes['bhk']),
+                                  (col4, "+1 Bathroom", changes['bath'])):
+        if not np.isnan(change):
+            sign = '-' if change < 0 else '+'
+            column.metric(label, sign + format_lakhs(abs(change)), f"{change / lakhs * 100:+.1f}%")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown(f"**📐 Price vs Size** ({what_bhk} BHK, {what_bath} Bath)")
+        curve = to_rupees(grid.sqft_curve(what_bhk, what_bath))
+        st.line_chart(curve.loc[max(100, what_sqft - 1500):what_sqft + 1500])
+    with col2:
+        st.markdown(f"**🏠 Price vs BHK** ({what_sqft} sq ft, {what_bath} Bath)")
+        st.bar_chart(to_rupees(grid.bhk_curve(what_sqft, what_bath).loc[:8]))
+
+# Dataset, statistics and report prices are in lakhs; the page shows rupees
+LAKH = 1e5
+
+
+def to_rupees(lakhs):
+    """A price from the dataset, its statistics or the market report, in rupees"""
+    return lakhs * LAKH
+
+
+def format_lakhs(lakhs):
+    """format_price for a price in lakhs"""
+    return format_price(to_rupees(lakhs))
+
 
 # Helper function to format prices in lakhs/crores
 def format_price(price):
@@ -93,39 +221,53 @@ def format_price(price):
     except:
         return f"₹{price:,.0f}"
 
-# Simple prediction function as fallback
-def simple_predict(location, sqft, bath, bhk, data):
-    try:
-        location_data = data[data['location'] == location]
-        
-        if location_data.empty:
-            avg_price = data['price'].mean()
-        else:
-            avg_price = location_data['price'].mean()
-        
-        price_per_sqft = avg_price / location_data['total_sqft'].mean() if not location_data.empty else data['price'].mean() / data['total_sqft'].mean()
-        
-        base_price = sqft * price_per_sqft
-        
-        bhk_factor = 1 + (bhk - 2) * 0.15
-        bath_factor = 1 + (bath - 2) * 0.1
-        
-        final_price = base_price * bhk_factor * bath_factor
-        
-        return final_price
-    except:
-        return 5000000
-
 # Load data and model
-data = load_data()
-model = load_model()
+service = get_service()
 
-if data is None:
-    st.error("❌ Could not load the dataset. Please check if 'Cleaned_data.csv' exists.")
-    st.stop()
+if service is not None:
+    # The data service owns the dataset, statistics and model (falling back itself when no
+    # artifact loads); this session reads its current model version once per run
+    data, model = None, None
+    remote_store = data_service.RemoteStore(service)
+    loaded = remote_store.current
+    model_version, compiled_model, intervals = loaded.version, loaded.model, loaded.intervals
+    # Aggregates are fetched once per data version and shared by every rerun and session
+    stats, market_report = load_remote_data(remote_store.data_version, service)
+    comparables = data_service.RemoteComparables(service)
+    fallback = compiled_model
+else:
+    data = load_data()
+    
+    if data is None:
+        st.error("❌ Could not load the dataset. Please check if 'Cleaned_data.csv' exists.")
+        st.stop()
+    
+    try:
+        model_path, model_version = pick_artifact()
+        model, compiled_model = load_model(model_path, model_version, data)
+    except FileNotFoundError:
+        st.warning("⚠️ Model file not found. Using fallback prediction method.")
+        model_version, model, compiled_model = None, None, None
+    
+    # Includes listings ingested since the last run; only the locations they touch are
+    # recomputed, and the data version (row count) moves so dependent caches refresh
+    stats, comparables, market_report = load_live_listings(data).snapshot()
+    fallback = load_fallback(stats.city['count'], stats)
+prediction_cache = get_prediction_cache(model_version)
+
+# DataFrame -> lakhs scorer used to precompute what-if grids
+if compiled_model is not None:
+    grid_predict = compiled_model.predict_frame
+elif model is not None:
+    grid_predict = model.predict
+else:
+    grid_predict = fallback.predict_frame
+if service is None:
+    intervals = load_intervals(model_version, stats.city['count'], compiled_model, grid_predict, stats.data)
 
 # Get unique locations
-locations = sorted(data['location'].unique())
+locations = stats.locations
+resolver = load_resolver(stats.city['count'], stats)
 
 # Main title
 st.markdown('<h1 class="main-header">🏠 Bengaluru House Price Predictor</h1>', unsafe_allow_html=True)
@@ -145,11 +287,25 @@ col1, col2, col3 = st.columns([1, 1, 1])
 with col1:
     st.markdown("### 📋 Property Details")
     
+    # Free-text search that tolerates misspellings and word order
+    location_query = st.text_input(
+        "🔎 Search Location:",
+        placeholder="e.g. Jayanagar 1st Block",
+        help="Type a location name; the closest known location is selected below"
+    )
+    location_index = 0
+    if location_query:
+        match = resolver.resolve(location_query)
+        if match is None:
+            st.caption("No matching location found")
+        else:
+            location_index = locations.index(match)
+    
     # Location selection
     location = st.selectbox(
         "📍 Select Location:",
         options=locations,
-        index=0,
+        index=location_index,
         help="Choose the area/location of the property"
     )
     
@@ -198,23 +354,14 @@ with col3:
     
     if location:
         try:
-            location_data = data[data['location'] == location]
+            location_stats = stats.get(location)
             
-            if not location_data.empty:
-                avg_price = location_data['price'].mean()
-                avg_sqft = location_data['total_sqft'].mean()
-                count_properties = len(location_data)
+            if location_stats is not None:
+                avg_sqft = location_stats['mean_sqft']
+                count_properties = location_stats['count']
                 
                 st.metric("🏘️ Properties in Area", f"{count_properties:,}")
-                # Format average price in lakhs/crores
-                if avg_price >= 10000000:
-                    avg_price_display = f"₹{avg_price/10000000:.2f} Cr"
-                elif avg_price >= 100000:
-                    avg_price_display = f"₹{avg_price/100000:.2f} L"
-                else:
-                    avg_price_display = f"₹{avg_price:,.0f}"
-                
-                st.metric("💰 Avg Price", avg_price_display)
+                st.metric("💰 Avg Price", format_lakhs(location_stats['mean_price']))
                 st.metric("📐 Avg Size", f"{avg_sqft:.0f} sq ft")
             else:
                 st.info("No data for this location")
@@ -230,12 +377,18 @@ with col2:
         if location and bhk and bath and sqft:
             with st.spinner("Analyzing market data and calculating price..."):
                 try:
-                    if model is not None:
-                        input_data = pd.DataFrame([[location, sqft, bath, bhk]], 
-                                                columns=['location', 'total_sqft', 'bath', 'bhk'])
-                        prediction = model.predict(input_data)[0] * 1e5
-                    else:
-                        prediction = simple_predict(location, sqft, bath, bhk, data)
+                    key = prediction_cache.key(location, bhk, bath, sqft)
+                    prediction = prediction_cache.get(key)
+                    if prediction is None:
+                        if compiled_model is not None:
+                            prediction = to_rupees(compiled_model.predict_one(location, sqft, bath, bhk))
+                        elif model is not None:
+                            input_data = pd.DataFrame([[location, sqft, bath, bhk]], 
+                                                    columns=['location', 'total_sqft', 'bath', 'bhk'])
+                            prediction = to_rupees(model.predict(input_data)[0])
+                        else:
+                            prediction = to_rupees(fallback.predict_one(location, sqft, bath, bhk))
+                        prediction_cache.put(key, prediction)
                     
                     # Display result
                     st.markdown("---")
@@ -243,12 +396,15 @@ with col2:
                     
                     # Format price in lakhs and crores
                     price_display = format_price(prediction)
+                    low, high = intervals.range_one(location, sqft, prediction / LAKH)
+                    range_display = f"{format_lakhs(low)} – {format_lakhs(high)}"
                     
                     # Create a beautiful prediction display
                     st.markdown(f"""
                     <div class="prediction-box">
                         <h2>Estimated Price</h2>
                         <h1 style="font-size: 3rem; margin: 1rem 0;">{price_display}</h1>
+                        <p>Likely range ({intervals.coverage:.0%}): {range_display}</p>
                         <p>Based on {location} • {bhk} BHK • {bath} Bath • {sqft} sq ft</p>
                     </div>
                     """, unsafe_allow_html=True)
@@ -299,13 +455,13 @@ with col2:
                     
                     # Market comparison
                     try:
-                        location_data = data[data['location'] == location]
-                        if not location_data.empty:
+                        location_stats = stats.get(location)
+                        if location_stats is not None:
                             st.markdown("### 🏆 Market Comparison")
                             col1, col2 = st.columns(2)
                             
                             with col1:
-                                location_avg = location_data['price'].mean()
+                                location_avg = to_rupees(location_stats['mean_price'])
                                 price_diff = prediction - location_avg
                                 price_diff_pct = (price_diff / location_avg) * 100
                                 
@@ -319,7 +475,7 @@ with col2:
                                 )
                             
                             with col2:
-                                overall_avg = data['price'].mean()
+                                overall_avg = to_rupees(stats.city['mean_price'])
                                 overall_diff = prediction - overall_avg
                                 overall_diff_pct = (overall_diff / overall_avg) * 100
                                 
@@ -331,10 +487,26 @@ with col2:
                     except:
                         pass
                     
+                    # Most similar listings from the dataset
+                    comparable = comparables.find(location, sqft, bhk, bath, k=5)
+                    if not comparable.empty:
+                        st.markdown("### 🏘️ Comparable Properties")
+                        st.dataframe(
+                            pd.DataFrame({
+                                'Location': comparable['location'],
+                                'Sq Ft': comparable['total_sqft'].round().astype(int),
+                                'BHK': comparable['bhk'].astype(int),
+                                'Bath': comparable['bath'].astype(int),
+                                'Price': [format_lakhs(price) for price in comparable['price']],
+                            }),
+                            hide_index=True,
+                            use_container_width=True,
+                        )
+                    
                 except Exception as e:
                     st.error(f"Error making prediction: {e}")
                     st.info("Using fallback prediction method...")
-                    prediction = simple_predict(location, sqft, bath, bhk, data)
+                    prediction = to_rupees(fallback.predict_one(location, sqft, bath, bhk))
                     # Format fallback prediction
                     fallback_display = format_price(prediction)
                     
@@ -342,33 +514,41 @@ with col2:
         else:
             st.warning("⚠️ Please fill in all the required fields!")
 
+# What-if exploration, seeded with the inputs above
+st.markdown("---")
+if location:
+    what_if_explorer(location, bhk, bath, sqft)
+
 # Market insights section
 st.markdown("---")
 st.markdown("### 📊 **Detailed Market Insights**")
 
 if location:
     try:
-        location_data = data[data['location'] == location]
+        # Precomputed for every location; this is a dictionary lookup. The report's
+        # prices are in lakhs, like the dataset's, and are shown here in rupees
+        location_stats = market_report.get(location)
         
-        if not location_data.empty:
+        if location_stats is not None:
+            tiers = location_stats['tiers']
             # Market statistics
             st.markdown("#### 📈 **Location Market Statistics**")
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
-                avg_price = location_data['price'].mean()
+                avg_price = to_rupees(location_stats['mean_price'])
                 st.metric("💰 Average Price", format_price(avg_price))
             
             with col2:
-                median_price = location_data['price'].median()
+                median_price = to_rupees(location_stats['median_price'])
                 st.metric("📊 Median Price", format_price(median_price))
             
             with col3:
-                min_price = location_data['price'].min()
+                min_price = to_rupees(location_stats['min_price'])
                 st.metric("📉 Lowest Price", format_price(min_price))
             
             with col4:
-                max_price = location_data['price'].max()
+                max_price = to_rupees(location_stats['max_price'])
                 st.metric("📈 Highest Price", format_price(max_price))
             
             # Market analysis
@@ -377,13 +557,12 @@ if location:
             
             with col1:
                 st.markdown("**💰 Price Range Analysis**")
-                price_range = max_price - min_price
-                price_range_formatted = format_price(price_range)
+                price_range = to_rupees(location_stats['price_range'])
                 
-                if price_range >= 10000000:
+                if tiers['variation'] == 'high':
                     st.success(f"**High Price Variation**: ₹{price_range/10000000:.2f} Cr range")
                     st.write("This area has diverse property types and sizes")
-                elif price_range >= 5000000:
+                elif tiers['variation'] == 'moderate':
                     st.info(f"**Moderate Variation**: ₹{price_range/100000:.2f} L range")
                     st.write("Standard market with good variety")
                 else:
@@ -391,11 +570,11 @@ if location:
                     st.write("Consistent pricing in this area")
                 
                 # Price per sq ft analysis
-                avg_price_per_sqft = avg_price / location_data['total_sqft'].mean()
+                avg_price_per_sqft = to_rupees(location_stats['price_per_sqft'])
                 st.markdown("**📐 Average Price per Sq Ft**")
-                if avg_price_per_sqft >= 10000:
+                if tiers['price_per_sqft'] == 'premium':
                     st.success(f"₹{avg_price_per_sqft/1000:.1f}K - Premium Area")
-                elif avg_price_per_sqft >= 7000:
+                elif tiers['price_per_sqft'] == 'good':
                     st.info(f"₹{avg_price_per_sqft/1000:.1f}K - Good Market")
                 else:
                     st.warning(f"₹{avg_price_per_sqft/1000:.1f}K - Affordable Area")
@@ -404,45 +583,25 @@ if location:
                 st.markdown("**🏘️ Property Distribution**")
                 
                 # BHK distribution
-                bhk_counts = location_data['bhk'].value_counts().head(5)
                 st.write("**BHK Distribution:**")
-                for bhk, count in bhk_counts.items():
-                    percentage = (count / len(location_data)) * 100
+                for bhk, count in location_stats['bhk_distribution']:
+                    percentage = (count / location_stats['count']) * 100
                     st.write(f"• {bhk} BHK: {count} properties ({percentage:.1f}%)")
                 
                 # Size analysis
-                avg_size = location_data['total_sqft'].mean()
+                avg_size = location_stats['mean_sqft']
                 st.markdown("**📏 Average Property Size**")
                 st.write(f"**{avg_size:.0f} sq ft** - Typical property size in this area")
                 
-                if avg_size >= 2000:
+                if tiers['size'] == 'large':
                     st.success("Large properties dominate this area")
-                elif avg_size >= 1200:
+                elif tiers['size'] == 'medium':
                     st.info("Medium-sized properties are common")
                 else:
                     st.warning("Compact properties are typical here")
             
-            # Charts
-            st.markdown("#### 📊 **Market Visualizations**")
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("**💰 Price Distribution**")
-                try:
-                    # Create price bins for better visualization
-                    price_bins = pd.cut(location_data['price'], bins=8)
-                    price_dist = price_bins.value_counts().sort_index()
-                    st.bar_chart(price_dist)
-                except:
-                    st.bar_chart(location_data['price'].head(50))
-            
-            with col2:
-                st.markdown("**📐 Size vs Price Relationship**")
-                try:
-                    chart_data = location_data[['total_sqft', 'price']].head(100)
-                    st.scatter_chart(chart_data, x='total_sqft', y='price')
-                except:
-                    st.line_chart(location_data[['total_sqft', 'price']].head(50))
+            # Charts (computed only when shown)
+            market_visualizations(location)
             
             # Market recommendations
             st.markdown("#### 💡 **Market Recommendations**")
@@ -450,11 +609,11 @@ if location:
             
             with col1:
                 st.markdown("**🎯 For Buyers**")
-                if avg_price_per_sqft >= 12000:
+                if tiers['buyers'] == 'premium':
                     st.info("• Premium area - expect higher prices")
                     st.info("• Good for long-term investment")
                     st.info("• High resale value potential")
-                elif avg_price_per_sqft >= 8000:
+                elif tiers['buyers'] == 'balanced':
                     st.success("• Balanced market with good options")
                     st.success("• Suitable for both living and investment")
                     st.success("• Stable appreciation expected")
@@ -465,11 +624,11 @@ if location:
             
             with col2:
                 st.markdown("**📈 For Investors**")
-                if len(location_data) >= 100:
+                if tiers['investors'] == 'high':
                     st.success("• High market activity")
                     st.success("• Good liquidity for resale")
                     st.success("• Strong rental demand potential")
-                elif len(location_data) >= 50:
+                elif tiers['investors'] == 'moderate':
                     st.info("• Moderate market activity")
                     st.info("• Steady investment potential")
                     st.info("• Balanced risk-reward")
@@ -499,56 +658,26 @@ with st.sidebar:
     """)
     
     st.header("📊 Dataset Statistics")
-    st.write(f"📈 Total properties: {len(data):,}")
+    st.write(f"📈 Total properties: {stats.city['count']:,}")
     st.write(f"🏘️ Number of locations: {len(locations)}")
-    # Format price range in lakhs/crores
-    min_price = data['price'].min()
-    max_price = data['price'].max()
-    
-    if min_price >= 10000000:
-        min_price_display = f"₹{min_price/10000000:.2f} Cr"
-    elif min_price >= 100000:
-        min_price_display = f"₹{min_price/100000:.2f} L"
-    else:
-        min_price_display = f"₹{min_price:,.0f}"
-    
-    if max_price >= 10000000:
-        max_price_display = f"₹{max_price/10000000:.2f} Cr"
-    elif max_price >= 100000:
-        max_price_display = f"₹{max_price/100000:.2f} L"
-    else:
-        max_price_display = f"₹{max_price:,.0f}"
-    
-    st.write(f"💰 Price range: {min_price_display} - {max_price_display}")
-    st.write(f"📐 Size range: {data['total_sqft'].min():,.0f} - {data['total_sqft'].max():,.0f} sq ft")
+    st.write(f"💰 Price range: {format_lakhs(stats.city['min_price'])} - {format_lakhs(stats.city['max_price'])}")
+    st.write(f"📐 Size range: {stats.city['min_sqft']:,.0f} - {stats.city['max_sqft']:,.0f} sq ft")
     
     # Top locations by average price
     st.subheader("🏆 Top 10 Expensive Areas")
     try:
-        top_locations = data.groupby('location')['price'].mean().sort_values(ascending=False).head(10)
+        top_locations = stats.top_locations(10)
         for i, (loc, price) in enumerate(top_locations.items(), 1):
-            if price >= 10000000:
-                price_display = f"₹{price/10000000:.2f} Cr"
-            elif price >= 100000:
-                price_display = f"₹{price/100000:.2f} L"
-            else:
-                price_display = f"₹{price:,.0f}"
-            st.write(f"{i}. **{loc}**: {price_display}")
+            st.write(f"{i}. **{loc}**: {format_lakhs(price)}")
     except:
         st.info("Data not available")
     
     # Bottom locations
     st.subheader("💡 Most Affordable Areas")
     try:
-        bottom_locations = data.groupby('location')['price'].mean().sort_values().head(10)
+        bottom_locations = stats.bottom_locations(10)
         for i, (loc, price) in enumerate(bottom_locations.items(), 1):
-            if price >= 10000000:
-                price_display = f"₹{price/10000000:.2f} Cr"
-            elif price >= 100000:
-                price_display = f"₹{price/100000:.2f} L"
-            else:
-                price_display = f"₹{price:,.0f}"
-            st.write(f"{i}. **{loc}**: {price_display}")
+            st.write(f"{i}. **{loc}**: {format_lakhs(price)}")
     except:
         st.info("Data not available")
 
@@ -0,0 +1,61 @@
+import io
+
+import pandas as pd
+import pytest
+
+import batch_score
+from dataset_cache import load_dataset
+
+CHUNK_SIZE = 400
+
+
+@pytest.fixture(scope='module')
+def listings(tmp_path_factory):
+    data = load_dataset()[['location', 'total_sqft', 'bath', 'bhk']].head(3000).astype({'location': object})
+    # A few rows that fail validation or need resolving, so errors are resumed too
+    data.loc[5, 'total_sqft'] = -1
+    data.loc[1234, 'location'] = 'Atlantis'
+    data.loc[2500, 'location'] = data.loc[2500, 'location'].lower()
+    path = tmp_path_factory.mktemp('input') / 'listings.csv'
+    data.to_csv(path, index=False)
+    return str(path)
+
+
+def _read(path, output_format):
+    if output_format == 'parquet':
+        return pd.read_parquet(path)
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('output_format', ['csv', 'parquet'])
+def test_killed_run_resumes_to_identical_output(listings, tmp_path, monkeypatch, output_format):
+    if output_format == 'parquet':
+        pytest.importorskip('pyarrow')
+    suffix = '.parquet' if output_format == 'parquet' else '.csv'
+    clean, resumed = str(tmp_path / f'clean{suffix}'), str(tmp_path / f'resumed{suffix}')
+    kwargs = dict(chunk_size=CHUNK_SIZE, workers=1, progress=io.StringIO())
+    assert batch_score.score_file(listings, clean, **kwargs) == 3000
+
+    writer = batch_score.ParquetWriter if output_format == 'parquet' else batch_score.CsvWriter
+    write = writer.write
+
+    def dies_mid_chunk(self, index, frame):
+        if index == 3:
+            # Part of the chunk reaches the output, but the checkpoint never records it
+            write(self, index, frame.iloc[:len(frame) // 2])
+            raise KeyboardInterrupt
+        return write(self, index, frame)
+
+    monkeypatch.setattr(writer, 'write', dies_mid_chunk)
+    with pytest.raises(KeyboardInterrupt):
+        batch_score.score_file(listings, resumed, **kwargs)
+    monkeypatch.setattr(writer, 'write', write)
+
+    progress = io.StringIO()
+    assert batch_score.score_file(listings, resumed, **dict(kwargs, progress=progress)) == 3000
+    assert f"Resuming after {3 * CHUNK_SIZE} rows" in progress.getvalue()
+    if output_format == 'parquet':
+        pd.testing.assert_frame_equal(_read(resumed, output_format), _read(clean, output_format))
+    else:
+        assert _read(resumed, output_format) == _read(clean, output_format)
@@ -0,0 +1,32 @@
+import pytest
+
+QUERY = {'location': 'Whitefield', 'total_sqft': '1200', 'bhk': '2', 'bath': '2'}
+
+
+@pytest.fixture(scope='module')
+def client():
+    import main
+    return main.app.test_client()
+
+
+@pytest.mark.parametrize('field, value', [
+    ('bhk', 'two'),
+    ('bath', '-1'),
+    ('total_sqft', 'nan'),
+    ('total_sqft', '20000'),
+    ('bhk', '2.5'),
+    ('bath', ''),
+])
+def test_comparables_rejects_numbers_like_predict(client, field, value):
+    query = {**QUERY, field: value}
+    response = client.get('/comparables', query_string=query)
+    predict = client.post('/predict', data=query)
+    assert response.status_code == predict.status_code == 400
+    assert response.get_json() == predict.get_json()
+    assert list(response.get_json()['fields']) == [field]
+
+
+def test_comparables_accepts_valid_numbers(client):
+    response = client.get('/comparables', query_string={**QUERY, 'k': '3'})
+    assert response.status_code == 200
+    assert len(response.get_json()['comparables']) == 3
@@ -0,0 +1,76 @@
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from data_service import DataServiceClient, LocalService, RemoteReport, RemoteStats, ServiceError, serve
+
+
+@pytest.fixture(scope='module')
+def local():
+    return LocalService()
+
+
+class Recording:
+    """Passes calls through to a service, counting round trips"""
+
+    def __init__(self, service):
+        self.service = service
+        self.round_trips = 0
+
+    def pipeline(self, calls):
+        self.round_trips += 1
+        return self.service.pipeline(calls)
+
+    def __getattr__(self, name):
+        def call(*args):
+            self.round_trips += 1
+            return getattr(self.service, name)(*args)
+        return call
+
+
+def test_remote_stats_match_the_index(local):
+    stats = RemoteStats(local)
+    assert stats.city == local.stats.city
+    assert stats.locations == local.stats.locations
+    assert stats.get('Whitefield') == local.stats.get('Whitefield')
+    pd.testing.assert_series_equal(stats.top_locations(5), local.stats.top_locations(5),
+                                   check_names=False, check_index_type=False)
+    pd.testing.assert_series_equal(stats.bottom_locations(10), local.stats.bottom_locations(10),
+                                   check_names=False, check_index_type=False)
+
+
+def test_a_rerun_costs_one_round_trip_per_data_version(local):
+    service = Recording(local)
+    stats, report = RemoteStats(service), RemoteReport(service, keep=True)
+    assert service.round_trips == 1
+    for _ in range(3):
+        stats.city['count'], stats.locations, stats.top_locations(10), stats.bottom_locations(10)
+        stats.get('Whitefield'), report.get('Whitefield')
+    assert service.round_trips == 3
+
+
+def test_local_pipeline_rejects_unknown_methods(local):
+    with pytest.raises(ServiceError):
+        local.pipeline([('locations', ()), ('__init__', ())])
+
+
+def test_client_pipelines_requests_over_the_socket(local, tmp_path):
+    path = str(tmp_path / 'data.sock')
+    threading.Thread(target=serve, args=(local, path), daemon=True).start()
+    deadline = time.monotonic() + 10
+    while not os.path.exists(path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    client = DataServiceClient(path, pool_size=2)
+    try:
+        city, locations, stats = client.pipeline([('city_stats', ()), ('locations', ()),
+                                                  ('location_stats', ('Whitefield',))])
+        assert (city, locations, stats) == (local.stats.city, local.stats.locations, local.stats.get('Whitefield'))
+        assert RemoteStats(client).get('Whitefield') == stats
+        # Both exchanges reused the one pooled connection
+        assert client._pool.qsize() == 1
+    finally:
+        client.close()
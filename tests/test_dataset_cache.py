@@ -0,0 +1,83 @@
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from dataset_cache import build_cache, load_dataset
+
+
+def _csv(tmp_path, rows):
+    path = tmp_path / 'data.csv'
+    pd.DataFrame(rows, columns=['location', 'total_sqft', 'bath', 'price', 'bhk']).to_csv(path)
+    return str(path)
+
+
+def test_rebuild_keeps_versions_newer_than_its_own(tmp_path):
+    path = _csv(tmp_path, [('Whitefield', 1200.0, 2.0, 60.0, 2.0)])
+    cache_dir = str(tmp_path / 'cache')
+    load_dataset(path, cache_dir)
+    old = {entry.name for entry in os.scandir(cache_dir) if entry.is_dir()}
+
+    # A directory another builder creates (and has not published yet) after this build starts
+    newer = tmp_path / 'cache' / 'in-progress'
+    newer.mkdir()
+    future = time.time() + 60
+    os.utime(newer, (future, future))
+
+    build_cache(path, cache_dir)
+    left = {entry.name for entry in os.scandir(cache_dir) if entry.is_dir()}
+    assert 'in-progress' in left
+    assert not old & left
+    assert load_dataset(path, cache_dir)['location'].tolist() == ['Whitefield']
+
+
+def _manifest(cache_dir):
+    with open(os.path.join(cache_dir, 'manifest.json')) as f:
+        return json.load(f)
+
+
+def test_columns_are_compact_read_only_memory_maps(tmp_path):
+    path = _csv(tmp_path, [('Whitefield', 1200.0, 2.0, 60.0, 2.0), ('Hebbal', 900.5, 1.0, 45.5, 1.0)])
+    data = load_dataset(path, str(tmp_path / 'cache'))
+    assert isinstance(data['location'].dtype, pd.CategoricalDtype)
+    assert data['total_sqft'].dtype == np.float32 and data['bath'].dtype == np.int8
+    values = data['price'].to_numpy()
+    assert not values.flags.writeable
+    while values is not None and not isinstance(values, np.memmap):
+        values = values.base
+    assert values is not None
+    pd.testing.assert_frame_equal(data.astype({'location': object, 'total_sqft': float, 'price': float,
+                                               'bath': float, 'bhk': float}),
+                                  pd.read_csv(path, index_col=0), check_dtype=False)
+
+
+def test_changed_csv_invalidates_the_manifest_and_rebuilds(tmp_path):
+    path = _csv(tmp_path, [('Whitefield', 1200.0, 2.0, 60.0, 2.0)])
+    cache_dir = str(tmp_path / 'cache')
+    load_dataset(path, cache_dir)
+    before = _manifest(cache_dir)
+
+    # Same contents with a new mtime (e.g. a fresh checkout): no rebuild
+    os.utime(path, ns=(1, 1))
+    load_dataset(path, cache_dir)
+    touched = _manifest(cache_dir)
+    assert touched['version_dir'] == before['version_dir'] and touched['mtime_ns'] == 1
+
+    _csv(tmp_path, [('Whitefield', 1200.0, 2.0, 60.0, 2.0), ('Hebbal', 900.0, 1.0, 45.0, 1.0)])
+    data = load_dataset(path, cache_dir)
+    after = _manifest(cache_dir)
+    assert after['version_dir'] != before['version_dir']
+    assert after['rows'] == 2 and data['location'].tolist() == ['Whitefield', 'Hebbal']
+
+
+def test_format_change_rebuilds(tmp_path, monkeypatch):
+    import dataset_cache
+    path = _csv(tmp_path, [('Whitefield', 1200.0, 2.0, 60.0, 2.0)])
+    cache_dir = str(tmp_path / 'cache')
+    load_dataset(path, cache_dir)
+    before = _manifest(cache_dir)['version_dir']
+    monkeypatch.setattr(dataset_cache, 'FORMAT_VERSION', dataset_cache.FORMAT_VERSION + 1)
+    load_dataset(path, cache_dir)
+    assert _manifest(cache_dir)['version_dir'] != before
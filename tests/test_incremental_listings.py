@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from comparables import ComparablesIndex
+from dataset_cache import load_dataset
+from location_stats import LocationStatsIndex
+from market_report import MarketReport
+
+
+@pytest.fixture(scope='module')
+def split():
+    """The dataset as (first part, rest), with the rest indexed by position like ingested rows"""
+    data = load_dataset().astype({'location': object})
+    cut = len(data) - 200
+    return data, data.iloc[:cut], data.iloc[cut:]
+
+
+def test_comparables_with_rows_matches_a_full_build(split):
+    data, base, added = split
+    full = ComparablesIndex(data)
+    grown = ComparablesIndex(base).with_rows(added.iloc[:150]).with_rows(added.iloc[150:])
+    assert grown.nearby == full.nearby
+    rng = np.random.default_rng(0)
+    for _ in range(300):
+        query = (data['location'].iloc[rng.integers(len(data))], float(rng.uniform(400, 4000)),
+                 int(rng.integers(1, 6)), int(rng.integers(1, 5)), int(rng.integers(1, 20)))
+        pd.testing.assert_frame_equal(grown.find(*query), full.find(*query))
+
+
+def test_report_updated_matches_a_full_build(split):
+    data, base, added = split
+    touched = set(added['location'])
+    updated = MarketReport.build(base).updated(data[data['location'].isin(touched)])
+    assert updated.insights == MarketReport.build(data).insights
+
+
+def test_stats_with_rows_leaves_the_old_index_alone(split):
+    data, base, added = split
+    old = LocationStatsIndex(base)
+    location = added['location'].iloc[0]
+    before = (dict(old.city), old.get(location), len(old.positions[location]), len(old.data))
+
+    new = old.with_rows(added)
+    assert (dict(old.city), old.get(location), len(old.positions[location]), len(old.data)) == before
+    assert new.get(location) == LocationStatsIndex(data).get(location)
+
+
+def test_report_tiers_separate_locations(split):
+    data, _, _ = split
+    tiers = [insight['tiers'] for insight in MarketReport.build(data).insights.values()]
+    for kind in ('variation', 'price_per_sqft', 'buyers'):
+        assert len({tier[kind] for tier in tiers}) == 3
+
+
+def test_flask_ingest_updates_match_a_full_build(split, monkeypatch):
+    import main
+    data, _, added = split
+    for name in ('listing_stats', 'comparables', 'market_report'):
+        monkeypatch.setattr(main, name, getattr(main, name))
+    rows = added.iloc[:50]
+    main.add_listings(rows)
+
+    full = pd.concat([data, rows], ignore_index=True)
+    report = MarketReport.build(full)
+    for location in set(rows['location']):
+        assert main.market_report.get(location) == report.get(location)
+    index = ComparablesIndex(full)
+    query = (rows['location'].iloc[0], 1200.0, 2, 2, 10)
+    pd.testing.assert_frame_equal(main.comparables.find(*query), index.find(*query))
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from dataset_cache import load_dataset
+from intervals import COVERAGE, PredictionIntervals
+from model_store import load_artifact
+
+
+@pytest.fixture(scope='module')
+def model():
+    pytest.importorskip('sklearn')
+    return load_artifact('RidgeModel.pki')[1]
+
+
+@pytest.fixture(scope='module')
+def split():
+    data = load_dataset()
+    order = np.random.default_rng(0).permutation(len(data))
+    cut = int(len(data) * 0.7)
+    return data.iloc[order[:cut]], data.iloc[order[cut:]]
+
+
+def _inside(intervals, model, rows):
+    low, high = intervals.range(rows['location'].astype(str).tolist(), rows['total_sqft'], model.predict_frame(rows))
+    price = rows['price'].to_numpy()
+    return (price >= low) & (price <= high)
+
+
+def test_held_out_coverage_is_close_to_target(model, split):
+    train, test = split
+    inside = _inside(PredictionIntervals.fit(model.predict_frame, train), model, test)
+    assert inside.mean() == pytest.approx(COVERAGE, abs=0.04)
+    # Per-sqft residuals keep small and large homes covered alike
+    small = test['total_sqft'].to_numpy() < test['total_sqft'].median()
+    assert inside[small].mean() == pytest.approx(COVERAGE, abs=0.05)
+    assert inside[~small].mean() == pytest.approx(COVERAGE, abs=0.05)
+
+
+def test_ranges_agree_and_survive_storage(model, split):
+    train, test = split
+    intervals = PredictionIntervals.fit(model.predict_frame, train)
+    stored = PredictionIntervals.from_arrays(intervals.to_arrays())
+    rows = test.head(50)
+    locations = rows['location'].astype(str).tolist() + ['Atlantis']
+    sqft = np.append(rows['total_sqft'].to_numpy(dtype=np.float64), 1200.0)
+    predictions = np.append(model.predict_frame(rows), 60.0)
+
+    low, high = intervals.range(locations, sqft, predictions)
+    np.testing.assert_array_equal(np.column_stack(stored.range(locations, sqft, predictions)),
+                                  np.column_stack([low, high]))
+    assert (low <= predictions).all() and (high >= predictions).all() and (low >= 0).all()
+    for i in (0, 17, len(locations) - 1):
+        assert intervals.range_one(locations[i], sqft[i], predictions[i]) == pytest.approx((low[i], high[i]))
+    # Unknown locations get the city-wide range
+    assert low[-1] == pytest.approx(max(60.0 + intervals.low[-1] * 1200.0, 0))
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import batch
+from location_resolver import LocationResolver
+
+LOCATIONS = ['Banaswadi', 'Banjara Layout', 'Marsur', 'Koramangala', 'Whitefield', 'Hebbal',
+             'Hebbal Kempapura', 'Sarjapur', 'Sarjapur  Road', '1st Block Jayanagar', 'Vijayanagar', 'other']
+
+
+@pytest.fixture
+def resolver():
+    return LocationResolver(LOCATIONS)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Whitefield', 'Whitefield'),
+    ('jayanagar 1st block', '1st Block Jayanagar'),
+    ('Koramangla', 'Koramangala'),
+    ('Hebbal Kempapra', 'Hebbal Kempapura'),
+    ('sarjapur rd', 'Sarjapur  Road'),
+    # An exactly spelled known name beats a fuzzy match on the rest of the input
+    ('Banaswadi layout', 'Banaswadi'),
+    ('Banjra layout', 'Banjara Layout'),
+])
+def test_resolves(resolver, text, expected):
+    assert resolver.resolve(text) == expected
+
+
+@pytest.mark.parametrize('text', [
+    'Mars',        # a truncated word, not a misspelling
+    'Marsu',
+    'hsr',         # too short to guess at
+    'Jayanagr',    # as close to Vijayanagar as to 1st Block Jayanagar
+    'Whitefield Hebbal',
+    'xyz',
+    '',
+])
+def test_does_not_guess(resolver, text):
+    assert resolver.resolve(text) is None
+
+
+def test_batch_rows_name_the_resolved_location():
+    frame = pd.DataFrame({'location': ['Whitefield', 'Banaswadi layout', 'Mars'],
+                          'total_sqft': [1200, 1200, 1200], 'bath': [2, 2, 2], 'bhk': [2, 2, 2]})
+    resolver = LocationResolver(LOCATIONS)
+    rows = list(batch.score_chunk(lambda rows: np.ones(len(rows)), frame, set(LOCATIONS), resolve=resolver.resolve))
+    assert 'location' not in rows[0]
+    assert rows[1]['location'] == 'Banaswadi'
+    assert rows[2]['error'] == 'unknown location'
+
+
+def test_predict_replies_name_the_resolved_location():
+    main = pytest.importorskip('main')
+    client = main.app.test_client()
+    form = {'location': 'Banaswadi layout', 'bhk': '2', 'bath': '2', 'total_sqft': '1200'}
+
+    plain = client.post('/predict', data=form).get_data(as_text=True)
+    assert plain.endswith(' (Banaswadi)')
+    reply = client.post('/predict?format=json', data=form).get_json()
+    assert reply['location'] == 'Banaswadi' and reply['resolved'] is True
+
+    form['location'] = 'Banaswadi'
+    assert '(' not in client.post('/predict', data=form).get_data(as_text=True)
+    assert client.post('/predict?format=json', data=form).get_json()['resolved'] is False
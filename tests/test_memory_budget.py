@@ -0,0 +1,28 @@
+import os
+
+import pandas as pd
+import pytest
+
+from dataset_cache import load_dataset
+from memory_report import APP_PATH, DATA_PATH, SESSION_BUDGET_KB, column_bytes, session_bytes
+
+
+@pytest.fixture
+def repo_root(monkeypatch):
+    # The app reads its dataset and model relative to the working directory
+    monkeypatch.chdir(os.path.dirname(APP_PATH))
+
+
+def test_dataset_is_compact_and_shared(repo_root):
+    compact = column_bytes(load_dataset(DATA_PATH))
+    plain = column_bytes(pd.read_csv(DATA_PATH))
+    assert 'Unnamed: 0' not in compact
+    assert compact['location'][0].startswith('category')
+    assert all(mapped for _, _, mapped in compact.values())
+    assert sum(size for _, size, _ in compact.values()) < sum(size for _, size, _ in plain.values()) / 3
+
+
+def test_each_session_stays_within_budget(repo_root):
+    pytest.importorskip('streamlit.testing.v1')
+    _, per_session = session_bytes(sessions=3)
+    assert per_session <= SESSION_BUDGET_KB * 1024
@@ -0,0 +1,33 @@
+import logging
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from metrics import Registry, SampledLogger
+
+
+def test_callback_totals_are_exposed_as_counters():
+    registry = Registry()
+    registry.counter('hits_total', 'Cache hits', lambda: 3)
+    assert registry.render().splitlines() == ['# HELP hits_total Cache hits', '# TYPE hits_total counter',
+                                              'hits_total 3']
+
+
+def _log_in_child(logger):
+    logger.log("from %s", os.getpid())
+    time.sleep(0.2)
+    logger.listener.stop()
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="needs fork")
+def test_forked_process_writes_its_own_log(tmp_path):
+    path = tmp_path / 'requests.log'
+    logger = SampledLogger('test.forked', sample_rate=1.0, handler=logging.FileHandler(path, delay=True))
+    logger.log("parent")
+    child = multiprocessing.get_context('fork').Process(target=_log_in_child, args=(logger,))
+    child.start()
+    child.join(10)
+    logger.listener.stop()
+    assert sorted(path.read_text().splitlines()) == sorted(['parent', f'from {child.pid}'])
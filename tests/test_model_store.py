@@ -0,0 +1,36 @@
+import os
+import shutil
+
+from model_store import ModelStore, pick_artifact
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _artifacts(tmp_path):
+    for name in ('RidgeModel.npz', 'RidgeModel.pki'):
+        shutil.copy(os.path.join(ROOT, name), tmp_path / name)
+    return str(tmp_path / 'RidgeModel.npz'), str(tmp_path / 'RidgeModel.pki')
+
+
+def test_export_of_the_current_pickle_is_picked(tmp_path):
+    npz, pki = _artifacts(tmp_path)
+    os.utime(npz, ns=(1, 1))
+    assert pick_artifact((npz, pki))[0] == npz
+
+
+def test_a_newer_stale_export_loses_to_the_pickle(tmp_path):
+    npz, pki = _artifacts(tmp_path)
+    with open(pki, 'ab') as f:
+        f.write(b'\0')
+    os.utime(pki, ns=(1, 1))
+    assert pick_artifact((npz, pki))[0] == pki
+
+
+def test_a_failing_reload_is_reported_once(tmp_path, capsys):
+    npz, pki = _artifacts(tmp_path)
+    store = ModelStore((pki,), check_interval=0)
+    with open(pki, 'wb') as f:
+        f.write(b'not a pickle')
+    for _ in range(3):
+        assert store.check().path == pki
+    assert capsys.readouterr().err.count('Model reload failed') == 1
@@ -0,0 +1,42 @@
+import gzip
+
+import pytest
+
+from page_cache import PageCache, accepts_gzip, respond
+
+
+@pytest.mark.parametrize('header, expected', [
+    (None, False),
+    ('', False),
+    ('gzip', True),
+    ('gzip, deflate, br', True),
+    ('GZIP;q=0.5', True),
+    ('gzip;q=0', False),
+    ('gzip; q=0.0, br', False),
+    ('br, *;q=0.1', True),
+    ('*;q=0', False),
+    ('gzip;q=0, *', False),
+    ('identity', False),
+])
+def test_accepts_gzip_honours_q_values(header, expected):
+    assert accepts_gzip(header) is expected
+
+
+def test_respond_serves_plain_body_when_gzip_is_refused():
+    page = PageCache(lambda: '<html>hi</html>').get(1)
+    status, body, headers = respond(page, None, 'gzip;q=0, identity')
+    assert (status, body, headers['ETag']) == (200, page.body, page.etag)
+    assert 'Content-Encoding' not in headers
+
+    status, body, headers = respond(page, None, 'gzip')
+    assert headers['Content-Encoding'] == 'gzip' and gzip.decompress(body) == page.body
+
+
+def test_page_and_version_change_together():
+    pages = iter(['one', 'two'])
+    cache = PageCache(lambda: next(pages))
+    first = cache.get(1)
+    assert cache.get(1) is first
+    second = cache.get(2)
+    assert second.body == b'two' and second.etag != first.etag
+    assert cache._entry == (2, second)
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataset_cache import load_dataset
+from model_store import load_artifact
+from scoring import CompiledModel, compile_pipeline
+
+FEATURES = ['location', 'total_sqft', 'bath', 'bhk']
+
+
+@pytest.fixture(scope='module')
+def pipe():
+    pytest.importorskip('sklearn')
+    return load_artifact('RidgeModel.pki')[0]
+
+
+@pytest.fixture(scope='module')
+def frame():
+    data = load_dataset()[FEATURES].astype({'location': object})
+    # Sizes and counts the dataset does not have, for every known location
+    rng = np.random.default_rng(0)
+    locations = data['location'].unique()
+    synthetic = pd.DataFrame({
+        'location': rng.choice(locations, 2000),
+        'total_sqft': rng.uniform(100, 10000, 2000),
+        'bath': rng.integers(1, 21, 2000).astype(float),
+        'bhk': rng.integers(1, 21, 2000).astype(float),
+    })
+    return pd.concat([data, synthetic], ignore_index=True)
+
+
+def test_compiled_model_matches_the_pipeline(pipe, frame):
+    model = CompiledModel.from_pipeline(pipe)
+    expected = pipe.predict(frame)
+    np.testing.assert_allclose(model.predict_frame(frame), expected, rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(model.predict(frame['location'].tolist(), frame['total_sqft'], frame['bath'],
+                                             frame['bhk']), expected, rtol=1e-9, atol=1e-9)
+    for i in range(0, len(frame), 997):
+        row = frame.iloc[i]
+        assert model.predict_one(row['location'], row['total_sqft'], row['bath'], row['bhk']) == pytest.approx(
+            expected[i], rel=1e-9, abs=1e-9)
+
+
+def test_saved_model_scores_the_same(pipe, frame, tmp_path):
+    model = CompiledModel.from_pipeline(pipe)
+    model.save(tmp_path / 'model.npz', source='RidgeModel.pki')
+    loaded = CompiledModel.load(tmp_path / 'model.npz')
+    np.testing.assert_array_equal(loaded.predict_frame(frame), model.predict_frame(frame))
+    assert loaded.metadata == {'source': 'RidgeModel.pki'}
+
+
+def test_unknown_locations_are_rejected(pipe):
+    model = CompiledModel.from_pipeline(pipe)
+    with pytest.raises(ValueError):
+        model.predict(['Whitefield', 'Atlantis'], [1200.0, 1200.0], [2.0, 2.0], [2.0, 2.0])
+    with pytest.raises(ValueError):
+        model.predict_one('Atlantis', 1200.0, 2.0, 2.0)
+
+
+def test_compile_pipeline_checks_parity(pipe, frame):
+    assert compile_pipeline(pipe, frame) is not None
+    assert compile_pipeline(None) is None
@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip('starlette')
+
+import data_service  # noqa: E402
+import main  # noqa: E402
+import serve  # noqa: E402
+from model_store import LoadedModel  # noqa: E402
+
+FORM = {'location': 'Whitefield', 'total_sqft': '1200', 'bhk': '2', 'bath': '2'}
+
+
+@pytest.mark.parametrize('accept, expected', [
+    (None, False),
+    ('application/json', True),
+    ('text/html, application/json', False),
+    ('application/json;q=0.5, text/plain', False),
+    ('text/plain;q=0.5, application/json', True),
+    ('*/*', False),
+])
+def test_both_servers_negotiate_json_the_same_way(accept, expected):
+    assert main.json_requested(None, accept) is expected
+    headers = {'Accept': accept} if accept else {}
+    response = main.app.test_client().post('/predict', data=FORM, headers=headers)
+    assert response.is_json is expected
+
+
+class SlowService:
+    """A data service whose predictions take a while, like a busy socket"""
+
+    def predict(self, locations, total_sqft, bath, bhk):
+        time.sleep(0.2)
+        return [50.0] * len(locations)
+
+
+def test_remote_model_calls_do_not_block_the_event_loop(monkeypatch):
+    model = data_service.RemoteModel(SlowService())
+    monkeypatch.setattr(main.store, 'current', LoadedModel(None, model, None, None, None))
+
+    async def run():
+        batcher = serve.MicroBatcher(window_ms=0)
+        batcher.start()
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.get_running_loop().create_task(tick())
+        price = await batcher.submit('Whitefield', 1200.0, 2.0, 2.0)
+        ticker.cancel()
+        return price, ticks
+
+    price, ticks = asyncio.run(run())
+    assert price == 50.0 * 1e5
+    assert ticks >= 5
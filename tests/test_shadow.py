@@ -0,0 +1,70 @@
+import pickle
+import time
+
+import pandas as pd
+import pytest
+
+from shadow import ShadowScorer
+
+
+def tree_artifact(path):
+    """A pickled pipeline that compile_pipeline cannot turn into a CompiledModel"""
+    compose = pytest.importorskip('sklearn.compose')
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import OneHotEncoder
+    from sklearn.tree import DecisionTreeRegressor
+
+    data = pd.DataFrame({'location': ['A', 'A', 'B', 'B'], 'total_sqft': [1000.0, 1500.0, 1000.0, 2000.0],
+                         'bath': [2, 2, 1, 3], 'bhk': [2, 3, 2, 4]})
+    pipe = make_pipeline(compose.make_column_transformer((OneHotEncoder(handle_unknown='ignore'), ['location']),
+                                                         remainder='passthrough'),
+                         DecisionTreeRegressor()).fit(data, [50.0, 70.0, 40.0, 90.0])
+    with open(path, 'wb') as f:
+        pickle.dump(pipe, f)
+    return str(path)
+
+
+def test_uncompilable_candidate_is_scored_with_its_pipeline(tmp_path):
+    scorer = ShadowScorer.from_paths([tree_artifact(tmp_path / 'tree.pki')], batch_wait_ms=1).start()
+    scorer.submit('A', 1000.0, 2.0, 2.0, 50.0 * 1e5)
+    scorer.submit('B', 2000.0, 3.0, 4.0, 80.0 * 1e5)
+    deadline = time.monotonic() + 5
+    while scorer.stats()['scored'] < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    stats = scorer.stats()
+    assert stats['scored'] == 2 and stats['errors'] == 0
+    overall = stats['candidates']['tree.pki']['overall']
+    assert overall['count'] == 2
+    assert overall['mean_diff'] == pytest.approx(5.0 * 1e5)
+
+
+def test_full_queue_counts_drops():
+    scorer = ShadowScorer({}, queue_size=1)
+    assert scorer.submit('A', 1000.0, 2.0, 2.0, 1.0)
+    assert not scorer.submit('A', 1000.0, 2.0, 2.0, 1.0)
+    assert (scorer.submitted, scorer.dropped) == (2, 1)
+    assert scorer.stats(top=-1)['candidates'] == {}
+
+
+def test_rows_a_candidate_cannot_score_are_counted_and_skipped():
+    known = {'A': 10.0, 'B': 20.0}
+
+    def predict(locations, total_sqft, bath, bhk):
+        # Like CompiledModel.predict: one unknown location fails the whole call
+        return [known[location] for location in locations]
+
+    scorer = ShadowScorer({'partial': predict}, batch_wait_ms=50).start()
+    for location in ('A', 'C', 'B', 'C'):
+        scorer.submit(location, 1000.0, 2.0, 2.0, 9.0 * 1e5)
+    deadline = time.monotonic() + 5
+    while scorer.stats()['scored'] < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    stats = scorer.stats()
+    assert stats['scored'] == 4 and stats['errors'] == 2
+    partial = stats['candidates']['partial']
+    assert partial['errors'] == 2
+    assert partial['overall']['count'] == 2
+    assert {row['location']: row['mean_diff'] for row in partial['locations']} == pytest.approx(
+        {'A': 1.0 * 1e5, 'B': 11.0 * 1e5})
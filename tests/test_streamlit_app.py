@@ -0,0 +1,27 @@
+import os
+
+import pytest
+
+from memory_report import APP_PATH
+
+pytest.importorskip('streamlit.testing.v1')
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+
+@pytest.fixture
+def app(monkeypatch):
+    # The app reads its dataset and model relative to the working directory
+    monkeypatch.chdir(os.path.dirname(APP_PATH))
+    return AppTest.from_file(APP_PATH, default_timeout=120).run()
+
+
+def _metric(at, label):
+    return next(metric.value for metric in at.metric if metric.label == label)
+
+
+def test_quick_stats_and_insights_show_the_same_average(app):
+    app.selectbox[0].select('Whitefield').run()
+    assert not app.exception
+    quick = _metric(app, "💰 Avg Price")
+    assert quick == _metric(app, "💰 Average Price")
+    assert quick.endswith(' L') or quick.endswith(' Cr')
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from location_resolver import LocationResolver
+from validation import validate_frame, validate_one
+
+KNOWN = frozenset(['Whitefield', 'Electronic City', '1st Block Jayanagar'])
+VALID = {'location': 'Whitefield', 'total_sqft': '1200', 'bath': '2', 'bhk': '2'}
+
+
+def _field(message):
+    """The field a validate_frame message is about"""
+    return 'location' if message.endswith('location') else next(
+        name for name in ('total_sqft', 'bath', 'bhk') if name in message)
+
+
+@pytest.mark.parametrize('field, value', [
+    (None, None),
+    ('total_sqft', float('nan')),
+    ('bath', float('nan')),
+    ('bhk', 'two'),
+    ('total_sqft', 'abc'),
+    ('bath', ''),
+    ('total_sqft', ' 1500 '),
+    ('bhk', 3),
+    ('bath', 2.0),
+    ('total_sqft', '-1200'),
+    ('bhk', -2),
+    ('bath', '0'),
+    ('total_sqft', '10001'),
+    ('bhk', '21'),
+    ('total_sqft', 'inf'),
+    ('bhk', '2.5'),
+    ('location', 'Mars'),
+    ('location', 'whitefeild'),
+    ('location', '  Electronic City '),
+    ('location', ''),
+    ('location', None),
+    ('location', float('nan')),
+])
+@pytest.mark.parametrize('resolve', [False, True])
+def test_frame_matches_row_by_row(field, value, resolve):
+    row = dict(VALID) if field is None else {**VALID, field: value}
+    resolver = LocationResolver(KNOWN).resolve if resolve else None
+    frame = pd.DataFrame([row, VALID], columns=['location', 'total_sqft', 'bath', 'bhk'], dtype=object)
+
+    clean, errors = validate_frame(frame, KNOWN, resolver)
+    values, expected = validate_one(row['location'], row['bhk'], row['bath'], row['total_sqft'], KNOWN, resolver)
+
+    assert errors[1] is None
+    if expected:
+        assert errors[0] is not None
+        assert _field(errors[0]) in expected
+    else:
+        assert errors[0] is None
+        got = clean.iloc[0]
+        assert (got['location'], got['bhk'], got['bath'], got['total_sqft']) == values
+        assert all(isinstance(number, (float, np.floating)) for number in values[1:])
@@ -0,0 +1,210 @@
+"""Train the price model from Cleaned_data.csv and write a versioned artifact.
+
+Rebuilds the same pipeline as RidgeModel.pki (one-hot location, passthrough
+numerics, StandardScaler, linear model) with a Ridge regressor whose alpha is
+picked by a cross-validated search run across a process pool:
+
+    python train.py                      # search alpha, write models/RidgeModel-<version>.pki
+    python train.py --publish            # ... and atomically replace RidgeModel.pki
+    python train.py --incremental        # reuse the last alpha if rows were only appended
+
+Each artifact gets a JSON sidecar with the scikit-learn version, a hash of the
+training rows and cross-validation metrics.
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import sklearn
+from sklearn.compose import make_column_transformer
+from sklearn.linear_model import Ridge
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.model_selection import KFold
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+DATA_PATH = 'Cleaned_data.csv'
+MODEL_PATH = 'RidgeModel.pki'
+NPZ_PATH = 'RidgeModel.npz'
+MODELS_DIR = 'models'
+FEATURES = ['location', 'total_sqft', 'bath', 'bhk']
+TARGET = 'price'
+ALPHAS = [0.0, 0.01, 0.1, 0.3, 1.0, 3.0, 10.0, 30.0, 100.0, 300.0, 1000.0]
+
+
+def build_pipeline(alpha):
+    # handle_unknown='ignore' so CV folds may hold locations the training folds lack
+    return make_pipeline(
+        make_column_transformer(
+            (OneHotEncoder(sparse_output=False, handle_unknown='ignore'), ['location']),
+            remainder='passthrough',
+        ),
+        StandardScaler(),
+        Ridge(alpha=alpha),
+    )
+
+
+def load_training_data(path=DATA_PATH):
+    data = pd.read_csv(path, index_col=0)
+    return data[FEATURES + [TARGET]].dropna().reset_index(drop=True)
+
+
+def rows_hash(data, rows=None):
+    """sha256 over the first `rows` training rows, independent of the index"""
+    subset = data if rows is None else data.iloc[:rows]
+    hashed = pd.util.hash_pandas_object(subset[FEATURES + [TARGET]], index=False)
+    return hashlib.sha256(hashed.to_numpy().tobytes()).hexdigest()
+
+
+# Worker-process state, set once by the pool initializer instead of per task
+_X = None
+_y = None
+
+
+def _init_worker(X, y):
+    global _X, _y
+    _X, _y = X, y
+
+
+def _score_fold(task):
+    alpha, train_index, test_index = task
+    pipe = build_pipeline(alpha).fit(_X.iloc[train_index], _y.iloc[train_index])
+    predicted = pipe.predict(_X.iloc[test_index])
+    actual = _y.iloc[test_index]
+    return alpha, r2_score(actual, predicted), mean_absolute_error(actual, predicted)
+
+
+def search_alpha(data, alphas=ALPHAS, folds=5, workers=None, seed=42):
+    """Cross-validate every alpha in parallel; returns the best alpha and a per-alpha table"""
+    X, y = data[FEATURES], data[TARGET]
+    splits = list(KFold(n_splits=folds, shuffle=True, random_state=seed).split(X))
+    tasks = [(alpha, train, test) for alpha in alphas for train, test in splits]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(X, y)) as pool:
+        results = list(pool.map(_score_fold, tasks))
+
+    table = (pd.DataFrame(results, columns=['alpha', 'r2', 'mae'])
+             .groupby('alpha').mean().sort_values('r2', ascending=False))
+    return float(table.index[0]), table
+
+
+def latest_metadata(models_dir=MODELS_DIR):
+    try:
+        with open(os.path.join(models_dir, 'latest.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_artifact(pipe, metadata, models_dir=MODELS_DIR):
+    """Save pipe and its metadata under a new version name; returns the artifact path"""
+    os.makedirs(models_dir, exist_ok=True)
+    version = time.strftime('%Y%m%d-%H%M%S') + '-' + metadata['rows_sha256'][:8]
+    metadata = dict(metadata, version=version, artifact=f'RidgeModel-{version}.pki')
+    path = os.path.join(models_dir, metadata['artifact'])
+
+    _atomic_write(path, pickle.dumps(pipe))
+    sidecar = json.dumps(metadata, indent=2).encode()
+    _atomic_write(path[:-len('.pki')] + '.json', sidecar)
+    _atomic_write(os.path.join(models_dir, 'latest.json'), sidecar)
+    return path
+
+
+def publish(path, target=MODEL_PATH):
+    """Replace the served model in one rename so running apps never read a partial file"""
+    folder = os.path.dirname(os.path.abspath(target))
+    fd, tmp = tempfile.mkstemp(dir=folder, suffix='.tmp')
+    os.close(fd)
+    shutil.copyfile(path, tmp)
+    os.replace(tmp, target)
+
+
+def _atomic_write(path, payload):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp, path)
+
+
+def train(data_path=DATA_PATH, models_dir=MODELS_DIR, incremental=False, alphas=ALPHAS, folds=5, workers=None):
+    data = load_training_data(data_path)
+    digest = rows_hash(data)
+    previous = latest_metadata(models_dir)
+
+    alpha = None
+    mode = 'full'
+    if incremental and previous:
+        if previous['rows_sha256'] == digest:
+            print(f"Training rows unchanged since {previous['version']}; nothing to do")
+            return None
+        old_rows = previous['rows']
+        if old_rows < len(data) and rows_hash(data, old_rows) == previous['rows_sha256']:
+            # Only new listings were appended: warm-start from the previous alpha
+            alpha = previous['alpha']
+            mode = 'incremental'
+            print(f"{len(data) - old_rows} new rows since {previous['version']}; refitting with alpha={alpha}")
+
+    cv = None
+    if alpha is None:
+        print(f"Searching {len(alphas)} alphas x {folds} folds on {len(data)} rows...")
+        alpha, table = search_alpha(data, alphas, folds, workers)
+        cv = table.loc[alpha]
+        print(table.to_string())
+
+    pipe = build_pipeline(alpha).fit(data[FEATURES], data[TARGET])
+    fitted = pipe.predict(data[FEATURES])
+    metrics = {
+        'train_r2': float(r2_score(data[TARGET], fitted)),
+        'train_mae': float(mean_absolute_error(data[TARGET], fitted)),
+    }
+    if cv is not None:
+        metrics.update(cv_r2=float(cv['r2']), cv_mae=float(cv['mae']))
+    elif previous:
+        metrics.update({k: v for k, v in previous['metrics'].items() if k.startswith('cv_')})
+
+    metadata = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'mode': mode,
+        'sklearn_version': sklearn.__version__,
+        'data_path': data_path,
+        'rows': len(data),
+        'rows_sha256': digest,
+        'locations': int(data['location'].nunique()),
+        'alpha': alpha,
+        'metrics': metrics,
+    }
+    path = write_artifact(pipe, metadata, models_dir)
+    print(f"Wrote {path} (alpha={alpha}, train R2={metrics['train_r2']:.4f})")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--models-dir', default=MODELS_DIR)
+    parser.add_argument('--incremental', action='store_true',
+                        help="skip the search when the data only gained rows since the last artifact")
+    parser.add_argument('--alphas', type=float, nargs='+', default=ALPHAS)
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--workers', type=int, help="process pool size (default: CPU count)")
+    parser.add_argument('--publish', action='store_true', help=f"replace {MODEL_PATH} with the new artifact")
+    args = parser.parse_args()
+
+    path = train(args.data, args.models_dir, args.incremental, args.alphas, args.folds, args.workers)
+    if path and args.publish:
+        publish(path)
+        # Refresh the sklearn-free export too, so apps keep loading the fast format
+        from model_store import export
+        export(MODEL_PATH, NPZ_PATH)
+        print(f"Published to {MODEL_PATH} and {NPZ_PATH}")
+
+
+if __name__ == '__main__':
+    main()
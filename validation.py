@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+
+FEATURES = ['location', 'total_sqft', 'bath', 'bhk']
+# Accepted ranges, the same as the Streamlit number_input limits
+LIMITS = {'total_sqft': (100, 10000), 'bath': (1, 20), 'bhk': (1, 20)}
+# Counts that must be whole numbers
+WHOLE = ('bath', 'bhk')
+
+
+def _check_number(name, value):
+    """(number, None) for an acceptable value, (None, message) otherwise"""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None, "is required"
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None, "must be a number"
+    low, high = LIMITS[name]
+    # NaN fails both comparisons, so it is rejected here too
+    if not low <= number <= high:
+        return None, f"must be between {low} and {high}"
+    if name in WHOLE and not number.is_integer():
+        return None, "must be a whole number"
+    return number, None
+
+
+def validate_numbers(raw):
+    """Parse and bounds-check {field: raw value} for fields in LIMITS.
+
+    Returns ({field: float or None}, {field: message}) for the bad ones, with
+    the same checks and messages as validate_one.
+    """
+    values, errors = {}, {}
+    for name, value in raw.items():
+        values[name], message = _check_number(name, value)
+        if message is not None:
+            errors[name] = message
+    return values, errors
+
+
+def validate_one(location, bhk, bath, sqft, known_locations, resolve=None):
+    """Parse and bounds-check one request's raw (usually string) inputs.
+
+    Returns ((location, bhk, bath, sqft), None) with floats for the numbers, or
+    (None, errors) where errors maps each bad field to a message. With resolve
+    (LocationResolver.resolve), a misspelled location becomes the closest known
+    name. Nothing raises, so rejecting a request costs a few dict lookups.
+    """
+    errors = {}
+    if location is None or not str(location).strip():
+        errors['location'] = "is required"
+    else:
+        location = str(location).strip()
+        if location not in known_locations:
+            resolved = resolve(location) if resolve is not None else None
+            if resolved is None:
+                errors['location'] = "is not a known location"
+            else:
+                location = resolved
+
+    values, number_errors = validate_numbers({'bhk': bhk, 'bath': bath, 'total_sqft': sqft})
+    errors.update(number_errors)
+
+    if errors:
+        return None, errors
+    return (location, values['bhk'], values['bath'], values['total_sqft']), None
+
+
+def error_body(errors):
+    """JSON body for a rejected request"""
+    return {'error': 'invalid input', 'fields': errors}
+
+
+def validate_frame(frame, known_locations, resolve=None):
+    """Validate a batch in bulk with vectorized checks.
+
+    Returns the cleaned frame (numeric columns coerced) and an array holding an
+    error message per row, or None for rows that are fine to score. Rows get
+    the same checks as validate_one; with resolve, unknown locations are
+    replaced by the closest known name where there is one, resolving each
+    distinct spelling once.
+    """
+    errors = np.full(len(frame), None, dtype=object)
+    clean = pd.DataFrame(index=frame.index)
+
+    location = frame['location'].astype(object)
+    location = location.where(location.isna(), location.astype(str).str.strip())
+    if resolve is not None:
+        unknown = (~location.isin(known_locations) & location.notna()).to_numpy()
+        if unknown.any():
+            resolved = {name: resolve(name) or name for name in location[unknown].unique()}
+            location = location.copy()
+            location[unknown] = location[unknown].map(resolved)
+    clean['location'] = location
+
+    for name in ('total_sqft', 'bath', 'bhk'):
+        values = pd.to_numeric(frame[name], errors='coerce').to_numpy(dtype=np.float64)
+        clean[name] = values
+        low, high = LIMITS[name]
+        # The first problem found for a row is the one reported
+        open_rows = pd.isna(errors)
+        errors[np.isnan(values) & open_rows] = f"invalid {name}"
+        with np.errstate(invalid='ignore'):
+            out_of_range = ~((values >= low) & (values <= high)) & ~np.isnan(values)
+        errors[out_of_range & open_rows] = f"{name} must be between {low} and {high}"
+        if name in WHOLE:
+            errors[(values != np.floor(values)) & ~out_of_range & pd.isna(errors)] = f"{name} must be a whole number"
+
+    missing_location = location.isna().to_numpy() | (location == '').to_numpy()
+    errors[missing_location] = "missing location"
+
+    unknown = ~location.isin(known_locations).to_numpy() & ~missing_location
+    errors[unknown & pd.isna(errors)] = "unknown location"
+
+    return clean, errors